@@ -1,44 +1,138 @@
 # analyzer.py
 import os
-import json
 import glob
-from pathlib import Path
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
 
-from config import SNAPSHOT_BEFORE, SNAPSHOT_AFTER, SHARED_FOLDER, REPORT_JSON, REPORT_TXT, USE_LLM
-from parsers.csv_parser import extract_csv_header
-from parsers.code_parser import analyze_python_file
-from reports.report_generator import write_json_report, write_text_report, call_llm_for_explanation
+from config import SNAPSHOT_BEFORE, SNAPSHOT_AFTER, REPORT_JSON, REPORT_TXT, USE_LLM
+from config import REPORT_NDJSON, REPORT_SUMMARY_JSON, REPORT_PRETTY, REPORT_INDEX_JSON, REPORT_SHARD_DIR
+from config import REPORT_COMPRESSION
+from config import USE_ANALYSIS_CACHE, ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_BYTES, JOBS, DIFF_AWARE
+from config import CSV_INCLUDE, CSV_EXCLUDE, HEADER_READ_THREADS, TRANSITIVE_IMPACTS, TRANSITIVE_MAX_HOPS
+from config import USE_IMPACT_INDEX, IMPACT_INDEX_PATH, LOG_LEVEL
+from config import PROFILE_COLUMNS, PROFILE_CHUNK_ROWS, PROFILE_MAX_ROWS, PROFILE_NULL_RATE_DELTA, PROFILE_USE_NUMPY
+from config import GIT_REPO, GIT_REV_BEFORE, GIT_REV_AFTER, GIT_ROOT, GIT_HEADER_BYTES, PRUNE_UNAFFECTED_READERS
+from config import RUNTIME_TRACE, RUNTIME_TRACE_JOBS, RUNTIME_TRACE_TIMEOUT, RUNTIME_TRACE_COMPARE, RUNTIME_TRACE_REPEAT
+from parsers.csv_parser import extract_csv_header, dataset_name, compression_of
+from parsers.column_profiler import profile_csv, diff_profiles, same_content
+from parsers.file_walker import walk_files, filter_paths, read_many
+from parsers.git_source import GitTree, GitCatFile, changed_paths
+from parsers.code_parser import analyze_python_job, read_py_source, ANALYZER_VERSION
+from parsers.analysis_cache import AnalysisCache, content_key
+from parsers.path_resolver import resolve_paths
+from parsers.runtime_tracer import trace_snapshot, merge_runtime, format_overhead
+from graph.dependency_graph import build_file_index, shared_file_key, file_keys, DependencyGraph
+from graph.impact_index import ImpactIndex
+from reports.report_generator import StreamingReportWriter, call_llm_for_explanation
+from reports.findings import Finding, SchemaTable, Evidence
+from reports.llm_enrichment import enrich_with_llm_async
+from reports.llm_grouping import plan_llm_requests, fan_out_answers
+from reports.llm_cache import LLMCache, cached_explanations
+from profiling import StageProfiler
 
-def gather_headers_recursive(folder):
+log = logging.getLogger("impact_analyzer")
+
+def gather_headers_recursive(folder, include=None, exclude=None, threads=None):
+    """
+    Return { rel_csv_path: header } for every CSV under folder.
+    Keys are paths relative to folder ('/' separated), so files with the same
+    name in different sub-folders no longer overwrite each other.
+    """
     mapping = {}
     if not folder or not os.path.isdir(folder):
         return mapping
-    for full in glob.glob(os.path.join(folder, "**", "*.csv"), recursive=True):
-        name = os.path.basename(full)
-        hdr = extract_csv_header(full)
-        mapping[name] = hdr
+    include = CSV_INCLUDE if include is None else include
+    exclude = CSV_EXCLUDE if exclude is None else exclude
+    threads = HEADER_READ_THREADS if threads is None else threads
+    found = sorted(walk_files(folder, include=include, exclude=exclude))
+    headers = read_many([full for _, full in found], extract_csv_header, threads=threads)
+    for (rel, _), hdr in zip(found, headers):
+        mapping[rel] = hdr
     return mapping
 
-def list_changed_files(before_snapshot, after_snapshot):
+def list_changed_files(before_snapshot, after_snapshot, profile=False):
     """
     Compare CSV headers found under before_snapshot and after_snapshot.
     Returns list of dicts: { filename, before_header, after_header }
+    filename is the CSV path relative to the snapshot root (e.g. 'shared/x.csv').
+    profile: also stream both versions of every CSV through the column profiler;
+      files whose columns changed type/null rate get a 'column_changes' list
+      (and are reported even when the header itself did not change).
     """
     files_before = gather_headers_recursive(before_snapshot)
     files_after  = gather_headers_recursive(after_snapshot)
 
-    print("DEBUG: headers found in BEFORE snapshot:", files_before)
-    print("DEBUG: headers found in AFTER  snapshot:", files_after)
+    log.debug("headers found in BEFORE snapshot: %s", files_before)
+    log.debug("headers found in AFTER  snapshot: %s", files_after)
 
     # fallback: if both snapshots are empty, try workspace/shared (live files)
     if not files_before and not files_after:
         live_shared = os.path.join(os.getcwd(), "..", "..", "shared")
         files_after = gather_headers_recursive(live_shared)
-        print("DEBUG: snapshots empty — falling back to live shared folder:", live_shared)
-        print("DEBUG: headers found in live shared:", files_after)
+        log.info("snapshots empty — falling back to live shared folder: %s", live_shared)
+        log.debug("headers found in live shared: %s", files_after)
+
+    changed = diff_headers(files_before, files_after)
+    if profile:
+        changed = add_column_changes(changed, files_before, files_after, before_snapshot, after_snapshot)
+    return changed
+
+def add_column_changes(changed, files_before, files_after, before_snapshot, after_snapshot):
+    """Attach column profile diffs to changed files, adding files whose header is unchanged but whose values changed."""
+    paths_before, paths_after = dataset_paths(files_before), dataset_paths(files_after)
+    pairs = []
+    for name in sorted(set(paths_before) & set(paths_after)):
+        b = os.path.join(before_snapshot, paths_before[name])
+        a = os.path.join(after_snapshot, paths_after[name])
+        if not same_content(b, a):
+            pairs.append((name, b, a))
 
+    def profile_pair(pair):
+        _, b, a = pair
+        return (profile_csv(b, chunk_rows=PROFILE_CHUNK_ROWS, max_rows=PROFILE_MAX_ROWS, use_numpy=PROFILE_USE_NUMPY),
+                profile_csv(a, chunk_rows=PROFILE_CHUNK_ROWS, max_rows=PROFILE_MAX_ROWS, use_numpy=PROFILE_USE_NUMPY))
+
+    profiles = read_many(pairs, profile_pair, threads=HEADER_READ_THREADS)
+    return _merge_column_changes(changed, files_before, files_after, pairs, profiles)
+
+def _merge_column_changes(changed, files_before, files_after, pairs, profiles):
+    """Merge the diffs of the (before, after) profiles of each (dataset, before, after) pair into changed."""
+    by_name = {c["filename"]: c for c in changed}
+    paths_before, paths_after = dataset_paths(files_before), dataset_paths(files_after)
+    for (rel, _, _), (pb, pa) in zip(pairs, profiles):
+        diffs = diff_profiles(pb, pa, null_rate_delta=PROFILE_NULL_RATE_DELTA)
+        log.debug("column profile diff for %s: %s", rel, diffs)
+        if not diffs:
+            continue
+        entry = by_name.get(rel)
+        if entry is None:
+            entry = {"filename": rel, "before_header": files_before[paths_before[rel]],
+                     "after_header": files_after[paths_after[rel]]}
+            by_name[rel] = entry
+        entry["column_changes"] = diffs
+    return [by_name[k] for k in sorted(by_name)]
+
+def dataset_paths(files):
+    """
+    { dataset: rel_path } for a { rel_csv_path: header } mapping, where 'x.csv.gz'
+    and 'x.csv' are the same dataset 'x.csv'. A plain file wins over compressed copies.
+    """
+    out = {}
+    for rel in sorted(files):
+        out.setdefault(dataset_name(rel), rel)
+    return out
+
+def diff_headers(files_before, files_after):
+    """
+    Changed-file entries for two { rel_csv_path: header } mappings, in sorted path order.
+    Files are compared per dataset, so 'x.csv' becoming 'x.csv.gz' with the same
+    header is no change; filename is the dataset name.
+    """
+    files_before = {k: files_before[rel] for k, rel in dataset_paths(files_before).items()}
+    files_after = {k: files_after[rel] for k, rel in dataset_paths(files_after).items()}
     changed = []
-    keys = set(list(files_before.keys()) + list(files_after.keys()))
+    keys = sorted(set(list(files_before.keys()) + list(files_after.keys())))
     for k in keys:
         b = files_before.get(k)
         a = files_after.get(k)
@@ -46,274 +140,695 @@ def list_changed_files(before_snapshot, after_snapshot):
             changed.append({"filename": k, "before_header": b, "after_header": a})
     return changed
 
-def analyze_codebase(snapshot_root):
+def list_changed_files_git(tree_before, tree_after, cat, profile=False):
+    """
+    list_changed_files for two revisions of a git repository (GitTree listings).
+    Only CSV datasets touched by `git diff --name-only` are read, streamed from their
+    blobs through cat (a GitCatFile); every other CSV is byte-identical in both
+    revisions, so its header cannot have changed. Headers come from the first
+    GIT_HEADER_BYTES of each blob; blobs to profile are read and profiled one at
+    a time, so no more than one blob is held in memory.
+    """
+    paths = changed_paths(tree_before.repo, tree_before.commit, tree_after.commit, tree_before.root)
+    touched = {dataset_name(p) for p in filter_paths(paths, CSV_INCLUDE, CSV_EXCLUDE)}
+    log.debug("CSV datasets changed between revisions: %s", sorted(touched))
+
+    def read_headers(tree):
+        rels = [rel for rel in filter_paths(sorted(tree.blobs), CSV_INCLUDE, CSV_EXCLUDE)
+                if dataset_name(rel) in touched]
+        headers, cut = {}, []
+        for (_, data), rel in zip(cat.read_many([tree.blobs[rel] for rel in rels], limit=GIT_HEADER_BYTES), rels):
+            headers[rel] = _header_from_prefix(rel, data)
+            if headers[rel] is None and data is not None and len(data) == GIT_HEADER_BYTES:
+                cut.append(rel)
+        # first record longer than the prefix, or a compressed block that needs more bytes
+        for (_, data), rel in zip(cat.read_many([tree.blobs[rel] for rel in cut]), cut):
+            headers[rel] = extract_csv_header(rel, data=data)
+        return headers
+
+    files_before = read_headers(tree_before)
+    files_after = read_headers(tree_after)
+    log.debug("headers found in BEFORE revision: %s", files_before)
+    log.debug("headers found in AFTER  revision: %s", files_after)
+    changed = diff_headers(files_before, files_after)
+    if profile:
+        paths_before, paths_after = dataset_paths(files_before), dataset_paths(files_after)
+        pairs = [(name, paths_before[name], paths_after[name])
+                 for name in sorted(set(paths_before) & set(paths_after))
+                 if tree_before.blobs[paths_before[name]] != tree_after.blobs[paths_after[name]]]
+        rels = [rel for _, b, a in pairs for rel in (b, a)]
+        shas = [tree.blobs[rel] for _, b, a in pairs for tree, rel in ((tree_before, b), (tree_after, a))]
+        # each blob is dropped as soon as it is profiled; (before, after) come in turn
+        flat = [profile_csv(rel, chunk_rows=PROFILE_CHUNK_ROWS, max_rows=PROFILE_MAX_ROWS,
+                            use_numpy=PROFILE_USE_NUMPY, data=data) if data is not None else None
+                for (_, data), rel in zip(cat.read_many(shas), rels)]
+        changed = _merge_column_changes(changed, files_before, files_after, pairs, zip(flat[::2], flat[1::2]))
+    return changed
+
+def _header_from_prefix(rel, data):
+    """Header of a CSV from the first bytes of its blob; None when they do not hold the whole first record."""
+    if data is None:
+        return None
+    if len(data) == GIT_HEADER_BYTES and not compression_of(rel) and b"\n" not in data:
+        return None
+    # a compressed prefix that ends inside the first record fails to decode and gives None
+    return extract_csv_header(rel, data=data)
+
+def analyze_codebase(snapshot_root, cache=None, jobs=1):
     """
     For each country folder, analyze python files for CSV usage/unpacking.
     Return mapping: { country: { rel_py_path: analysis_dict } }
+    cache: optional AnalysisCache shared across snapshots/runs
+    jobs: worker processes (1 = serial, 0 = one per CPU core)
+    """
+    return analyze_codebases([snapshot_root], cache=cache, jobs=jobs)[0]
+
+def analyze_codebases(snapshot_roots, cache=None, jobs=1, diff_aware=False, work_log=None):
+    """
+    Analyze several snapshots at once, fanning file analysis out over a single
+    process pool shared by all of them.
+    Returns one { country: { rel_py_path: analysis_dict } } per snapshot root.
+    Countries and files are visited in sorted order and results are merged back
+    in that order, so the output is identical for any number of workers.
+    diff_aware: hash every file first and analyze each distinct content once, so a
+      file that is identical in BEFORE and AFTER is parsed a single time.
+    work_log: optional dict, filled with which files were actually analyzed.
     """
-    results = {}
-    if not os.path.isdir(snapshot_root):
-        return results
-    for country_dir in glob.glob(os.path.join(snapshot_root, "*")):
-        print(f"Folders : {country_dir}")
-        if not os.path.isdir(country_dir):
+    results = []
+    pending = []   # (root index, result mapping, country, rel, full path)
+    for root_idx, snapshot_root in enumerate(snapshot_roots):
+        res = {}
+        results.append(res)
+        if not os.path.isdir(snapshot_root):
+            continue
+        for country_dir in sorted(glob.glob(os.path.join(snapshot_root, "*"))):
+            log.debug("Folders : %s", country_dir)
+            if not os.path.isdir(country_dir):
+                continue
+            country = os.path.basename(country_dir)
+            res[country] = {}
+            # consider .py files directly under the country folder
+            for py in sorted([f for f in os.listdir(country_dir) if f.endswith(".py")]):
+                full = os.path.join(country_dir, py)
+                log.debug("Files : %s", full)
+                # store keyed by relative path w.r.t. snapshot_root for stable comparison
+                rel = os.path.relpath(full, snapshot_root)
+                res[country][rel] = {}
+                pending.append((root_idx, res, country, rel, full))
+
+    # serve unchanged files from the cache; only misses go to the workers, and
+    # identical contents (e.g. the same file in BEFORE and AFTER) are analyzed once
+    hash_contents = cache is not None or diff_aware
+    todo = []      # (pending entry, cache key, index into job_args)
+    job_args = []
+    job_items = []
+    queued = {}    # content key -> index into job_args
+    served = {}    # content key -> analysis served from the cache
+    reused = 0
+    cache_hits = 0
+    for item in pending:
+        full = item[4]
+        if not hash_contents:
+            todo.append((item, None, len(job_args)))
+            job_args.append((full, None))
+            job_items.append(item)
+            continue
+        if not os.path.exists(full):
+            continue
+        try:
+            src = read_py_source(full)
+        except Exception:
+            continue
+        key = cache.key_for(src) if cache is not None else content_key(src, ANALYZER_VERSION)
+        if key in queued:
+            reused += 1
+            todo.append((item, None, queued[key]))
+            continue
+        if key in served:
+            reused += 1
+            item[1][item[2]][item[3]] = served[key]
             continue
-        country = os.path.basename(country_dir)
-        results[country] = {}
-        # consider .py files directly under the country folder
-        for py in sorted([f for f in os.listdir(country_dir) if f.endswith(".py")]):
-            full = os.path.join(country_dir, py)
-            print(f"Files : {full}")
-            analysis = analyze_python_file(full)
-            # store keyed by relative path w.r.t. snapshot_root for stable comparison
-            rel = os.path.relpath(full, snapshot_root)
-            results[country][rel] = analysis
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            cache_hits += 1
+            served[key] = cached
+            item[1][item[2]][item[3]] = cached
+            continue
+        queued[key] = len(job_args)
+        todo.append((item, key if cache is not None else None, len(job_args)))
+        job_args.append((full, src))
+        job_items.append(item)
+
+    workers = jobs if jobs and jobs > 0 else (os.cpu_count() or 1)
+    if workers > 1 and len(job_args) > 1:
+        chunksize = max(1, len(job_args) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=min(workers, len(job_args))) as pool:
+            analyses = list(pool.map(analyze_python_job, job_args, chunksize=chunksize))
+    else:
+        analyses = [analyze_python_job(a) for a in job_args]
+
+    for item, key, idx in todo:
+        _, res, country, rel, _ = item
+        analysis = analyses[idx]
+        res[country][rel] = analysis
+        if key is not None and analysis:
+            cache.put(key, analysis)
+
+    # open()/read_csv() targets built from names imported from other modules
+    resolution = [resolve_paths(res) for res in results]
+
+    if work_log is not None:
+        work_log["files_total"] = len(pending)
+        work_log["files_analyzed"] = len(job_args)
+        work_log["files_reused"] = reused
+        work_log["files_from_cache"] = cache_hits
+        work_log["analyzed"] = [[item[3] for item in job_items if item[0] == i] for i in range(len(snapshot_roots))]
+        work_log["path_resolution"] = resolution
     return results
 
-def _file_reads_to_basename_list(file_reads):
+def analyze_git_codebases(trees, cat, cache=None, jobs=1, work_log=None):
     """
-    file_reads is a list of (lineno, value) where value may be:
-      - a literal path like '../shared/module_b_output_india.csv'
-      - a varname unresolved like 'IN'
-      - a resolved path produced earlier (joined)
-    We normalize to basenames where possible.
+    analyze_codebases for git revisions (GitTree listings of one repository).
+    Every top-level folder of a tree is a country and its .py blobs are analyzed.
+    Analyses are keyed by blob sha: a path whose blob is the same in both revisions
+    is analyzed once, and with an AnalysisCache one that is unchanged since an
+    earlier run is not even read from git. Blobs that do need parsing are streamed
+    through cat (a GitCatFile). Returns the same mappings as analyze_codebases.
     """
-    out = set()
-    for fr in file_reads:
-        if not fr:
+    results = []
+    pending = []   # (root index, result mapping, country, rel, blob sha)
+    for root_idx, tree in enumerate(trees):
+        res = {}
+        results.append(res)
+        countries = {}
+        for path in tree.blobs:
+            if "/" in path:
+                country, rest = path.split("/", 1)
+                countries.setdefault(country, []).append(rest)
+        for country in sorted(countries):
+            res[country] = {}
+            for py in sorted(f for f in countries[country] if "/" not in f and f.endswith(".py")):
+                rel = os.path.join(country, py)
+                res[country][rel] = {}
+                pending.append((root_idx, res, country, rel, tree.blobs[f"{country}/{py}"]))
+
+    todo = {}      # blob sha -> [pending entries]
+    reused = 0
+    cache_hits = 0
+    served = {}    # blob sha -> analysis served from the cache
+    for item in pending:
+        sha = item[4]
+        if sha in todo or sha in served:
+            reused += 1
+            if sha in served:
+                item[1][item[2]][item[3]] = served[sha]
+            else:
+                todo[sha].append(item)
             continue
-        val = fr[1]
-        if not val:
+        cached = cache.get(cache.key_for("git blob " + sha)) if cache is not None else None
+        if cached is not None:
+            cache_hits += 1
+            served[sha] = cached
+            item[1][item[2]][item[3]] = cached
             continue
-        # if it's a path-like string, extract basename
+        todo[sha] = [item]
+
+    job_shas, job_args = [], []
+    for sha, data in cat.read_many(list(todo)):
         try:
-            bn = os.path.basename(val)
-            out.add(bn)
-        except Exception:
-            out.add(str(val))
-    return out
+            src = data.decode("utf-8")
+        except (AttributeError, UnicodeDecodeError):
+            continue
+        job_shas.append(sha)
+        job_args.append((todo[sha][0][3], src))
+
+    workers = jobs if jobs and jobs > 0 else (os.cpu_count() or 1)
+    if workers > 1 and len(job_args) > 1:
+        chunksize = max(1, len(job_args) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=min(workers, len(job_args))) as pool:
+            analyses = list(pool.map(analyze_python_job, job_args, chunksize=chunksize))
+    else:
+        analyses = [analyze_python_job(a) for a in job_args]
+
+    for sha, analysis in zip(job_shas, analyses):
+        for _, res, country, rel, _ in todo[sha]:
+            res[country][rel] = analysis
+        if cache is not None and analysis:
+            cache.put(cache.key_for("git blob " + sha), analysis)
+
+    resolution = [resolve_paths(res) for res in results]
 
-# def infer_impacts(changed_files, code_before, code_after):
-#     """
-#     Create findings by correlating changed CSVs with code usages.
-#     code_before / code_after: mapping { country: { rel_py_path: analysis } }
-#     """
-#     findings = []
-
-#     # Helper: iterate over all modules (countries) and python files in after-snapshot
-#     countries = set(list(code_before.keys()) + list(code_after.keys()))
-
-#     for change in changed_files:
-#         fname = change["filename"]
-#         for country in countries:
-#             files_after = code_after.get(country, {})
-#             files_before = code_before.get(country, {})
-#             for relpath, analysis_after in files_after.items():
-#                 analysis_before = files_before.get(relpath, {})
-#                 # get list of basenames that this file reads (after and before)
-#                 reads_after = _file_reads_to_basename_list(analysis_after.get("file_reads", []))
-#                 reads_before = _file_reads_to_basename_list(analysis_before.get("file_reads", []))
-#                 # detect if this file reads the changed fname in after OR started reading it newly
-#                 reads_changed_after = fname in reads_after
-#                 started_reading = (fname not in reads_before) and (fname in reads_after)
-#                 if reads_changed_after:
-#                     evidence = []
-#                     # add which line opened it (from file_reads entries)
-#                     for fr in analysis_after.get("file_reads", []):
-#                         if os.path.basename(str(fr[1])) == fname:
-#                             evidence.append(f"module file {os.path.normpath(relpath)} opens '{fr[1]}' (line {fr[0]})")
-#                     # code-change evidence
-#                     pos_after = analysis_after.get("positional_unpack_sites", [])
-#                     pos_before = analysis_before.get("positional_unpack_sites", [])
-#                     dict_after = analysis_after.get("dictreader_sites", [])
-#                     dict_before = analysis_before.get("dictreader_sites", [])
-
-#                     # determine risk and evidence
-#                     risk = "Low"
-#                     if pos_after:
-#                         # if positional unpack exists after, high risk
-#                         risk = "High"
-#                         for ln, count, src in pos_after:
-#                             evidence.append(f"positional unpacking at line {ln} expecting {count} fields -> source: {src.strip()}")
-#                     elif dict_after:
-#                         risk = "Low"
-#                         for ln, src in dict_after:
-#                             evidence.append(f"DictReader usage at line {ln} -> source: {src.strip()}")
-#                     else:
-#                         if analysis_after.get("csv_reader_sites"):
-#                             risk = "Medium"
-#                             for ln, src in analysis_after.get("csv_reader_sites"):
-#                                 evidence.append(f"csv.reader usage at line {ln} -> source: {src.strip()}")
-#                         else:
-#                             evidence.append("No direct CSV-read heuristic found in this file.")
-
-#                     # if this file began reading the file in AFTER snapshot, note it
-#                     if started_reading:
-#                         evidence.insert(0, f"Note: this file started reading '{fname}' in AFTER snapshot (was not present in BEFORE).")
-
-#                     findings.append({
-#                         "module": country,
-#                         "file": relpath,
-#                         "impact": f"Schema changed for '{fname}' (columns before: {change['before_header']}, after: {change['after_header']})",
-#                         "confidence": risk,
-#                         "evidence": evidence,
-#                         "changed_file": fname
-#                     })
-
-#             # Additionally: detect files that had positional unpacking in AFTER but not reading the file directly,
-#             # but might be indirectly affected if they read a file that maps to this changed file name via aliases.
-#             # (This can be extended; for POC we focus on direct reads.)
-
-#     return findings
-
-def infer_impacts(changed_files, code_before, code_after):
-    findings = []
-    countries = set(list(code_before.keys()) + list(code_after.keys()))
+    if work_log is not None:
+        work_log["files_total"] = len(pending)
+        work_log["files_analyzed"] = len(job_args)
+        work_log["files_reused"] = reused
+        work_log["files_from_cache"] = cache_hits
+        work_log["analyzed"] = [[todo[sha][0][3] for sha in job_shas if todo[sha][0][0] == i]
+                                for i in range(len(trees))]
+        work_log["path_resolution"] = resolution
+    return results
+
+def infer_impacts(changed_files, code_before, code_after, transitive=False, max_hops=None, prune=False, stats=None):
+    return list(iter_impacts(changed_files, code_before, code_after, transitive=transitive, max_hops=max_hops,
+                             prune=prune, stats=stats))
+
+def iter_impacts(changed_files, code_before, code_after, transitive=False, max_hops=None, prune=False, stats=None):
+    """
+    Yield Finding objects one by one (same order as infer_impacts), so reports
+    can be streamed without holding every finding in memory. Findings of a
+    changed file share its interned before/after Schema; text is built on output.
+    transitive: also report modules further downstream (readers of files written
+    by affected readers), with their hop distance; max_hops limits the depth.
+    prune: skip readers whose tracked column accesses are untouched by the change
+      (see _access_impact); readers whose accesses cannot be followed are kept.
+    stats: optional dict, "readers_pruned" counts the skipped readers.
+    """
+    # one-time inverted indexes: shared file -> (country, relpath, line, role)
+    index_after = build_file_index(code_after)
+    index_before = build_file_index(code_before)
+    graph = DependencyGraph.from_analysis(code_after) if transitive else None
+    schemas = SchemaTable()
 
     for change in changed_files:
         fname = change["filename"]
-        for country in countries:
+        schema_before = schemas.intern(change["before_header"])
+        schema_after = schemas.intern(change["after_header"])
+        # code references are matched on the file's path in the snapshot; targets
+        # that could not be placed there on its name (file_keys)
+        keys = file_keys(fname)
+        # group AFTER entries by country, then by role, keeping file order
+        by_country = {}
+        for key in keys:
+            for country, relpath, _, role in index_after.get(key, []):
+                roles = by_country.setdefault(country, {"writes": {}, "reads": {}})
+                roles[role][relpath] = True
+        seen_before = set((country, relpath, role) for key in keys
+                          for country, relpath, _, role in index_before.get(key, []))
+
+        for country in sorted(by_country):
             files_after = code_after.get(country, {})
             files_before = code_before.get(country, {})
             # 1) detect modules that write this changed file in AFTER snapshot
-            for relpath, analysis_after in files_after.items():
-                writes_after = _file_reads_to_basename_list(analysis_after.get("file_writes", []))
-                writes_before = _file_reads_to_basename_list(files_before.get(relpath, {}).get("file_writes", []))
-                writes_changed_after = fname in writes_after
-                started_writing = (fname not in writes_before) and (fname in writes_after)
-                if writes_changed_after:
-                    evidence = []
-                    # show write lines
-                    for fr in analysis_after.get("file_writes", []):
-                        if os.path.basename(str(fr[1])) == fname:
-                            evidence.append(f"module file {os.path.normpath(relpath)} writes to '{fr[1]}' (line {fr[0]})")
-
-                    # header write details
-                    hw_after = analysis_after.get("header_writes", [])
-                    hw_before = files_before.get(relpath, {}).get("header_writes", [])
-                    if hw_after:
-                        for ln, hw in hw_after:
-                            evidence.append(f"header write at line {ln} -> {hw}")
-                    # determine risk by what readers might do (we'll check readers separately too)
-                    risk = "Low"
-                    # if positional unpack exists in any reader file in same country, we will mark higher later; for now mark medium
-                    if hw_after and not hw_before:
-                        risk = "Medium"
+            for relpath in by_country[country]["writes"]:
+                analysis_after = files_after[relpath]
+                started_writing = (country, relpath, "writes") not in seen_before
+                evidence = []
+                # show write lines
+                for fr in analysis_after.get("file_writes", []):
+                    if fr and shared_file_key(fr[1], relpath) in keys:
+                        evidence.append(Evidence("module file {} writes to '{}' (line {})",
+                                                 os.path.normpath(relpath), fr[1], fr[0]))
 
-                    if started_writing:
-                        evidence.insert(0, f"Note: this file started writing '{fname}' in AFTER snapshot (was not present in BEFORE).")
+                # header write details
+                hw_after = analysis_after.get("header_writes", [])
+                hw_before = files_before.get(relpath, {}).get("header_writes", [])
+                if hw_after:
+                    for ln, hw in hw_after:
+                        # a literal header equal to a changed file's header is shown by schema ID
+                        evidence.append(Evidence("header write at line {} -> {}", ln, schemas.lookup(hw) or hw))
+                # determine risk by what readers might do (we'll check readers separately too)
+                risk = "Low"
+                # if positional unpack exists in any reader file in same country, we will mark higher later; for now mark medium
+                if hw_after and not hw_before:
+                    risk = "Medium"
 
-                    findings.append({
-                        "module": country,
-                        "file": relpath,
-                        "impact": f"Code writes changed CSV '{fname}'. Schema before: {change['before_header']}, after: {change['after_header']}",
-                        "confidence": risk,
-                        "evidence": evidence,
-                        "changed_file": fname
-                    })
+                evidence.extend(_column_change_evidence(change))
+                if started_writing:
+                    evidence.insert(0, Evidence("Note: this file started writing '{}' in AFTER snapshot "
+                                                "(was not present in BEFORE).", fname))
+
+                yield Finding(country, relpath, "writer", risk, fname, schema_before, schema_after, evidence)
 
             # 2) existing logic: detect readers that read the changed file (unchanged)
-            for relpath, analysis_after in files_after.items():
-                analysis_before = files_before.get(relpath, {})
-                reads_after = _file_reads_to_basename_list(analysis_after.get("file_reads", []))
-                reads_before = _file_reads_to_basename_list(analysis_before.get("file_reads", []))
-                reads_changed_after = fname in reads_after
-                started_reading = (fname not in reads_before) and (fname in reads_after)
-                if reads_changed_after:
-                    evidence = []
-                    for fr in analysis_after.get("file_reads", []):
-                        if os.path.basename(str(fr[1])) == fname:
-                            evidence.append(f"module file {os.path.normpath(relpath)} opens '{fr[1]}' (line {fr[0]})")
-
-                    pos_after = analysis_after.get("positional_unpack_sites", [])
-                    dict_after = analysis_after.get("dictreader_sites", [])
+            for relpath in by_country[country]["reads"]:
+                analysis_after = files_after[relpath]
+                access = _access_impact(analysis_after, relpath, keys, change) if prune else None
+                if access is not None and not access[0]:
+                    if stats is not None:
+                        stats["readers_pruned"] = stats.get("readers_pruned", 0) + 1
+                    continue
+                started_reading = (country, relpath, "reads") not in seen_before
+                evidence = []
+                for fr in analysis_after.get("file_reads", []):
+                    if fr and shared_file_key(fr[1], relpath) in keys:
+                        evidence.append(Evidence("module file {} opens '{}' (line {})",
+                                                 os.path.normpath(relpath), fr[1], fr[0]))
+
+                pos_after = analysis_after.get("positional_unpack_sites", [])
+                dict_after = analysis_after.get("dictreader_sites", [])
+                risk = "Low"
+                if access is not None:
+                    # the columns this reader actually uses are hit by the change
+                    _, risk, access_evidence = access
+                    evidence.extend(access_evidence)
+                elif pos_after:
+                    risk = "High"
+                    for ln, count, src in pos_after:
+                        evidence.append(Evidence("positional unpacking at line {} expecting {} fields -> source: {}",
+                                                 ln, count, src.strip()))
+                elif dict_after:
                     risk = "Low"
-                    if pos_after:
-                        risk = "High"
-                        for ln, count, src in pos_after:
-                            evidence.append(f"positional unpacking at line {ln} expecting {count} fields -> source: {src.strip()}")
-                    elif dict_after:
-                        risk = "Low"
-                        for ln, src in dict_after:
-                            evidence.append(f"DictReader usage at line {ln} -> source: {src.strip()}")
+                    for ln, src in dict_after:
+                        evidence.append(Evidence("DictReader usage at line {} -> source: {}", ln, src.strip()))
+                else:
+                    if analysis_after.get("csv_reader_sites"):
+                        risk = "Medium"
+                        for ln, src in analysis_after.get("csv_reader_sites"):
+                            evidence.append(Evidence("csv.reader usage at line {} -> source: {}", ln, src.strip()))
                     else:
-                        if analysis_after.get("csv_reader_sites"):
-                            risk = "Medium"
-                            for ln, src in analysis_after.get("csv_reader_sites"):
-                                evidence.append(f"csv.reader usage at line {ln} -> source: {src.strip()}")
-                        else:
-                            evidence.append("No direct CSV-read heuristic found in this file.")
-
-                    if started_reading:
-                        evidence.insert(0, f"Note: this file started reading '{fname}' in AFTER snapshot (was not present in BEFORE).")
-
-                    findings.append({
-                        "module": country,
-                        "file": relpath,
-                        "impact": f"Schema changed for '{fname}' (columns before: {change['before_header']}, after: {change['after_header']})",
-                        "confidence": risk,
-                        "evidence": evidence,
-                        "changed_file": fname
-                    })
-
-    return findings
-
-def enrich_with_llm(findings, config):
-    print(f"Findings : {findings}")
-    print("For each finding, craft a small prompt with evidence and call LLM for friendly explanation & suggestions.")
-    
-    for f in findings:
-        prompt_lines = []
-        prompt_lines.append(f"File changed: {f['changed_file']}")
-        prompt_lines.append(f"Confidence: {f['confidence']}")
-        prompt_lines.append("Evidence:")
-        for e in f["evidence"]:
-            prompt_lines.append(" - " + e)
-        prompt_lines.append("")
-        prompt_lines.append("Provide a concise technical explanation why this module might break (one short paragraph), and give up to 3 recommended test case scenario to do testing or remediation steps.")
-        prompt = "\n".join(prompt_lines)
-        llm_out = None
-        print(f"Prompt : {prompt}")
-        try:
-            llm_out = call_llm_for_explanation(prompt, config)
-        except Exception as e:
-            llm_out = f"LLM unavailable: {e}"
-        f["llm_explanation"] = llm_out
-    return findings
+                        evidence.append("No direct CSV-read heuristic found in this file.")
+
+                column_evidence = _column_change_evidence(change)
+                if column_evidence:
+                    evidence.extend(column_evidence)
+                    # values this reader parses changed type/nullability even where the header did not
+                    if risk == "Low" and any(c["change"] != "null_rate" for c in change["column_changes"]):
+                        risk = "Medium"
+                if started_reading:
+                    evidence.insert(0, Evidence("Note: this file started reading '{}' in AFTER snapshot "
+                                                "(was not present in BEFORE).", fname))
+
+                yield Finding(country, relpath, "reader", risk, fname, schema_before, schema_after, evidence)
 
-def main():
+        # 3) modules reached only through other modules' outputs
+        if graph is not None:
+            direct = set()
+            for country in by_country:
+                for role in ("writes", "reads"):
+                    direct.update((country, relpath) for relpath in by_country[country][role])
+            yield from _transitive_findings(graph, change, direct, max_hops, schema_before, schema_after)
+
+def _column_change_evidence(change):
+    out = []
+    for c in change.get("column_changes", []):
+        if c["change"] == "type":
+            out.append(Evidence("column '{}' changed type: {} -> {}", c["column"], c["before"], c["after"]))
+        elif c["change"] == "null_rate":
+            out.append(Evidence("column '{}' null rate changed: {:.0%} -> {:.0%}", c["column"], c["before"], c["after"]))
+        else:
+            out.append(Evidence("column '{}' became constant ({} -> {} distinct values)",
+                                c["column"], c["before"], c["after"]))
+    return out
+
+_RISK_ORDER = {"Low": 0, "Medium": 1, "High": 2}
+
+def header_delta(before, after):
+    """
+    (removed, renamed, shifted) between two headers: removed columns, { old: new }
+    for columns replaced in place by a new name, and the BEFORE positions whose
+    column is no longer at the same index.
+    """
+    before_set, after_set = set(before), set(after)
+    removed = [c for c in before if c not in after_set]
+    renamed = {before[i]: after[i] for i in range(min(len(before), len(after)))
+               if before[i] not in after_set and after[i] not in before_set}
+    shifted = set(i for i in range(len(before)) if i >= len(after) or before[i] != after[i])
+    return removed, renamed, shifted
+
+_ACCESS_TEMPLATES = {
+    "key": "row['{}']",
+    "get": "row.get('{}')",
+    "header.index": "header.index('{}')",
+    "usecols": "read_csv(usecols=[..., '{}', ...])",
+    "column": "df['{}']"
+}
+
+def _describe_access(how, col):
+    template = _ACCESS_TEMPLATES.get(how)
+    if template is None:
+        return Evidence("df.{}('{}')", how, col)
+    return Evidence(template, col)
+
+def _access_impact(analysis, relpath, keys, change):
+    """
+    Decide from the analysis' column_access entries on the changed file (matched
+    on its file_keys) whether this reader, at relpath, is hit by the change.
+    Returns None when that cannot be told (no header on one side, or
+    a handle whose rows are not followed), else (affected, risk, evidence):
+      named columns (row["x"], row.get, header.index, df["x"], usecols) that were
+      removed or renamed; indexes and unpack widths whose positions shifted;
+      slices/computed indexes/rows passed elsewhere when positions shifted; and
+      accessed columns whose values changed type.
+    """
+    before, after = change.get("before_header"), change.get("after_header")
+    if before is None or after is None:
+        return None
+    reads = analysis.get("file_reads", [])
+    handles = [a for a in analysis.get("column_access", [])
+               if a["read"] < len(reads) and shared_file_key(reads[a["read"]][1], relpath) in keys]
+    if not handles:
+        return None
+    reading = [a for a in handles if a["mode"] == "r"]
+    if any(not a["tracked"] for a in reading):
+        return None
+    removed, renamed, shifted = header_delta(before, after)
+    typed = set(c["column"] for c in change.get("column_changes", []) if c["change"] != "null_rate")
+    unpack_src = {ln: src for ln, _, src in analysis.get("positional_unpack_sites", [])}
+    hits = []
+    for a in reading:
+        for ln, col, how in a["names"]:
+            what = _describe_access(how, col)
+            if col in renamed:
+                hits.append(("Medium" if how == "get" else "High",
+                             Evidence("{} at line {}: column '{}' was renamed to '{}'", what, ln, col, renamed[col])))
+            elif col in removed:
+                hits.append(("Medium" if how == "get" else "High",
+                             Evidence("{} at line {}: column '{}' was removed", what, ln, col)))
+            elif col in typed:
+                hits.append(("Medium", Evidence("{} at line {}: values of column '{}' changed", what, ln, col)))
+        for ln, idx in a["indexes"]:
+            if idx >= len(after):
+                hits.append(("High", Evidence("row[{}] at line {}: out of range, rows now have {} columns",
+                                              idx, ln, len(after))))
+            elif idx in shifted:
+                hits.append(("High", Evidence("row[{}] at line {}: was column '{}', now '{}'",
+                                              idx, ln, before[idx], after[idx])))
+            elif after[idx] in typed:
+                hits.append(("Medium", Evidence("row[{}] at line {}: values of column '{}' changed", idx, ln, after[idx])))
+        for ln, width in a["unpack"]:
+            source = Evidence(" -> source: {}", unpack_src[ln].strip()) if ln in unpack_src else ""
+            if width != len(after) or any(i in shifted for i in range(width)):
+                hits.append(("High", Evidence("positional unpacking at line {} expects {} fields, rows now have {}{}",
+                                              ln, width, len(after), source)))
+            elif typed & set(after[:width]):
+                hits.append(("Medium", Evidence("positional unpacking at line {} binds columns whose values changed{}",
+                                                ln, source)))
+        by_position = a["kind"] not in ("dict", "pandas")
+        layout_changed = bool(removed) or (by_position and bool(shifted))
+        for ln, what in a["opaque"]:
+            if layout_changed:
+                hits.append(("Medium", Evidence("{} at line {} depends on the column layout, which changed", what, ln)))
+            elif typed:
+                hits.append(("Medium", Evidence("{} at line {} may use columns whose values changed", what, ln)))
+    if not hits:
+        return False, None, []
+    risk = max((r for r, _ in hits), key=_RISK_ORDER.get)
+    return True, risk, [e for _, e in hits]
+
+def _transitive_findings(graph, change, direct, max_hops=None, schema_before=None, schema_after=None):
+    fname = change["filename"]
+    radius = graph.blast_radius([graph.file_id(fname)], max_hops=max_hops)
+    for module_id, hops, _ in radius:
+        if hops < 2 or graph.names[module_id] in direct:
+            continue
+        country, relpath = graph.names[module_id]
+        chain = [os.path.normpath(graph.names[m][1]) for m in graph.path_to(radius, module_id)]
+        via = Evidence(" -> ".join(["{}"] * len(chain)), *chain)
+        evidence = [Evidence("reached in {} hops from '{}' via {}", hops, fname, via)]
+        yield Finding(country, relpath, "transitive", "Low", fname, schema_before, schema_after, evidence, hops=hops)
+
+def enrich_with_llm(findings, config, cache=None, changed_files=None):
+    log.debug("Findings : %s", findings)
+    log.info("For each finding, craft a small prompt with evidence and call LLM for friendly explanation & suggestions.")
+
+    def call(prompts):
+        outs = []
+        for prompt in prompts:
+            llm_out = None
+            log.debug("Prompt : %s", prompt)
+            try:
+                llm_out = call_llm_for_explanation(prompt, config)
+            except Exception as e:
+                llm_out = f"LLM unavailable: {e}"
+            outs.append(llm_out)
+        return outs
+
+    # one prompt per finding, or per cluster of equivalent findings
+    clusters, prompts = plan_llm_requests(findings, changed_files,
+                                          group=getattr(config, "LLM_GROUP_FINDINGS", False),
+                                          max_group=getattr(config, "LLM_GROUP_MAX", 10))
+    if cache is not None:
+        countries = sorted(set(f.module for f in findings))
+        answers = cached_explanations(prompts, countries, config, cache, call)
+    else:
+        answers = call(prompts)
+    return fan_out_answers(findings, clusters, answers)
+
+def enrich_findings(findings, changed):
+    """LLM enrichment as configured (async/sync, optional cache). Returns (findings, llm_cache or None)."""
+    llm_cache = None
+    if not findings:
+        return findings, llm_cache
+    log.info("enriching %d findings with the LLM", len(findings))
+    try:
+        import config as cfg
+        if getattr(cfg, "USE_LLM_CACHE", False):
+            llm_cache = LLMCache(cfg.LLM_CACHE_PATH, ttl_seconds=cfg.LLM_CACHE_TTL,
+                                 max_entries=cfg.LLM_CACHE_MAX_ENTRIES)
+        if getattr(cfg, "LLM_ASYNC", False):
+            findings = enrich_with_llm_async(findings, cfg, cache=llm_cache, changed_files=changed)
+        else:
+            findings = enrich_with_llm(findings, cfg, cache=llm_cache, changed_files=changed)
+    except Exception:
+        log.exception("LLM enrichment failed")
+    if llm_cache is not None:
+        log.info("LLM cache: %s", llm_cache.stats())
+    return findings, llm_cache
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CSV schema change impact analyzer.")
+    parser.add_argument("--profile", action="store_true",
+                        help="record wall/CPU time, peak RSS and item counts per stage (summary 'timings')")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="with --profile, also track each stage's heap peak with tracemalloc (slower)")
+    parser.add_argument("--cprofile", metavar="PATH", default=None,
+                        help="with --profile, dump cProfile stats of the whole run to PATH")
+    parser.add_argument("--log-level", default=LOG_LEVEL,
+                        help="DEBUG shows every folder, file and header found (default: %(default)s)")
+    parser.add_argument("--trace", action="store_true", default=RUNTIME_TRACE,
+                        help="run the snapshot modules under an open() audit hook and merge the observed file I/O")
+    parser.add_argument("--git-before", metavar="REV", default=GIT_REV_BEFORE,
+                        help="git mode: read BEFORE from this revision instead of SNAPSHOT_BEFORE")
+    parser.add_argument("--git-after", metavar="REV", default=GIT_REV_AFTER,
+                        help="git mode: read AFTER from this revision instead of SNAPSHOT_AFTER")
+    parser.add_argument("--git-repo", metavar="PATH", default=GIT_REPO,
+                        help="git mode: repository (or any folder inside it) (default: %(default)s)")
+    parser.add_argument("--git-root", metavar="DIR", default=GIT_ROOT,
+                        help="git mode: folder in the repository laid out like a snapshot (default: top level)")
+    args = parser.parse_args(argv)
+    if bool(args.git_before) != bool(args.git_after):
+        parser.error("--git-before and --git-after must be given together")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=getattr(logging, str(args.log_level).upper(), logging.WARNING),
+                        format="%(levelname)s %(name)s: %(message)s")
+    profiler = StageProfiler(enabled=args.profile, trace_memory=args.profile_memory,
+                             cprofile_path=args.cprofile)
     print("Impact Analyzer starting...")
     # 1. find changed shared files
-    changed = list_changed_files(SNAPSHOT_BEFORE, SNAPSHOT_AFTER)
+    trees = cat = None
+    with profiler.stage("changed_files") as st:
+        if args.git_before:
+            trees = [GitTree(args.git_repo, args.git_before, args.git_root),
+                     GitTree(args.git_repo, args.git_after, args.git_root)]
+            print(f"Git mode: {args.git_before} ({trees[0].commit[:12]}) -> {args.git_after} ({trees[1].commit[:12]})")
+            cat = GitCatFile(args.git_repo)
+            changed = list_changed_files_git(trees[0], trees[1], cat, profile=PROFILE_COLUMNS)
+        else:
+            changed = list_changed_files(SNAPSHOT_BEFORE, SNAPSHOT_AFTER, profile=PROFILE_COLUMNS)
+        st.items = len(changed)
     print(f"Detected {len(changed)} changed shared files.")
     # 2. analyze code in both snapshots
-    code_before = analyze_codebase(SNAPSHOT_BEFORE)
-    code_after  = analyze_codebase(SNAPSHOT_AFTER)
+    cache = None
+    if USE_ANALYSIS_CACHE:
+        cache = AnalysisCache(ANALYSIS_CACHE_DIR, ANALYZER_VERSION, max_bytes=ANALYSIS_CACHE_MAX_BYTES)
+    work_log = {}
+    with profiler.stage("analyze_code") as st:
+        if trees:
+            with cat:
+                code_before, code_after = analyze_git_codebases(trees, cat, cache=cache, jobs=JOBS, work_log=work_log)
+        else:
+            code_before, code_after = analyze_codebases([SNAPSHOT_BEFORE, SNAPSHOT_AFTER], cache=cache, jobs=JOBS,
+                                                        diff_aware=DIFF_AWARE, work_log=work_log)
+        st.items = work_log["files_total"]
+    print(f"Analyzed {work_log['files_analyzed']} of {work_log['files_total']} python files "
+          f"({work_log['files_reused']} identical, {work_log['files_from_cache']} from cache).")
+    for label, stats in zip(("before", "after"), work_log["path_resolution"]):
+        print(f"Path resolution ({label}): {stats['resolved_local'] + stats['resolved_cross_module']} of "
+              f"{stats['sites']} open/read_csv targets ({stats['resolved_cross_module']} across modules).")
+    if cache is not None:
+        print("Analysis cache:", cache.stats())
+    trace_reports = None
+    if args.trace and trees:
+        print("Runtime tracing needs snapshot folders on disk; skipped in git mode.")
+    elif args.trace:
+        with profiler.stage("runtime_trace") as st:
+            trace_reports = {}
+            for label, root, code in (("before", SNAPSHOT_BEFORE, code_before), ("after", SNAPSHOT_AFTER, code_after)):
+                traced, report = trace_snapshot(root, code, jobs=RUNTIME_TRACE_JOBS, timeout=RUNTIME_TRACE_TIMEOUT,
+                                                compare_plain=RUNTIME_TRACE_COMPARE, repeat=RUNTIME_TRACE_REPEAT)
+                report["edges_added"] = merge_runtime(code, traced)
+                trace_reports[label] = report
+                overhead = f", tracing overhead {format_overhead(report['overhead'])}" if "overhead" in report else ""
+                print(f"Runtime trace ({label}): {report['modules_run']} modules run ({report['failed']} failed), "
+                      f"{report['edges_added']} edges not found statically{overhead}.")
+            st.items = sum(r["modules_run"] for r in trace_reports.values())
     print("Analyzed code for modules (before):", list(code_before.keys()))
     print("Analyzed code for modules (after) :", list(code_after.keys()))
+    if USE_IMPACT_INDEX:
+        with profiler.stage("impact_index") as st, ImpactIndex(IMPACT_INDEX_PATH) as index:
+            print("Impact index (before):", index.update("before", code_before))
+            print("Impact index (after) :", index.update("after", code_after))
+            st.items = work_log["files_total"]
     # 3. infer impacts (considering changed CSVs and code diffs)
-    findings = infer_impacts(changed, code_before, code_after)
-    print(f"Inferred {len(findings)} findings.")
-    # 4. call LLM optionally to enrich
-    if USE_LLM and findings:
-        print("Entering LLM Model")
-        try:
-            import config as cfg
-            findings = enrich_with_llm(findings, cfg)
-        except Exception as e:
-            print("LLM enrichment failed:", e)
-    # 5. assemble report
-    report = {
-        "summary": {
+    impact_stats = {}
+    findings = iter_impacts(changed, code_before, code_after, transitive=TRANSITIVE_IMPACTS,
+                            max_hops=TRANSITIVE_MAX_HOPS, prune=PRUNE_UNAFFECTED_READERS, stats=impact_stats)
+    if args.profile or USE_LLM:
+        # materialized so inference is timed on its own instead of inside report writing
+        with profiler.stage("infer_impacts") as st:
+            findings = list(findings)
+            st.items = len(findings)
+    # 4. call LLM optionally to enrich (needs the full list to group/batch findings)
+    llm_cache = None
+    if USE_LLM:
+        with profiler.stage("llm_enrichment") as st:
+            findings, llm_cache = enrich_findings(findings, changed)
+            st.items = len(findings)
+    # 5./6. stream findings into the reports, then write the summary
+    with StreamingReportWriter(json_path=REPORT_JSON, text_path=REPORT_TXT, ndjson_path=REPORT_NDJSON,
+                               summary_path=REPORT_SUMMARY_JSON, pretty=REPORT_PRETTY,
+                               index_path=REPORT_INDEX_JSON, shard_dir=REPORT_SHARD_DIR,
+                               compression=REPORT_COMPRESSION) as writer:
+        with profiler.stage("write_reports") as st:
+            for finding in findings:
+                writer.write_finding(finding)
+            st.items = writer.count
+        print(f"Inferred {writer.count} findings.")
+        summary = {
             "changed_files": changed,
-            "findings_count": len(findings)
-        },
-        "findings": findings
-    }
-    # 6. write reports
-    write_json_report(report, REPORT_JSON)
-    write_text_report(report, REPORT_TXT)
-    print("Reports written to:", REPORT_JSON, REPORT_TXT)
+            "findings_count": writer.count,
+            "code_analysis": {
+                "files_total": work_log["files_total"],
+                "files_analyzed": work_log["files_analyzed"],
+                "files_reused": work_log["files_reused"],
+                "files_from_cache": work_log["files_from_cache"],
+                "reanalyzed_before": work_log["analyzed"][0],
+                "reanalyzed_after": work_log["analyzed"][1],
+                "path_resolution": dict(zip(("before", "after"), work_log["path_resolution"]))
+            }
+        }
+        if PRUNE_UNAFFECTED_READERS:
+            summary["readers_pruned"] = impact_stats.get("readers_pruned", 0)
+        if trace_reports is not None:
+            summary["runtime_trace"] = trace_reports
+        if trees:
+            summary["git"] = {"repo": args.git_repo, "root": args.git_root,
+                              "before": trees[0].commit, "after": trees[1].commit, **cat.stats()}
+        if llm_cache is not None:
+            summary["llm_cache"] = llm_cache.stats()
+        if args.profile:
+            summary["timings"] = profiler.timings()
+        writer.finish(summary)
+    print("Reports written to:", REPORT_JSON, REPORT_TXT, REPORT_NDJSON, REPORT_SUMMARY_JSON, REPORT_INDEX_JSON)
+    if args.profile:
+        profiler.finish()
+        print("Stage timings:")
+        profiler.print_table()
+        if args.cprofile:
+            print("cProfile stats written to:", args.cprofile)
     print("Done.")
 
 if __name__ == "__main__":
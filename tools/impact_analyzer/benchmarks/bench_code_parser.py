@@ -0,0 +1,53 @@
+# benchmarks/bench_code_parser.py
+# Parse-and-visit scaling of CodeAnalyzer on large generated modules.
+# Run from tools/impact_analyzer:  python benchmarks/bench_code_parser.py [max_lines]
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.code_parser import CodeAnalyzer
+
+BLOCK = '''IN_{i} = os.path.join("..", "shared", "out_{i}.csv")
+with open(IN_{i}, "r", newline="") as f_{i}:
+    reader_{i} = csv.reader(f_{i})
+    header_{i} = next(reader_{i})
+    for row in reader_{i}:
+        a_{i}, b_{i}, c_{i} = row
+        total_{i} = int(a_{i}) + len(b_{i}) + len(c_{i})
+        print("row", a_{i}, b_{i}, c_{i}, total_{i})
+'''
+
+def generate_module(lines):
+    parts = ["import csv", "import os", ""]
+    i = 0
+    while len(parts) < lines:
+        parts.extend(BLOCK.format(i=i).splitlines())
+        i += 1
+    return "\n".join(parts[:lines]) + "\n"
+
+def time_analysis(src):
+    t0 = time.perf_counter()
+    tree = ast.parse(src)
+    t1 = time.perf_counter()
+    analyzer = CodeAnalyzer(src)
+    analyzer.visit(tree)
+    analyzer.results()
+    t2 = time.perf_counter()
+    return t1 - t0, t2 - t1
+
+def main():
+    max_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    sizes = [max_lines // 8, max_lines // 4, max_lines // 2, max_lines]
+    print(f"{'lines':>8} {'parse ms':>10} {'visit ms':>10} {'us/line':>9}")
+    for n in sizes:
+        # cut at a block boundary so the module stays valid
+        n -= (n - 3) % len(BLOCK.splitlines())
+        src = generate_module(n)
+        parse, visit = time_analysis(src)
+        print(f"{n:>8} {parse * 1000:>10.1f} {visit * 1000:>10.1f} {(parse + visit) * 1e6 / n:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_column_profiler.py
+# Stream-profile a generated CSV and report throughput and peak memory, for the default
+# pure Python path and (when numpy is installed) the opt-in numpy path, whose profiles must match.
+# Run from tools/impact_analyzer:  python benchmarks/bench_column_profiler.py [rows] [columns]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.column_profiler import profile_csv, np
+from profiling import peak_rss_mb
+
+def write_csv(path, rows, columns):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(",".join(f"col_{i}" for i in range(columns)) + "\n")
+        for r in range(rows):
+            f.write(",".join(f"code_{r % 89}" if i % 5 == 4 else str(r * 7 % 1000 + i) if i % 3 else f"{r % 97}.5"
+                             for i in range(columns)) + "\n")
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 17
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "big.csv")
+        write_csv(path, rows, columns)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        modes = [False, True] if np is not None else [False]
+        profiles = []
+        for use_numpy in modes:
+            t0 = time.perf_counter()
+            profile = profile_csv(path, chunk_rows=20000, use_numpy=use_numpy)
+            secs = time.perf_counter() - t0
+            profiles.append(profile)
+            label = "numpy " if use_numpy else "python"
+            # peak RSS stays flat as rows grows: only one chunk is held at a time
+            print(f"{label}: {size_mb:.0f} MB in {secs:.2f} s ({size_mb / secs:.1f} MB/s), "
+                  f"peak RSS {peak_rss_mb()} MB, col_0 -> {profile['columns']['col_0']}")
+        if np is None:
+            print("numpy not installed: only the pure Python path was measured")
+        else:
+            print("numpy and python profiles identical:", profiles[0] == profiles[1])
+
+if __name__ == "__main__":
+    main()
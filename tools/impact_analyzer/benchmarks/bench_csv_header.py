@@ -0,0 +1,42 @@
+# benchmarks/bench_csv_header.py
+# Micro-benchmark: fast-path vs Sniffer header extraction on wide CSV files.
+# Run from tools/impact_analyzer:  python benchmarks/bench_csv_header.py [columns] [repeat]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers.csv_parser import extract_csv_header
+
+def write_wide_csv(path, columns, rows=200):
+    header = [f"column_{i}" for i in range(columns)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+        for r in range(rows):
+            f.write(",".join(str(r * columns + i) for i in range(columns)) + "\n")
+    return header
+
+def bench(path, fast, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        hdr = extract_csv_header(path, fast=fast)
+    return (time.perf_counter() - t0) / repeat, hdr
+
+def main():
+    columns = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wide.csv")
+        expected = write_wide_csv(path, columns)
+        slow, hdr_slow = bench(path, False, repeat)
+        fast, hdr_fast = bench(path, True, repeat)
+    print(f"columns={columns} repeat={repeat}")
+    print(f"  sniffer : {slow * 1000:.3f} ms/file  header ok: {hdr_slow == expected}")
+    print(f"  fast    : {fast * 1000:.3f} ms/file  header ok: {hdr_fast == expected}")
+    if fast > 0:
+        print(f"  speedup : {slow / fast:.1f}x")
+
+if __name__ == "__main__":
+    main()
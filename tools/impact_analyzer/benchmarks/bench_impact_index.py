@@ -0,0 +1,44 @@
+# benchmarks/bench_impact_index.py
+# Build the SQLite impact index for a synthetic estate and time interactive queries.
+# Run from tools/impact_analyzer:  python benchmarks/bench_impact_index.py [modules]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph.impact_index import ImpactIndex
+from bench_dependency_graph import make_analysis
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - t0) * 1000, result
+
+def main():
+    modules = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    analysis = make_analysis(modules * 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        with ImpactIndex(os.path.join(tmp, "index.sqlite")) as index:
+            ms, stats = timed(index.update, "after", analysis)
+            print(f"modules={modules}")
+            print(f"  initial update    : {ms:.0f} ms  {stats}")
+            # touch one file: only its rows are rewritten
+            country = next(iter(analysis))
+            relpath = next(iter(analysis[country]))
+            analysis[country][relpath]["file_reads"].append((99, "../shared/extra.csv"))
+            ms, stats = timed(index.update, "after", analysis)
+            print(f"  incremental update: {ms:.0f} ms  {stats}")
+            target = f"out_{modules // 2}.csv"
+            ms, rows = timed(index.readers_of, target)
+            print(f"  readers-of        : {ms:.2f} ms  ({len(rows)} rows)")
+            ms, rows = timed(index.writers_of, target)
+            print(f"  writers-of        : {ms:.2f} ms  ({len(rows)} rows)")
+            ms, rows = timed(index.downstream_of, target, max_hops=2)
+            print(f"  downstream-of (2) : {ms:.2f} ms  ({len(rows)} modules)")
+            ms, rows = timed(index.downstream_of, "out_0.csv")
+            print(f"  downstream-of all : {ms:.0f} ms  ({len(rows)} modules)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_path_resolution.py
+# Coverage and cost of resolving open()/read_csv() targets, per file and across modules.
+# Run from tools/impact_analyzer:
+#   python benchmarks/bench_path_resolution.py --countries 50 --modules 12
+#   python benchmarks/bench_path_resolution.py --root ../../snapshots/after
+# The synthetic tree mixes the path styles seen in real pipelines: literals,
+# os.path.join, pathlib "/" chains, f-strings, Path.open and names imported from
+# a per-country paths.py (which itself re-exports a root from common/settings.py).
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer import analyze_codebases
+from parsers.path_resolver import resolve_paths
+
+STYLES = [
+    ("literal", 'with open("../shared/{out}", "w") as f:\n    f.write("x")\n'),
+    ("os.path.join", 'OUT = os.path.join("..", "shared", "{out}")\nwith open(OUT, "w") as f:\n    f.write("x")\n'),
+    ("pathlib", 'OUT = Path("..") / "shared" / "{out}"\nwith OUT.open("w") as f:\n    f.write("x")\n'),
+    ("f-string", 'NAME = "{stem}"\nOUT = f"../shared/{{NAME}}.csv"\nwith open(OUT, "w") as f:\n    f.write("x")\n'),
+    ("from-import", 'from paths import SHARED\nIN = SHARED / "{inp}"\nwith open(IN) as f:\n    f.read()\n'),
+    ("module-attr", 'import paths\ndf = pd.read_csv(paths.SHARED / "{inp}")\n'),
+    ("import-open", 'from paths import SHARED\n(SHARED / f"{inp_stem}{{SUFFIX}}").open()\n'),
+    ("dynamic", 'for day in range(7):\n    open(f"../shared/{stem}_{{day}}.csv")\n'),
+]
+
+def _module(style, country, k):
+    stem = f"module_{k}_output_{country}"
+    prev = f"module_{k - 1}_output_{country}"
+    body = dict(STYLES)[style].format(out=stem + ".csv", stem=stem, inp=prev + ".csv", inp_stem=prev)
+    return ("import os\nimport pandas as pd\nfrom pathlib import Path\n"
+            "SUFFIX = \".csv\"\n\n" + body)
+
+def generate(root, countries, modules):
+    common = os.path.join(root, "common")
+    os.makedirs(common, exist_ok=True)
+    with open(os.path.join(common, "settings.py"), "w", encoding="utf-8") as f:
+        f.write('from pathlib import Path\n\nROOT = Path("..")\n')
+    names = [style for style, _ in STYLES]
+    for c in range(countries):
+        country = f"country_{c:04d}"
+        cdir = os.path.join(root, country)
+        os.makedirs(cdir, exist_ok=True)
+        with open(os.path.join(cdir, "paths.py"), "w", encoding="utf-8") as f:
+            f.write("from common.settings import ROOT\n\nSHARED = ROOT / \"shared\"\n")
+        for k in range(modules):
+            with open(os.path.join(cdir, f"module_{k}.py"), "w", encoding="utf-8") as f:
+                f.write(_module(names[k % len(names)], country, k))
+
+def coverage_by_style(code):
+    """{ style: (resolved targets, targets) } for the synthetic tree (style from the module number)."""
+    names = [style for style, _ in STYLES]
+    out = {}
+    for country, analyses in code.items():
+        for relpath, analysis in analyses.items():
+            stem = os.path.splitext(os.path.basename(relpath))[0]
+            if not stem.startswith("module_") or not analysis:
+                continue
+            style = names[int(stem.split("_")[1]) % len(names)]
+            done, total = out.get(style, (0, 0))
+            reads = analysis["file_reads"]
+            out[style] = (done + sum(1 for _, v in reads if v and v.endswith(".csv")), total + max(1, len(reads)))
+    return out
+
+def report(root, repeat):
+    best_analyze = best_resolve = None
+    for _ in range(max(1, repeat)):
+        work_log = {}
+        t0 = time.perf_counter()
+        code = analyze_codebases([root], work_log=work_log)[0]
+        elapsed = time.perf_counter() - t0
+        # resolve_paths already ran inside analyze_codebases; time a second pass on its own
+        t1 = time.perf_counter()
+        stats = resolve_paths(code)
+        resolve = time.perf_counter() - t1
+        best_analyze = elapsed if best_analyze is None else min(best_analyze, elapsed)
+        best_resolve = resolve if best_resolve is None else min(best_resolve, resolve)
+    files = work_log["files_total"]
+    local = stats["resolved_local"] / stats["sites"] if stats["sites"] else 1.0
+    print(f"  python files           : {files}")
+    print(f"  analysis (incl. pass)  : {best_analyze * 1000:9.1f} ms  ({best_analyze / max(files, 1) * 1e6:.0f} us/file)")
+    print(f"  cross-module pass      : {best_resolve * 1000:9.1f} ms  "
+          f"({stats['export_tables']} export tables, {stats['export_lookups']} lookups)")
+    print(f"  open/read_csv targets  : {stats['sites']}")
+    print(f"  resolved in-file       : {stats['resolved_local']}  ({local:.1%})")
+    print(f"  resolved across modules: {stats['resolved_cross_module']}")
+    print(f"  coverage               : {stats['coverage']:.1%}")
+    return code
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark path resolution coverage and cost.")
+    parser.add_argument("--root", default=None, help="snapshot folder to measure instead of a synthetic tree")
+    parser.add_argument("--countries", type=int, default=20)
+    parser.add_argument("--modules", type=int, default=16, help="modules per country (styles are cycled)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs; the fastest is kept")
+    args = parser.parse_args()
+    if args.root:
+        report(args.root, args.repeat)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        generate(tmp, args.countries, args.modules)
+        code = report(tmp, args.repeat)
+        print("  by style (resolved / targets):")
+        for style, (done, total) in coverage_by_style(code).items():
+            print(f"    {style:<13} {done:6d} / {total}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/bench_pipeline.py
+# Time each analyzer stage on a synthetic snapshot pair and compare with a baseline.
+# Run from tools/impact_analyzer:
+#   python benchmarks/bench_pipeline.py --countries 50 --modules 8 --out bench.json
+#   python benchmarks/bench_pipeline.py ... --baseline bench.json --threshold 1.25
+# Exits with status 1 when a stage is slower than threshold x its baseline time.
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from make_synthetic_snapshots import generate
+from analyzer import gather_headers_recursive, diff_headers, analyze_codebase, infer_impacts
+from reports.report_generator import StreamingReportWriter
+
+STAGES = ["gather_headers", "analyze_codebase", "infer_impacts", "write_reports"]
+
+def run_stages(root, out_dir):
+    """One pass over all stages. Returns ({stage: seconds}, {stage: item count})."""
+    before, after = os.path.join(root, "before"), os.path.join(root, "after")
+    times, counts = {}, {}
+    t0 = time.perf_counter()
+    headers_before = gather_headers_recursive(before)
+    headers_after = gather_headers_recursive(after)
+    times["gather_headers"] = time.perf_counter() - t0
+    counts["gather_headers"] = len(headers_before) + len(headers_after)
+    changed = diff_headers(headers_before, headers_after)
+
+    t0 = time.perf_counter()
+    code_before = analyze_codebase(before)
+    code_after = analyze_codebase(after)
+    times["analyze_codebase"] = time.perf_counter() - t0
+    counts["analyze_codebase"] = sum(len(v) for v in code_before.values()) + sum(len(v) for v in code_after.values())
+
+    t0 = time.perf_counter()
+    findings = infer_impacts(changed, code_before, code_after)
+    times["infer_impacts"] = time.perf_counter() - t0
+    counts["infer_impacts"] = len(findings)
+
+    t0 = time.perf_counter()
+    with StreamingReportWriter(json_path=os.path.join(out_dir, "impact_report.json"),
+                               text_path=os.path.join(out_dir, "impact_report.txt"),
+                               ndjson_path=os.path.join(out_dir, "impact_findings.ndjson")) as writer:
+        for f in findings:
+            writer.write_finding(f)
+        writer.finish({"changed_files": changed, "findings_count": writer.count})
+    times["write_reports"] = time.perf_counter() - t0
+    counts["write_reports"] = writer.count
+    return times, counts
+
+def compare(results, baseline, threshold, min_delta=0.005):
+    """
+    [(stage, seconds, baseline seconds, ratio)] for stages slower than threshold x
+    baseline; differences under min_delta seconds are treated as noise.
+    """
+    regressions = []
+    for stage in STAGES:
+        base = baseline.get("stages", {}).get(stage, {}).get("seconds")
+        now = results["stages"][stage]["seconds"]
+        if base and now > base * threshold and now - base > min_delta:
+            regressions.append((stage, now, base, now / base))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every analyzer stage on synthetic snapshots.")
+    parser.add_argument("--countries", type=int, default=20)
+    parser.add_argument("--modules", type=int, default=8)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--changed", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the fastest is kept")
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown ratio per stage")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "snapshots")
+        manifest = generate(root, args.countries, args.modules, args.width, args.rows, args.changed)
+        best, counts = {}, {}
+        for _ in range(max(1, args.repeat)):
+            times, counts = run_stages(root, tmp)
+            for stage, secs in times.items():
+                best[stage] = min(secs, best.get(stage, secs))
+
+    results = {
+        "params": manifest,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "stages": {s: {"seconds": round(best[s], 6), "items": counts[s]} for s in STAGES}
+    }
+    for stage in STAGES:
+        print(f"  {stage:<17}: {best[stage] * 1000:9.1f} ms  ({counts[stage]} items)")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != manifest:
+            print("warning: baseline was recorded with different parameters")
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms / 1000)
+        for stage, now, base, ratio in regressions:
+            print(f"REGRESSION {stage}: {now * 1000:.1f} ms vs {base * 1000:.1f} ms baseline ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No stage slower than {args.threshold}x baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
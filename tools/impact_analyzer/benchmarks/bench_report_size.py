@@ -0,0 +1,57 @@
+# benchmarks/bench_report_size.py
+# Memory held by the findings list and JSON report size as CSV width grows. Findings
+# reference interned schemas by ID and build their text on output, so both should
+# stay flat per finding while the schema table alone grows with the column count.
+# The last column is the transfer size of the report's gzip copy.
+# Run from tools/impact_analyzer:
+#   python benchmarks/bench_report_size.py --widths 20 200 2000 --countries 20
+import argparse
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from make_synthetic_snapshots import generate
+from analyzer import gather_headers_recursive, diff_headers, analyze_codebase, iter_impacts
+from reports.report_generator import StreamingReportWriter
+
+def measure(width, countries, modules, out_dir):
+    with tempfile.TemporaryDirectory() as root:
+        generate(root, countries=countries, modules=modules, width=width, rows=5, changed=0.5)
+        before, after = os.path.join(root, "before"), os.path.join(root, "after")
+        changed = diff_headers(gather_headers_recursive(before), gather_headers_recursive(after))
+        code_before, code_after = analyze_codebase(before), analyze_codebase(after)
+    tracemalloc.start()
+    findings = list(iter_impacts(changed, code_before, code_after, transitive=True))
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    path = os.path.join(out_dir, f"report_{width}.json")
+    with StreamingReportWriter(json_path=path, pretty=False, compression={"gzip": 6}) as writer:
+        for f in findings:
+            writer.write_finding(f)
+        writer.finish({"changed_files": changed, "findings_count": writer.count})
+    with open(path, encoding="utf-8") as f:
+        schemas = len(json.dumps(json.load(f)["summary"]["schemas"], separators=(",", ":")))
+    return len(findings), held, os.path.getsize(path), schemas, os.path.getsize(path + ".gz")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark findings memory and report size against CSV width.")
+    parser.add_argument("--widths", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--countries", type=int, default=20)
+    parser.add_argument("--modules", type=int, default=8)
+    args = parser.parse_args()
+    print(f"{'width':>6} {'findings':>9} {'held/finding':>13} {'report':>11} {'schema table':>13} "
+          f"{'rest/finding':>13} {'gzip':>9}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        for width in args.widths:
+            n, held, size, schemas, gz = measure(width, args.countries, args.modules, out_dir)
+            per = max(n, 1)
+            print(f"{width:6d} {n:9d} {held / per:11.0f} B {size / 1024:8.1f} KB {schemas / 1024:10.1f} KB "
+                  f"{(size - schemas) / per:11.0f} B {gz / 1024:6.1f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/llm_stub_server.py
+# Local OpenAI-compatible /chat/completions stub that simulates latency and 429s.
+# Run from tools/impact_analyzer:
+#   python benchmarks/llm_stub_server.py --port 8099 --latency 0.3 --rate-429 0.2
+# then point LLM_BASE_URL at http://127.0.0.1:8099/v1 (any non-empty API key works).
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def stub_answer(prompt):
+    """Deterministic answer for a prompt, so callers can check ordering."""
+    return "stub explanation " + hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+
+def stub_content(prompt):
+    # batched prompts ask for a JSON array with one entry per [Fn] finding
+    ids = re.findall(r"^\[(F\d+)\]", prompt, re.MULTILINE)
+    if ids and "JSON array" in prompt:
+        return json.dumps([{"id": i, "explanation": stub_answer(f"{prompt}#{i}")} for i in ids])
+    return stub_answer(prompt)
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.2
+    jitter = 0.05
+    rate_429 = 0.0
+    stats = {"requests": 0, "throttled": 0}
+    lock = threading.Lock()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, code, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # client gave up (timeout)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with self.lock:
+            self.stats["requests"] += 1
+            throttled = random.random() < self.rate_429
+            if throttled:
+                self.stats["throttled"] += 1
+        if throttled:
+            self._send(429, {"error": {"message": "rate limited"}}, {"Retry-After": "0.1"})
+            return
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        messages = payload.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        self._send(200, {
+            "id": "stub",
+            "object": "chat.completion",
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": stub_content(prompt)}}]
+        })
+
+def start_stub_server(port=0, latency=0.2, rate_429=0.0):
+    """Start the stub in a background thread; returns (server, base_url)."""
+    handler = type("Handler", (StubHandler,), {
+        "latency": latency, "rate_429": rate_429,
+        "stats": {"requests": 0, "throttled": 0}, "lock": threading.Lock()
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--rate-429", type=float, default=0.0)
+    args = ap.parse_args()
+    server, url = start_stub_server(args.port, args.latency, args.rate_429)
+    print("LLM stub listening on", url)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
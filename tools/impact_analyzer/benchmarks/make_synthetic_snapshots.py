@@ -0,0 +1,158 @@
+# benchmarks/make_synthetic_snapshots.py
+# Generate a BEFORE/AFTER snapshot pair shaped like snapshots/: country folders with
+# chains of module_a..d style writers/readers and a shared/ folder of CSV outputs.
+# Run from tools/impact_analyzer:
+#   python benchmarks/make_synthetic_snapshots.py OUT_DIR [--countries N] [--modules N]
+#          [--width N] [--rows N] [--changed F] [--seed N]
+import argparse
+import json
+import os
+import random
+import shutil
+
+# module kinds cycled along each chain, like module_a (writer) .. module_d (DictReader)
+KINDS = ["writer", "passthrough", "positional", "dictreader"]
+
+def _header(width, extra=False):
+    cols = [f"col_{i}" for i in range(width)]
+    if extra:
+        cols.insert(width // 2, "new_flag")
+    return cols
+
+def _writer_module(country, k, width):
+    return f'''# module_{k}.py
+import csv
+import os
+
+OUT = os.path.join("..","shared","module_{k}_output_{country}.csv")
+os.makedirs(os.path.dirname(OUT), exist_ok=True)
+
+header = {_header(width)!r}
+
+if __name__ == "__main__":
+    with open(OUT, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(20):
+            writer.writerow([str(i)] * len(header))
+'''
+
+def _passthrough_module(country, k, changed):
+    insert = '''
+new_header = header[:len(header) // 2] + ["new_flag"] + header[len(header) // 2:]
+rows = [r[:len(r) // 2] + ["x"] + r[len(r) // 2:] for r in rows]
+''' if changed else '''
+new_header = header
+'''
+    return f'''# module_{k}.py
+import csv
+import os
+
+IN = os.path.join("..","shared","module_{k - 1}_output_{country}.csv")
+OUT = os.path.join("..","shared","module_{k}_output_{country}.csv")
+
+with open(IN, "r", newline="") as fin:
+    reader = csv.reader(fin)
+    header = next(reader)
+    rows = list(reader)
+{insert}
+with open(OUT, "w", newline="") as fout:
+    writer = csv.writer(fout)
+    writer.writerow(new_header)
+    for r in rows:
+        writer.writerow(r)
+'''
+
+def _positional_module(country, k, width):
+    names = ", ".join(f"c{i}" for i in range(width))
+    return f'''# module_{k}.py
+import csv
+import os
+
+IN = os.path.join("..","shared","module_{k - 1}_output_{country}.csv")
+
+with open(IN, "r", newline="") as f:
+    reader = csv.reader(f)
+    header = next(reader)
+    for row in reader:
+        ({names},) = row
+'''
+
+def _dictreader_module(country, k):
+    return f'''# module_{k}.py
+import csv
+import os
+
+IN = os.path.join("..","shared","module_{k - 2}_output_{country}.csv")
+
+with open(IN, "r", newline="") as f:
+    reader = csv.DictReader(f)
+    for row in reader:
+        value = row.get("col_0")
+'''
+
+def _write_csv(path, header, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(",".join(header) + "\n")
+        for r in range(rows):
+            f.write(",".join(str(r) for _ in header) + "\n")
+
+def generate(out_dir, countries=10, modules=8, width=20, rows=100, changed=0.1, seed=1):
+    """
+    Write out_dir/before and out_dir/after. Each country has `modules` modules in
+    chains of four (writer -> passthrough -> positional reader / DictReader).
+    A `changed` fraction of the passthrough modules insert a column in AFTER,
+    which changes their shared output header. Returns a small manifest dict.
+    """
+    rng = random.Random(seed)
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    names = [f"country_{i:04d}" for i in range(countries)]
+    passthroughs = [(c, k) for c in names for k in range(modules) if KINDS[k % 4] == "passthrough"]
+    changed_set = set(rng.sample(passthroughs, int(round(len(passthroughs) * changed))))
+    for snap in ("before", "after"):
+        shared = os.path.join(out_dir, snap, "shared")
+        os.makedirs(shared, exist_ok=True)
+        for country in names:
+            cdir = os.path.join(out_dir, snap, country)
+            os.makedirs(cdir, exist_ok=True)
+            for k in range(modules):
+                kind = KINDS[k % 4]
+                is_changed = snap == "after" and (country, k) in changed_set
+                if kind == "writer":
+                    src = _writer_module(country, k, width)
+                elif kind == "passthrough":
+                    src = _passthrough_module(country, k, is_changed)
+                elif kind == "positional":
+                    src = _positional_module(country, k, width)
+                else:
+                    src = _dictreader_module(country, k)
+                with open(os.path.join(cdir, f"module_{k}.py"), "w", encoding="utf-8") as f:
+                    f.write(src)
+                if kind in ("writer", "passthrough"):
+                    _write_csv(os.path.join(shared, f"module_{k}_output_{country}.csv"),
+                               _header(width, extra=is_changed), rows)
+    manifest = {
+        "countries": countries, "modules": modules, "width": width, "rows": rows,
+        "changed_fraction": changed, "changed_csvs": len(changed_set),
+        "python_files": 2 * countries * modules
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic BEFORE/AFTER snapshots.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--countries", type=int, default=10)
+    parser.add_argument("--modules", type=int, default=8, help="modules per country")
+    parser.add_argument("--width", type=int, default=20, help="CSV columns")
+    parser.add_argument("--rows", type=int, default=100, help="CSV data rows")
+    parser.add_argument("--changed", type=float, default=0.1, help="fraction of passthrough modules that change schema")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    manifest = generate(args.out_dir, args.countries, args.modules, args.width, args.rows, args.changed, args.seed)
+    print(json.dumps(manifest, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,15 @@ import os
 SNAPSHOT_BEFORE = r"D:\DMCJ_ACADEMY\Projects\MDHack\workspace\snapshots\before"
 SNAPSHOT_AFTER  = r"D:\DMCJ_ACADEMY\Projects\MDHack\workspace\snapshots\after"
 
+# Git mode: read both snapshots from revisions of one repository instead of two checkouts
+# (also --git-before/--git-after/--git-repo/--git-root). GIT_ROOT is the folder laid out
+# like a snapshot ("" = repository top level).
+GIT_REPO = "."
+GIT_REV_BEFORE = None
+GIT_REV_AFTER = None
+GIT_ROOT = ""
+GIT_HEADER_BYTES = 64 * 1024   # bytes of each changed CSV blob read for its header
+
 
 # Shared folder where modules write outputs (relative to project root)
 SHARED_FOLDER = os.path.join("..","..","workspace\shared")
@@ -16,3 +25,92 @@ USE_LLM = True
 # Output report path
 REPORT_JSON = os.path.join("..","..","docs","impact_report.json")
 REPORT_TXT  = os.path.join("..","..","docs","impact_report.txt")
+REPORT_NDJSON = os.path.join("..","..","docs","impact_findings.ndjson")
+REPORT_SUMMARY_JSON = os.path.join("..","..","docs","impact_summary.json")
+# Sharded report for the HTML viewer: small index + one findings shard per changed file
+REPORT_INDEX_JSON = os.path.join("..","..","docs","impact_report_index.json")
+REPORT_SHARD_DIR = os.path.join("..","..","docs","impact_shards")
+# Pretty-print (indent) the JSON reports; False writes compact JSON
+REPORT_PRETTY = True
+# Compressed copies of every report (x.json.gz, x.json.br) next to the plain files, which stay
+# in place; the HTML viewer fetches the .gz files when present. { format: level }, {} disables:
+# gzip levels 1-9, brotli quality 0-11 (needs the optional brotli package, skipped otherwise)
+REPORT_COMPRESSION = {"gzip": 6, "br": 9}
+
+# On-disk cache of per-file code analyses (keyed by file content hash)
+USE_ANALYSIS_CACHE = True
+ANALYSIS_CACHE_DIR = os.path.join(".cache","analysis")
+ANALYSIS_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Worker processes for code analysis (1 = serial, 0 = one per CPU core)
+JOBS = 1
+
+# Hash BEFORE/AFTER files first and analyze identical contents only once
+DIFF_AWARE = True
+
+# CSV discovery: file globs to include, directory/file globs to prune, header reader threads
+CSV_INCLUDE = ["*.csv", "*.csv.gz", "*.csv.bz2", "*.csv.zst"]   # .zst needs the zstandard package
+CSV_EXCLUDE = ["venv", ".venv", ".git", "node_modules", "__pycache__", "archive", "archives", "*.zip", "*.tar*"]
+HEADER_READ_THREADS = 8
+
+# Column profiles (type, null rate, distinct count, min/max) of CSVs whose contents changed.
+# Rows are streamed PROFILE_CHUNK_ROWS at a time; PROFILE_MAX_ROWS = None profiles whole files.
+PROFILE_COLUMNS = True
+PROFILE_CHUNK_ROWS = 50000
+PROFILE_MAX_ROWS = None
+PROFILE_NULL_RATE_DELTA = 0.2   # null-rate change that counts as a column change
+PROFILE_USE_NUMPY = False   # numpy chunk path (requirements-optional.txt); slower than pure Python on most files
+
+# Report a reader only when the columns it uses (row["x"], row.get, row[i], unpack width,
+# usecols...) are removed, renamed or shifted by the change; readers whose row handling
+# cannot be followed are always reported. Off by default: it drops findings (12 -> 8 on
+# the sample snapshots) that the other heuristics report
+PRUNE_UNAFFECTED_READERS = False
+
+# Runtime I/O tracing (also --trace): run each country's modules in order in a sandbox copy
+# of the snapshot with an audit hook on open(), and add the files they really read/write
+# (dynamic paths the AST cannot fold) to the static analyses. Executes the snapshot code.
+RUNTIME_TRACE = False
+RUNTIME_TRACE_JOBS = 4          # country pipelines traced in parallel
+RUNTIME_TRACE_TIMEOUT = 120     # seconds per module
+RUNTIME_TRACE_COMPARE = False   # also run untraced and report the tracing overhead
+RUNTIME_TRACE_REPEAT = 5        # with RUNTIME_TRACE_COMPARE, runs per mode (median and spread reported)
+
+# Follow schema changes through intermediate modules (writer -> file -> reader chains)
+TRANSITIVE_IMPACTS = True
+TRANSITIVE_MAX_HOPS = None   # None = no depth limit
+
+# Persistent SQLite index of the analyses (query with: python -m graph.impact_index readers-of <file>)
+USE_IMPACT_INDEX = True
+IMPACT_INDEX_PATH = os.path.join(".cache","impact_index.sqlite")
+
+# Watch mode (python watch.py): poll interval and quiet period before re-analysing, in seconds
+WATCH_POLL_INTERVAL = 0.5
+WATCH_DEBOUNCE = 0.3
+
+# Logging level of the analyzer (DEBUG lists every folder, file and header; override with --log-level)
+LOG_LEVEL = "WARNING"
+
+# LLM endpoint (OpenAI-compatible) and async enrichment settings
+LLM_ASYNC = True
+LLM_BASE_URL = "https://api.groq.com/openai/v1"
+LLM_API_KEY_ENV = "GROQ_API_KEY"
+GROQ_MODEL = "groq/compound-mini"
+LLM_CONCURRENCY = 8        # requests in flight
+LLM_RATE_PER_SEC = 4.0     # token-bucket rate limit (0 = unlimited)
+LLM_TIMEOUT = 60.0         # seconds per request
+LLM_MAX_RETRIES = 4        # retries on 429 / 5xx / timeouts
+LLM_BACKOFF_BASE = 0.5     # seconds, doubled per attempt (with jitter)
+LLM_BACKOFF_MAX = 20.0
+LLM_TEMPERATURE = 0.0
+LLM_MAX_TOKENS = 480
+
+# Persistent LLM explanation cache (SQLite), keyed by normalized prompt + model + temperature
+USE_LLM_CACHE = True
+LLM_CACHE_PATH = os.path.join(".cache","llm_cache.sqlite")
+LLM_CACHE_TTL = 30 * 24 * 3600   # seconds
+LLM_CACHE_MAX_ENTRIES = 10000
+
+# Send one batched LLM request per cluster of equivalent findings (same schema delta + evidence pattern)
+LLM_GROUP_FINDINGS = True
+LLM_GROUP_MAX = 10   # findings per batched request
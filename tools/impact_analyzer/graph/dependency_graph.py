@@ -1,7 +1,15 @@
 # graph/dependency_graph.py
 import os
 import glob
+import posixpath
+import re
+from array import array
+from bisect import bisect_left
 from collections import defaultdict
+from itertools import compress, repeat
+from operator import getitem, itemgetter
+
+from parsers.csv_parser import dataset_name
 
 def find_python_modules(root_snapshot):
     """
@@ -34,3 +42,368 @@ def build_reader_map(modules, code_analysis_results):
                 files.add(simple)
         reader_map[module_name] = files
     return reader_map
+
+def normalize_shared_path(value):
+    """
+    Normalize a read/write target to the key used for matching shared files.
+    Values may be literal paths ('../shared/x.csv', '..\\shared\\x.csv'),
+    joined paths or unresolved variable names ('IN'); we key on the basename.
+    Compressed files key on the CSV they hold ('x.csv.gz' -> 'x.csv').
+    Impact matching uses shared_file_key, which falls back to this name only for
+    targets it cannot place in the snapshot.
+    """
+    if not value:
+        return None
+    return dataset_name(os.path.basename(str(value).replace("\\", "/")))
+
+# targets that cannot be placed in the snapshot: leftover expressions, drive letters
+# and URLs (':'); absolute paths are checked with startswith("/")
+_UNPLACED = re.compile(r"[{}()\[\]'\"*?<>|,+:]")
+ANY_FOLDER = "*/"
+
+def shared_file_key(value, relpath=None):
+    """
+    Key of the shared file a read/write target names: its dataset path relative
+    to the snapshot root. Relative targets are taken from the folder of the module
+    that opens them (relpath), so '../shared/x.csv' in 'country_a/m.py' is
+    'shared/x.csv', and 'out.csv' opened in two country folders are two files.
+    Without relpath, value is already relative to the snapshot root.
+    Targets that cannot be placed (unresolved names like 'IN', absolute paths,
+    paths above the snapshot root) key on ANY_FOLDER + their basename key, which
+    stands for a file of that name in any folder (see file_keys).
+    """
+    return _placed_key(value, posixpath.dirname(relpath.replace("\\", "/")) if relpath else "")
+
+def _placed_key(value, folder):
+    ups, rest = _split_target(value)
+    return rest if ups is None else _join_target(_folder_prefix(folder, ups), rest)
+
+def _split_target(value):
+    """
+    (ups, rest) of a relative target: the number of leading '..' and the dataset
+    path after them. (None, key) when the key does not depend on the folder.
+    """
+    if not value:
+        return None, None
+    path = str(value).replace("\\", "/")
+    if path.startswith("/") or _UNPLACED.search(path):
+        return None, ANY_FOLDER + normalize_shared_path(path)
+    ups = 0
+    while True:
+        while path.startswith("../"):
+            ups += 1
+            path = path[3:]
+        if "./" not in path and "//" not in path and not path.endswith("/"):
+            break
+        path = posixpath.normpath(path)   # rarely needed, normpath is the slow part
+    rest = dataset_name(path)
+    name = rest.rpartition("/")[2]
+    if "." not in name or name == "..":   # a bare name such as 'IN', or a folder
+        return None, ANY_FOLDER + name
+    return ups, rest
+
+def _folder_prefix(folder, ups):
+    """What a target with `ups` leading '..' is relative to, as a key prefix; None above the snapshot root."""
+    parts = folder.split("/") if folder else []
+    if ups > len(parts):
+        return None
+    kept = parts[:len(parts) - ups]
+    return "/".join(kept) + "/" if kept else ""
+
+def _join_target(prefix, rest):
+    return ANY_FOLDER + rest.rpartition("/")[2] if prefix is None else prefix + rest
+
+def file_keys(path):
+    """Index keys a snapshot file ('shared/x.csv') is matched on: its own key and its any-folder key."""
+    key = shared_file_key(path)
+    if key is None:
+        return ()
+    wildcard = ANY_FOLDER + normalize_shared_path(path)
+    return (key,) if key == wildcard else (key, wildcard)
+
+def build_file_index(code_analysis_results):
+    """
+    Invert the analyses into { shared_file_key: [(country, relpath, lineno, role), ...] }
+    where role is "writes" or "reads". Built once, so each changed file can look up
+    its writers and readers directly (under file_keys) instead of scanning every
+    analysed file. Entries keep the iteration order of code_analysis_results.
+    """
+    index = defaultdict(list)
+    for country, analyses in code_analysis_results.items():
+        for relpath, analysis in analyses.items():
+            for role, field in (("writes", "file_writes"), ("reads", "file_reads")):
+                for fr in analysis.get(field, []):
+                    if not fr:
+                        continue
+                    key = shared_file_key(fr[1], relpath)
+                    if key:
+                        index[key].append((country, relpath, fr[0], role))
+    return dict(index)
+
+_value = itemgetter(1)
+
+class _FileIds(dict):
+    """
+    { raw target value: file node id } for the modules of folders that share
+    `prefixes` ({ '..' count: key prefix }), filled on first lookup. ids is the
+    { key: node id } map shared by all tables; unusable values map to -1.
+    """
+
+    def __init__(self, prefixes, split, ids, first):
+        super().__init__()
+        self.prefixes = prefixes
+        self.split = split
+        self.ids = ids
+        self.first = first
+
+    def __missing__(self, value):
+        ups, key = self.split[value]
+        if ups is not None:
+            key = _join_target(self.prefixes[ups], key)
+        self[value] = node = self.ids.setdefault(key, self.first + len(self.ids)) if key else -1
+        return node
+
+def io_sites(analysis):
+    """
+    (written, read) (line, path) entries of the files a module really opens:
+    write-mode and read-mode handles (open(), Path.open(), read_csv(); see
+    column_access) plus the I/O observed at runtime, whose line is None. Path
+    assignments and write-mode opens are not reads.
+    Analyses without column_access pair the legacy fields: a write-mode open() is
+    listed in file_reads and file_writes under the same line, while a path
+    assignment (IN = "../shared/x.csv") only adds a file_writes entry, so an open
+    is a write when file_writes has the same (line, path), else a read.
+    """
+    opens = analysis.get("file_reads", ())
+    written, read = [], []
+    if "column_access" in analysis:
+        for access in analysis["column_access"]:
+            if access["read"] < len(opens):
+                (written if access["mode"] == "w" else read).append(opens[access["read"]])
+        runtime = analysis.get("runtime_io")
+        if runtime:
+            written.extend((None, p) for p in runtime["writes"])
+            read.extend((None, p) for p in runtime["reads"])
+        return written, read
+    marked = analysis.get("file_writes")
+    if not marked:
+        return written, [fr for fr in opens if fr]
+    marked = set(map(tuple, filter(None, marked)))   # entries are lists after a JSON round trip
+    for fr in opens:
+        if fr:
+            (written if tuple(fr) in marked else read).append(fr)
+    return written, read
+
+def io_paths(analysis):
+    """(written, read) path values of io_sites()."""
+    written, read = io_sites(analysis)
+    return list(map(_value, written)), list(map(_value, read))
+
+MODULE, FILE = 0, 1
+
+class DependencyGraph:
+    """
+    Directed writer -> file -> reader graph over a snapshot.
+    Nodes are modules (country, relpath) and shared files (normalized path),
+    numbered 0..n-1. Edges are stored as CSR integer arrays (offsets/targets),
+    so traversals touch flat arrays instead of dicts of sets.
+    """
+
+    def __init__(self):
+        self.ids = {}               # (kind, name) -> node id
+        self.names = []             # node id -> name
+        self.kinds = bytearray()    # node id -> MODULE / FILE
+        self._src = array("i")
+        self._dst = array("i")
+        self.offsets = None
+        self.targets = None
+
+    def node(self, kind, name):
+        key = (kind, name)
+        nid = self.ids.get(key)
+        if nid is None:
+            nid = len(self.names)
+            self.ids[key] = nid
+            self.names.append(name)
+            self.kinds.append(kind)
+        return nid
+
+    def add_edge(self, src, dst):
+        self._src.append(src)
+        self._dst.append(dst)
+        self.offsets = None
+
+    def _add_nodes(self, kind, names):
+        """Number a batch of new, distinct names in one go; returns the first id."""
+        first = len(self.names)
+        self.ids.update(zip(zip(repeat(kind), names), range(first, first + len(names))))
+        self.names.extend(names)
+        self.kinds.extend(repeat(kind, len(names)))
+        return first
+
+    @classmethod
+    def from_analysis(cls, code_analysis_results):
+        """
+        Build the graph from { country: { relpath: analysis } }: module -> file for
+        files opened for writing, file -> module for files opened for reading (io_sites).
+        Edges are gathered as flat id lists and handed to freeze() in one piece.
+        """
+        graph = cls()
+        modules = []
+        w_mod, w_val, r_val, r_mod = [], [], [], []
+        for country, analyses in code_analysis_results.items():
+            for relpath, analysis in analyses.items():
+                mod = len(modules)
+                modules.append((country, relpath))
+                written, read = io_sites(analysis)
+                if written:
+                    w_mod += repeat(mod, len(written))
+                    w_val += written
+                if read:
+                    r_mod += repeat(mod, len(read))
+                    r_val += read
+        graph._add_nodes(MODULE, modules)
+        # targets are keyed relative to the module's folder (shared_file_key): each
+        # distinct raw value is split once into ('..' count, rest), and folders that
+        # resolve every count in use to the same prefix share one value -> file id
+        # table, so an edge costs one lookup; unusable values map to -1
+        split = {}
+        for value in set(map(_value, w_val + r_val)):
+            split[value] = _split_target(value)
+        counts = {ups for ups, _ in split.values()} - {None}
+        folders = [relpath.replace("\\", "/").rpartition("/")[0] for _, relpath in modules]
+        file_ids = {}
+        shared = {}
+        tables = {}
+        for folder in set(folders):
+            prefixes = {ups: _folder_prefix(folder, ups) for ups in counts}
+            same = tuple(sorted(prefixes.items()))
+            if same not in shared:
+                shared[same] = _FileIds(prefixes, split, file_ids, len(modules))
+            tables[folder] = shared[same]
+        tables = list(map(tables.__getitem__, folders))
+        w_file = list(map(getitem, map(tables.__getitem__, w_mod), map(_value, w_val)))
+        r_file = list(map(getitem, map(tables.__getitem__, r_mod), map(_value, r_val)))
+        graph._add_nodes(FILE, list(file_ids))
+        if -1 in w_file or -1 in r_file:
+            keep_w = [f >= 0 for f in w_file]
+            keep_r = [f >= 0 for f in r_file]
+            w_mod, w_file = list(compress(w_mod, keep_w)), list(compress(w_file, keep_w))
+            r_file, r_mod = list(compress(r_file, keep_r)), list(compress(r_mod, keep_r))
+        # a target that could not be placed may be any file of its name: its modules
+        # also get edges to each placed file of that name (not through a shared
+        # node, which would link same-named files of different folders)
+        spread = {}
+        unplaced = [key for key in file_ids if key.startswith(ANY_FOLDER)]
+        if unplaced:
+            same_name = defaultdict(list)
+            for key, fid in file_ids.items():
+                if not key.startswith(ANY_FOLDER):
+                    same_name[ANY_FOLDER + key.rpartition("/")[2]].append(fid)
+            spread = {file_ids[key]: same_name[key] for key in unplaced if key in same_name}
+        if spread:
+            for mods, files in ((w_mod, w_file), (r_mod, r_file)):
+                for m, f in list(zip(mods, files)):
+                    for other in spread.get(f, ()):
+                        mods.append(m)
+                        files.append(other)
+        graph._src = array("i", w_mod + r_file)
+        graph._dst = array("i", w_file + r_mod)
+        graph.freeze()
+        return graph
+
+    def __len__(self):
+        return len(self.names)
+
+    def freeze(self):
+        """Build the CSR arrays from the edge list (duplicate edges dropped)."""
+        n = len(self.names)
+        # edges encoded as s * n + d and sorted, which groups them by source and
+        # drops duplicates; node i's edges start at the first code >= i * n
+        edges = sorted(set([s * n + d for s, d in zip(self._src, self._dst)]))
+        self.targets = array("i", map(n.__rmod__, edges))
+        self.offsets = array("i", map(bisect_left, repeat(edges), range(0, n * n + 1, n))) if n else array("i", [0])
+
+    def successors(self, nid):
+        if self.offsets is None:
+            self.freeze()
+        return self.targets[self.offsets[nid]:self.offsets[nid + 1]]
+
+    def file_id(self, path):
+        """Node id of a snapshot file ('shared/x.csv'), or of the unplaced targets of its name."""
+        for key in file_keys(path):
+            nid = self.ids.get((FILE, key))
+            if nid is not None:
+                return nid
+        return None
+
+    def module_id(self, country, relpath):
+        return self.ids.get((MODULE, (country, relpath)))
+
+    def blast_radius(self, sources, max_hops=None):
+        """
+        BFS downstream of the source node ids. Returns [(module_id, hops, parent)]
+        in BFS order, where hops counts modules on the way (a direct reader of a
+        source file is 1 hop) and parent is the previous module id on a shortest
+        path (None for direct readers). Each module is reported once, at its
+        shortest distance.
+        """
+        if self.offsets is None:
+            self.freeze()
+        offsets, targets, kinds = self.offsets, self.targets, self.kinds
+        dist = array("i", [-1]) * len(self.names)
+        via = array("i", [-1]) * len(self.names)   # last module before this node
+        frontier = []
+        for s in sources:
+            if s is not None and dist[s] < 0:
+                dist[s] = 0
+                frontier.append(s)
+        out = []
+        while frontier:
+            nxt = []
+            for u in frontier:
+                last = u if kinds[u] == MODULE else via[u]
+                for v in targets[offsets[u]:offsets[u + 1]]:
+                    if dist[v] >= 0:
+                        continue
+                    dist[v] = dist[u] + (1 if kinds[v] == MODULE else 0)
+                    via[v] = last
+                    if kinds[v] == MODULE:
+                        if max_hops is not None and dist[v] > max_hops:
+                            continue
+                        out.append((v, dist[v], last if last >= 0 and kinds[last] == MODULE else None))
+                    nxt.append(v)
+            frontier = nxt
+        return out
+
+    def path_to(self, radius, module_id):
+        """Module ids from the first reader down to module_id, using the parents of blast_radius()."""
+        parents = {m: p for m, _, p in radius}
+        path = []
+        while module_id is not None:
+            path.append(module_id)
+            module_id = parents.get(module_id)
+        return path[::-1]
+
+    def topological_order(self):
+        """
+        Kahn's algorithm over the whole graph. Returns (order, cyclic) where
+        cyclic lists the node ids left over because they sit on a cycle.
+        """
+        if self.offsets is None:
+            self.freeze()
+        n = len(self.names)
+        indegree = array("i", bytes(4 * n))
+        for d in self.targets:
+            indegree[d] += 1
+        order = [i for i in range(n) if indegree[i] == 0]
+        head = 0
+        while head < len(order):
+            u = order[head]
+            head += 1
+            for v in self.targets[self.offsets[u]:self.offsets[u + 1]]:
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    order.append(v)
+        cyclic = [i for i in range(n) if indegree[i] > 0]
+        return order, cyclic
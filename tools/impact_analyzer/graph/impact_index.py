@@ -0,0 +1,224 @@
+# graph/impact_index.py
+# Persistent SQLite index of the code analyses, queryable without re-running the analyzer.
+# CLI (from tools/impact_analyzer):
+#   python -m graph.impact_index readers-of module_b_output_india.csv
+#   python -m graph.impact_index writers-of module_b_output_india.csv --snapshot before
+#   python -m graph.impact_index downstream-of module_b_output_india.csv --max-hops 3
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+
+from graph.dependency_graph import normalize_shared_path, io_sites
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    snapshot TEXT NOT NULL,
+    country TEXT NOT NULL,
+    relpath TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    UNIQUE (snapshot, country, relpath)
+);
+CREATE TABLE IF NOT EXISTS reads (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    lineno INTEGER, path TEXT, norm TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS writes (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    lineno INTEGER, path TEXT, norm TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS header_writes (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    lineno INTEGER, header TEXT
+);
+CREATE TABLE IF NOT EXISTS unpack_sites (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    lineno INTEGER, fields INTEGER, source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reads_norm ON reads(norm);
+CREATE INDEX IF NOT EXISTS idx_writes_norm ON writes(norm);
+CREATE INDEX IF NOT EXISTS idx_reads_file ON reads(file_id);
+CREATE INDEX IF NOT EXISTS idx_writes_file ON writes(file_id);
+CREATE INDEX IF NOT EXISTS idx_header_writes_file ON header_writes(file_id);
+CREATE INDEX IF NOT EXISTS idx_unpack_sites_file ON unpack_sites(file_id);
+"""
+
+_CHUNK = 500   # ids per IN (...) query
+_ROWS_VERSION = "2"   # bump when _insert_rows changes, so existing rows are rewritten
+
+def analysis_digest(analysis):
+    """Stable digest of one file's analysis; the rows of a file are only rewritten when it changes."""
+    raw = _ROWS_VERSION + json.dumps(analysis, sort_keys=True, default=list)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+class ImpactIndex:
+    """
+    SQLite index of files, reads, writes, header writes and positional unpack
+    sites per snapshot ("before"/"after"), with indexes on the normalized shared
+    path. update() is incremental: unchanged files are left alone, changed ones
+    rewritten and vanished ones deleted.
+    """
+
+    def __init__(self, db_path):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, snapshot, code_analysis_results):
+        """
+        Sync one snapshot with { country: { relpath: analysis } }.
+        Returns { added, updated, removed, unchanged } file counts.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        known = {(c, r): (fid, digest) for fid, c, r, digest in self.conn.execute(
+            "SELECT id, country, relpath, digest FROM files WHERE snapshot = ?", (snapshot,))}
+        with self.conn:
+            for country, analyses in code_analysis_results.items():
+                for relpath, analysis in analyses.items():
+                    digest = analysis_digest(analysis)
+                    old = known.pop((country, relpath), None)
+                    if old is not None and old[1] == digest:
+                        stats["unchanged"] += 1
+                        continue
+                    if old is not None:
+                        self._delete_rows(old[0])
+                        self.conn.execute("UPDATE files SET digest = ? WHERE id = ?", (digest, old[0]))
+                        fid = old[0]
+                        stats["updated"] += 1
+                    else:
+                        fid = self.conn.execute(
+                            "INSERT INTO files (snapshot, country, relpath, digest) VALUES (?, ?, ?, ?)",
+                            (snapshot, country, relpath, digest)).lastrowid
+                        stats["added"] += 1
+                    self._insert_rows(fid, analysis or {})
+            for fid, _ in known.values():
+                self._delete_rows(fid)
+                self.conn.execute("DELETE FROM files WHERE id = ?", (fid,))
+                stats["removed"] += 1
+        return stats
+
+    def _delete_rows(self, fid):
+        for table in ("reads", "writes", "header_writes", "unpack_sites"):
+            self.conn.execute(f"DELETE FROM {table} WHERE file_id = ?", (fid,))
+
+    def _insert_rows(self, fid, analysis):
+        # only real opens: path assignments are not writes, write-mode opens not reads
+        written, read = io_sites(analysis)
+        for table, sites in (("reads", read), ("writes", written)):
+            rows = []
+            for ln, value in sites:
+                norm = normalize_shared_path(value)
+                if norm:
+                    rows.append((fid, ln, str(value), norm))
+            self.conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?)", rows)
+        self.conn.executemany("INSERT INTO header_writes VALUES (?, ?, ?)",
+                              [(fid, ln, str(hw)) for ln, hw in analysis.get("header_writes", [])])
+        self.conn.executemany("INSERT INTO unpack_sites VALUES (?, ?, ?, ?)",
+                              [(fid, ln, count, src) for ln, count, src in analysis.get("positional_unpack_sites", [])])
+
+    def _sites(self, table, path, snapshot):
+        # CROSS JOIN pins the join order: look the path up in idx_*_norm first,
+        # instead of scanning every file of the snapshot
+        return [
+            {"module": c, "file": r, "line": ln, "path": p}
+            for c, r, ln, p in self.conn.execute(
+                f"SELECT f.country, f.relpath, t.lineno, t.path FROM {table} t CROSS JOIN files f ON f.id = t.file_id"
+                " WHERE t.norm = ? AND f.snapshot = ? ORDER BY f.country, f.relpath, t.lineno",
+                (normalize_shared_path(path), snapshot))
+        ]
+
+    def readers_of(self, path, snapshot="after"):
+        """Read sites of a shared file: [{module, file, line, path}]."""
+        return self._sites("reads", path, snapshot)
+
+    def writers_of(self, path, snapshot="after"):
+        """Write sites of a shared file: [{module, file, line, path}]."""
+        return self._sites("writes", path, snapshot)
+
+    def _in_chunks(self, sql, values, extra=()):
+        values = list(values)
+        for i in range(0, len(values), _CHUNK):
+            part = values[i:i + _CHUNK]
+            marks = ",".join("?" * len(part))
+            yield from self.conn.execute(sql.format(marks=marks), (*part, *extra))
+
+    def downstream_of(self, path, snapshot="after", max_hops=None):
+        """
+        Modules downstream of a shared file, level by level: readers of the file
+        are 1 hop, readers of what those modules write 2 hops, and so on.
+        Returns [{module, file, hops}] in hop order.
+        """
+        files = {normalize_shared_path(path)}
+        seen_files = set(files)
+        seen_modules = set()
+        out = []
+        hops = 0
+        while files and (max_hops is None or hops < max_hops):
+            hops += 1
+            readers = sorted(set(self._in_chunks(
+                "SELECT DISTINCT f.id, f.country, f.relpath FROM reads t CROSS JOIN files f ON f.id = t.file_id"
+                " WHERE t.norm IN ({marks}) AND f.snapshot = ?", files, (snapshot,))),
+                key=lambda row: (row[1], row[2]))
+            new_ids = []
+            for fid, country, relpath in readers:
+                if fid in seen_modules:
+                    continue
+                seen_modules.add(fid)
+                new_ids.append(fid)
+                out.append({"module": country, "file": relpath, "hops": hops})
+            written = set(row[0] for row in self._in_chunks(
+                "SELECT DISTINCT norm FROM writes WHERE file_id IN ({marks})", new_ids))
+            files = written - seen_files
+            seen_files |= files
+        return out
+
+    def stats(self):
+        counts = {}
+        for table in ("files", "reads", "writes", "header_writes", "unpack_sites"):
+            counts[table] = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return counts
+
+def main(argv=None):
+    import config
+    parser = argparse.ArgumentParser(description="Query the persistent impact index.")
+    parser.add_argument("query", choices=["readers-of", "writers-of", "downstream-of", "stats"])
+    parser.add_argument("path", nargs="?", help="shared file (any path form; matched on its normalized name)")
+    parser.add_argument("--snapshot", default="after", choices=["before", "after"])
+    parser.add_argument("--max-hops", type=int, default=None)
+    parser.add_argument("--db", default=getattr(config, "IMPACT_INDEX_PATH", os.path.join(".cache", "impact_index.sqlite")))
+    args = parser.parse_args(argv)
+    if args.query != "stats" and not args.path:
+        parser.error(f"{args.query} needs a path")
+    if not os.path.exists(args.db):
+        print(f"No impact index at {args.db}; run analyzer.py first.", file=sys.stderr)
+        return 1
+    with ImpactIndex(args.db) as index:
+        if args.query == "readers-of":
+            result = index.readers_of(args.path, args.snapshot)
+        elif args.query == "writers-of":
+            result = index.writers_of(args.path, args.snapshot)
+        elif args.query == "downstream-of":
+            result = index.downstream_of(args.path, args.snapshot, max_hops=args.max_hops)
+        else:
+            result = index.stats()
+    print(json.dumps(result, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# parsers/analysis_cache.py
+import hashlib
+import json
+import os
+
+def content_key(content, version):
+    """sha256 over analyzer version + file content (str or bytes)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    h = hashlib.sha256()
+    h.update(str(version).encode("utf-8"))
+    h.update(b"\0")
+    h.update(content)
+    return h.hexdigest()
+
+class AnalysisCache:
+    """
+    On-disk cache for analyze_python_file results.
+    Entries are keyed by sha256(analyzer version + file content), so a file that
+    has not changed since the last run (in either snapshot) is never re-parsed.
+    Total size on disk is bounded; least recently used entries are evicted first.
+    """
+
+    def __init__(self, cache_dir, version, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.version = str(version)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = 0
+        for entry in os.scandir(cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                self._total_bytes += entry.stat().st_size
+
+    def key_for(self, content):
+        return content_key(content, self.version)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            # bump mtime so eviction keeps recently used entries
+            os.utime(path, None)
+        except OSError:
+            pass
+        return _restore_tuples(data)
+
+    def put(self, key, analysis):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(analysis, f)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._total_bytes += size
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        # drop oldest entries until we are back under ~90% of the budget
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(".json"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        for mtime, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._total_bytes = total
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bytes": self._total_bytes
+        }
+
+def _restore_tuples(data):
+    # JSON turns the (lineno, ...) site tuples into lists; put them back so cached
+    # results look exactly like fresh ones
+    out = {}
+    for k, v in data.items():
+        if isinstance(v, list):
+            out[k] = [tuple(x) if isinstance(x, list) else x for x in v]
+        else:
+            out[k] = v
+    return out
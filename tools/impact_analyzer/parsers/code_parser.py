@@ -1,13 +1,62 @@
 # parsers/code_parser.py
 import ast
 import os
+import re
+
+# bump whenever CodeAnalyzer output changes so cached analyses are invalidated
+ANALYZER_VERSION = "5"
 
 def read_py_source(path):
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
 
+_NEWLINE = re.compile(rb"\r\n|\r|\n")
+_OPEN_CALLS = {"open", "gzip.open", "bz2.open", "lzma.open", "zstd.open", "zstandard.open"}
+_PATH_TYPES = {"Path", "PurePath", "PosixPath", "WindowsPath", "PurePosixPath", "PureWindowsPath"}
+# calls that return their (path) argument unchanged as far as the file name goes
+_PATH_PASSTHROUGH = {"str", "os.fspath", "os.path.abspath", "os.path.normpath", "os.path.realpath",
+                     "os.path.expanduser", "path.abspath", "path.normpath", "path.realpath"}
+_PATH_METHODS = {"resolve", "absolute", "expanduser"}
+# calls that take a row/reader/frame without depending on its column layout
+_SAFE_CALLS = {"print", "len", "str", "repr", "bool", "type", "id", "isinstance", "enumerate", "next",
+               "list", "tuple", "iter", "zip", "sorted", "reversed"}
+_SAFE_METHODS = {"writer", "DictWriter", "writerow", "writerows", "append", "extend", "write", "format", "join",
+                 "debug", "info", "warning", "error", "exception"}
+
+def fold_path(expr, lookup=None):
+    """
+    Evaluate a symbolic path expression as far as possible. Expressions are
+    JSON friendly so they can be cached with the analysis:
+      "str"                      literal
+      ["join", e1, e2, ...]      os.path.join / pathlib "/" / Path(a, b)
+      ["concat", e1, e2, ...]    "+" and f-strings
+      ["ref", module, name]      a name imported from another module
+    Returns a str when fully known, otherwise the expression with the known parts
+    folded. lookup(module, name) -> str or None resolves refs; without it they stay
+    symbolic. None when some part can never be known.
+    """
+    if expr is None or isinstance(expr, str):
+        return expr
+    op = expr[0]
+    if op == "ref":
+        return list(expr) if lookup is None else lookup(expr[1], expr[2])
+    parts = [fold_path(e, lookup) for e in expr[1:]]
+    if any(p is None for p in parts):
+        return None
+    if all(isinstance(p, str) for p in parts):
+        return os.path.join(*parts) if op == "join" else "".join(parts)
+    return [op] + parts
+
+class SourceSpan:
+    """(start, end) byte offsets of a node in the utf-8 encoded source."""
+    __slots__ = ("start", "end")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
 class CodeAnalyzer(ast.NodeVisitor):
-    def __init__(self):
+    def __init__(self, source=""):
         self.positional_unpack_sites = []   # (lineno, count, src)
         self.dictreader_sites = []         # (lineno, src)
         self.csv_reader_sites = []         # (lineno, src)
@@ -16,23 +65,375 @@ class CodeAnalyzer(ast.NodeVisitor):
         self.var_string_values = {}        # var -> resolved path (when possible)
         self.var_list_values = {}          # var -> list of string constants (candidate headers)
         self.header_writes = []            # (lineno, header_list_or_var)
-        self.source = ""
+        self.imports = {}                  # local name -> [module, name] (name None for `import module`)
+        self.path_symbols = {}             # var -> symbolic path depending on imports (see fold_path)
+        self.unresolved_paths = []         # (field, index into file_reads/file_writes, placeholder, expr);
+                                           # placeholder None: a path assignment, not an open() site
+        self.path_sites = {"total": 0, "local": 0}   # open()/read_csv() targets seen / resolved in-file
+        self.column_access = []            # per opened file: how its columns are used (see _new_handle)
+        self._opened = {}                  # id(open/read_csv call node) -> index into column_access
+        self._roles = {}                   # var -> (role, handle); role: handle/reader/header/rows/row/frame
+        self.source = source
+        # built lazily, once per file: encoded source + byte offset of each line.
+        # While visiting, snippets are kept as SourceSpan and only decoded in results().
+        self._src_bytes = None
+        self._line_offsets = None
 
-    def _resolve_join_call(self, call_node):
+    def _index_source(self):
+        self._src_bytes = self.source.encode("utf-8")
+        self._line_offsets = [0] + [m.end() for m in _NEWLINE.finditer(self._src_bytes)]
+
+    def _span(self, node):
+        if self._line_offsets is None:
+            self._index_source()
         try:
-            func = call_node.func
-            if isinstance(func, ast.Attribute) and func.attr == "join":
-                args = []
-                for a in call_node.args:
-                    if isinstance(a, ast.Constant) and isinstance(a.value, str):
-                        args.append(a.value)
-                    else:
+            start = self._line_offsets[node.lineno - 1] + node.col_offset
+            end = self._line_offsets[node.end_lineno - 1] + node.end_col_offset
+        except (AttributeError, IndexError, TypeError):
+            return None
+        return SourceSpan(start, end)
+
+    def _span_has(self, span, *needles):
+        if span is None:
+            return False
+        for n in needles:
+            if self._src_bytes.find(n, span.start, span.end) >= 0:
+                return True
+        return False
+
+    def snippet(self, span):
+        if span is None:
+            return ""
+        return self._src_bytes[span.start:span.end].decode("utf-8", errors="replace").strip()
+
+    def _text(self, value):
+        return self.snippet(value) if isinstance(value, SourceSpan) else value
+
+    def results(self):
+        """Analysis dict, with evidence snippets turned into strings."""
+        return {
+            "positional_unpack_sites": [(ln, count, self._text(src)) for ln, count, src in self.positional_unpack_sites],
+            "dictreader_sites": [(ln, self._text(src)) for ln, src in self.dictreader_sites],
+            "csv_reader_sites": [(ln, self._text(src)) for ln, src in self.csv_reader_sites],
+            "file_reads": self.file_reads,
+            "file_writes": self.file_writes,
+            "var_string_values": self.var_string_values,
+            "var_list_values": self.var_list_values,
+            "header_writes": [(ln, self._text(hw)) for ln, hw in self.header_writes],
+            "imports": self.imports,
+            "path_symbols": self.path_symbols,
+            "unresolved_paths": self.unresolved_paths,
+            "path_sites": self.path_sites,
+            "column_access": self.column_access
+        }
+
+    # --- path expressions -------------------------------------------------
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.asname:
+                self.imports[alias.asname] = [alias.name, None]
+            else:
+                top = alias.name.split(".")[0]
+                self.imports[top] = [top, None]
+
+    def visit_ImportFrom(self, node):
+        module = node.module or ""
+        for alias in node.names:
+            if alias.name != "*":
+                self.imports[alias.asname or alias.name] = [module, alias.name]
+
+    def _dotted(self, node):
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+
+    def _imported_attr(self, node):
+        """['ref', module, name] for `mod.NAME` / `pkg.mod.NAME` on an imported module, else None."""
+        dotted = self._dotted(node)
+        if not dotted or "." not in dotted:
+            return None
+        first, rest = dotted.split(".", 1)
+        bound = self.imports.get(first)
+        if bound is None:
+            return None
+        module = bound[0] if bound[1] is None else ".".join(p for p in bound if p)
+        middle, _, name = rest.rpartition(".")
+        return ["ref", f"{module}.{middle}" if middle else module, name]
+
+    def _path_expr(self, node):
+        """
+        Symbolic value of a path-like expression (see fold_path), folded as far as
+        this file allows; None when it cannot be a known path.
+        """
+        if isinstance(node, ast.Constant):
+            return node.value if isinstance(node.value, str) else None
+        if isinstance(node, ast.Name):
+            if node.id in self.var_string_values:
+                return self.var_string_values[node.id]
+            if node.id in self.path_symbols:
+                return self.path_symbols[node.id]
+            bound = self.imports.get(node.id)
+            if bound is not None and bound[1] is not None:
+                return ["ref", bound[0], bound[1]]
+            return None
+        if isinstance(node, ast.Attribute):
+            return self._imported_attr(node)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Div, ast.Add)):
+            left, right = self._path_expr(node.left), self._path_expr(node.right)
+            if left is None or right is None:
+                return None
+            return fold_path(["join" if isinstance(node.op, ast.Div) else "concat", left, right])
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for v in node.values:
+                if isinstance(v, ast.FormattedValue):
+                    if v.format_spec is not None or v.conversion not in (-1, ord("s")):
                         return None
-                return os.path.join(*args)
-        except Exception:
+                    v = v.value
+                e = self._path_expr(v)
+                if e is None:
+                    return None
+                parts.append(e)
+            return fold_path(["concat"] + parts) if parts else ""
+        if isinstance(node, ast.Call) and not node.keywords:
+            func = node.func
+            name = self._dotted(func) or ""
+            short = name.rsplit(".", 1)[-1]
+            if isinstance(func, ast.Attribute) and short == "join" and not isinstance(func.value, ast.Constant):
+                args = [self._path_expr(a) for a in node.args]
+            elif short in _PATH_TYPES and (name == short or name.startswith("pathlib.")):
+                args = [self._path_expr(a) for a in node.args]
+                if not args:
+                    return None
+            elif name in _PATH_PASSTHROUGH and len(node.args) == 1:
+                return self._path_expr(node.args[0])
+            elif isinstance(func, ast.Attribute) and short in _PATH_METHODS and not node.args:
+                return self._path_expr(func.value)
+            else:
+                return None
+            if not args or any(a is None for a in args):
+                return None
+            return fold_path(["join"] + args)
+        return None
+
+    def _is_path_object(self, node):
+        """True if node can be a path whose .open() is a file open (not e.g. an imported Image.open)."""
+        expr = self._path_expr(node)
+        if expr is None:
+            return False
+        if not isinstance(expr, str) and expr[0] == "ref":
+            name = expr[2]
+            return not (name[:1].isupper() and not name.isupper())   # CamelCase: a class
+        return True
+
+    def _record_path(self, field, lineno, node):
+        """Record an open()/read_csv() target; symbolic ones are kept for the cross-module pass."""
+        entries = getattr(self, field)
+        self.path_sites["total"] += 1
+        expr = self._path_expr(node)
+        if isinstance(expr, str):
+            self.path_sites["local"] += 1
+            entries.append((lineno, expr))
+            return len(entries) - 1
+        if isinstance(node, ast.Name):
+            placeholder = node.id
+        else:
+            placeholder = self._dotted(node)
+        if expr is None:
+            # unresolvable: bare variable names are kept for matching, anything else is dropped
+            if isinstance(node, ast.Name):
+                entries.append((lineno, placeholder))
+                return len(entries) - 1
             return None
+        entries.append((lineno, placeholder or ast.unparse(node)))
+        self.unresolved_paths.append((field, len(entries) - 1, placeholder or ast.unparse(node), expr))
+        return len(entries) - 1
+
+    # --- column access ----------------------------------------------------
+    def _new_handle(self, read_index, lineno, mode, kind=None):
+        """
+        One column_access entry per opened file, bound to its file_reads entry:
+          read     index into file_reads
+          mode     "r" / "w"
+          kind     "positional" (csv.reader), "dict" (DictReader), "pandas" or None
+          tracked  rows/frame were consumed in a way this analyzer follows
+          names    [line, column, how]  row["x"], row.get("x"), header.index("x"), df["x"], usecols
+          indexes  [line, index]        row[3], df.iloc[:, 3], integer usecols
+          unpack   [line, width]        a, b, c = row / for a, b, c in reader
+          opaque   [line, what]         slices, computed indexes, rows passed to other code
+        """
+        if read_index is None:
+            return None
+        self.column_access.append({"read": read_index, "line": lineno, "mode": mode, "kind": kind,
+                                   "tracked": False, "names": [], "indexes": [], "unpack": [], "opaque": []})
+        return len(self.column_access) - 1
+
+    def _source(self, node):
+        """(role, handle) of an expression derived from an opened file, or None."""
+        if isinstance(node, ast.Name):
+            return self._roles.get(node.id)
+        if isinstance(node, ast.Call):
+            if id(node) in self._opened:
+                h = self._opened[id(node)]
+                return ("frame" if self.column_access[h]["kind"] == "pandas" else "handle", h)
+            name = self._dotted(node.func) or ""
+            arg = self._source(node.args[0]) if node.args else None
+            if arg is None:
+                return None
+            role, h = arg
+            if name.endswith("DictReader") or name.endswith("reader") and "csv" in name:
+                if role == "handle":
+                    self.column_access[h]["kind"] = "dict" if name.endswith("DictReader") else "positional"
+                    self.column_access[h]["tracked"] = True
+                    return ("reader", h)
+            if name in ("list", "tuple", "sorted") and role in ("reader", "rows"):
+                return ("rows", h)
+            if name == "next" and role == "reader":
+                return ("header" if self.column_access[h]["kind"] == "positional" else "row", h)
+            if name in ("enumerate", "iter", "reversed"):
+                return arg
+            return None
+        if isinstance(node, ast.Subscript):
+            src = self._source(node.value)
+            if src and src[0] == "rows":
+                if isinstance(node.slice, ast.Slice):
+                    return src
+                if isinstance(node.slice, ast.Constant) and node.slice.value == 0 \
+                        and self.column_access[src[1]]["kind"] == "positional":
+                    return ("header", src[1])
+                return ("row", src[1])
         return None
 
+    def _bind(self, target, src):
+        if isinstance(target, ast.Name):
+            if src is not None:
+                self._roles[target.id] = src
+            else:
+                self._roles.pop(target.id, None)
+
+    def _unpack(self, target, handle, lineno):
+        """Record `a, b, c = row`; a starred target only pins the fields before the star."""
+        elts = target.elts
+        starred = [i for i, e in enumerate(elts) if isinstance(e, ast.Starred)]
+        access = self.column_access[handle]
+        if starred:
+            access["indexes"].extend([lineno, i] for i in range(starred[0]))
+        else:
+            access["unpack"].append([lineno, len(elts)])
+
+    def _bind_loop(self, target, iterable):
+        src = self._source(iterable)
+        if isinstance(iterable, ast.Call) and (self._dotted(iterable.func) or "") == "enumerate" \
+                and isinstance(target, ast.Tuple) and len(target.elts) == 2:
+            target = target.elts[1]
+        if src is None or src[0] not in ("reader", "rows"):
+            self._bind(target, None)
+            return
+        role, h = src
+        self.column_access[h]["tracked"] = True
+        if isinstance(target, (ast.Tuple, ast.List)):
+            self._unpack(target, h, target.lineno)
+        else:
+            self._bind(target, ("row", h))
+
+    def visit_withitem(self, node):
+        self.visit(node.context_expr)
+        if node.optional_vars is not None:
+            self._bind(node.optional_vars, self._source(node.context_expr))
+            self.visit(node.optional_vars)
+
+    def visit_For(self, node):
+        self.visit(node.iter)
+        self._bind_loop(node.target, node.iter)
+        for stmt in node.body + node.orelse:
+            self.visit(stmt)
+
+    def _visit_comprehension(self, node):
+        for gen in node.generators:
+            self.visit(gen.iter)
+            self._bind_loop(gen.target, gen.iter)
+            for cond in gen.ifs:
+                self.visit(cond)
+        for field in ("key", "value", "elt"):
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+
+    visit_ListComp = visit_SetComp = visit_GeneratorExp = visit_DictComp = _visit_comprehension
+
+    def _is_header_lookup(self, node):
+        """header.index("x"): a position looked up by name (recorded when the call is visited)."""
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "index" \
+                and node.args and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            src = self._source(node.func.value)
+            return src is not None and src[0] == "header"
+        return False
+
+    def visit_Subscript(self, node):
+        value = node.value
+        iloc = isinstance(value, ast.Attribute) and value.attr == "iloc"
+        src = self._source(value.value if iloc else value)
+        if src is not None and isinstance(node.ctx, ast.Load):
+            role, h = src
+            access = self.column_access[h]
+            key = node.slice
+            if role == "row":
+                if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                    access["names"].append([node.lineno, key.value, "key"])
+                elif self._is_header_lookup(key):
+                    pass
+                elif isinstance(key, ast.Constant) and isinstance(key.value, int) and key.value >= 0:
+                    access["indexes"].append([node.lineno, key.value])
+                else:
+                    access["opaque"].append([node.lineno, "slice" if isinstance(key, ast.Slice) else "computed index"])
+            elif role == "frame" and iloc:
+                cols = key.elts[1] if isinstance(key, ast.Tuple) and len(key.elts) == 2 else None
+                if isinstance(cols, ast.Constant) and isinstance(cols.value, int):
+                    access["indexes"].append([node.lineno, cols.value])
+                elif cols is not None:
+                    access["opaque"].append([node.lineno, "iloc"])
+            elif role == "frame":
+                names = self._extract_list_of_constants(key) if isinstance(key, (ast.List, ast.Tuple)) else None
+                if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                    names = [key.value]
+                for n in names or []:
+                    access["names"].append([node.lineno, n, "column"])
+        self.generic_visit(node)
+
+    def _track_call(self, node, name):
+        """Column accesses through calls: row.get("x"), header.index("x"), df methods, rows escaping."""
+        func = node.func
+        if isinstance(func, ast.Attribute):
+            src = self._source(func.value)
+            if src is not None:
+                role, h = src
+                access = self.column_access[h]
+                const = [a.value for a in node.args if isinstance(a, ast.Constant) and isinstance(a.value, str)]
+                if role == "row" and func.attr == "get" and const:
+                    access["names"].append([node.lineno, const[0], "get"])
+                elif role == "header" and func.attr == "index" and const:
+                    access["names"].append([node.lineno, const[0], "header.index"])
+                elif role == "frame":
+                    for c in const:
+                        access["names"].append([node.lineno, c, func.attr])
+        short = func.attr if isinstance(func, ast.Attribute) else name
+        if name in _SAFE_CALLS or short in _SAFE_METHODS or id(node) in self._opened:
+            return
+        for arg in list(node.args) + [k.value for k in node.keywords]:
+            src = self._source(arg) if isinstance(arg, ast.Name) else None
+            if src is None:
+                continue
+            role, h = src
+            if role == "handle" and ("reader" in short or "DictReader" in short):
+                continue
+            if role == "handle" and name.endswith("read_csv"):
+                continue
+            self.column_access[h]["opaque"].append([node.lineno, f"passed to {short}()"])
+
     def _extract_list_of_constants(self, node):
         # return list of string constants if node is List of Constant strings, else None
         if isinstance(node, ast.List):
@@ -58,18 +459,24 @@ class CodeAnalyzer(ast.NodeVisitor):
         # capture string assignments (PATH vars) and list-of-strings (header-like) assignments
         try:
             value = node.value
-            resolved_path = None
-            if isinstance(value, ast.Constant) and isinstance(value.value, str):
-                resolved_path = value.value
-            elif isinstance(value, ast.Call):
-                resolved_path = self._resolve_join_call(value)
+            resolved_path = self._path_expr(value)
             # record var string values
-            if resolved_path:
+            if resolved_path and isinstance(resolved_path, str):
                 for target in node.targets:
                     if isinstance(target, ast.Name):
                         self.var_string_values[target.id] = resolved_path
+                        self.path_symbols.pop(target.id, None)
                         # also mark as potential write-read path
                         self.file_writes.append((node.lineno, resolved_path))
+            elif resolved_path:
+                # depends on an imported name: resolved later, across modules
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.path_symbols[target.id] = resolved_path
+                        self.var_string_values.pop(target.id, None)
+                        # same potential write-read entry as above, (lineno, None) until resolved
+                        self.file_writes.append((node.lineno, None))
+                        self.unresolved_paths.append(("file_writes", len(self.file_writes) - 1, None, resolved_path))
 
             # list-of-strings assignment detection (header candidate)
             list_vals = self._extract_list_of_constants(value)
@@ -81,12 +488,21 @@ class CodeAnalyzer(ast.NodeVisitor):
             # detect tuple/list unpacking like: a,b,c = row
             if isinstance(node.targets[0], (ast.Tuple, ast.List)):
                 target_len = len(node.targets[0].elts)
-                seg = ast.get_source_segment(self.source, node) or ""
-                if seg and ("= row" in seg or "= r" in seg or "= data" in seg or "= next" in seg):
-                    self.positional_unpack_sites.append((node.lineno, target_len, seg.strip()))
+                span = self._span(node)
+                if self._span_has(span, b"= row", b"= r", b"= data", b"= next"):
+                    self.positional_unpack_sites.append((node.lineno, target_len, span))
         except Exception:
             pass
         self.generic_visit(node)
+        # follow file handles through readers, rows and frames
+        src = self._source(node.value)
+        for target in node.targets:
+            if isinstance(target, (ast.Tuple, ast.List)) and src is not None and src[0] == "row":
+                self._unpack(target, src[1], node.lineno)
+            else:
+                self._bind(target, src)
+            if src is not None and src[0] in ("rows", "frame"):
+                self.column_access[src[1]]["tracked"] = True
 
     def visit_Call(self, node):
         func = node.func
@@ -97,54 +513,51 @@ class CodeAnalyzer(ast.NodeVisitor):
         elif isinstance(func, ast.Name):
             name = func.id
 
-        seg = ast.get_source_segment(self.source, node) or ""
+        span = self._span(node)
 
         # DictReader or csv.reader detection
-        if "DictReader" in name or "csv.DictReader" in seg:
-            self.dictreader_sites.append((node.lineno, seg.strip()))
-        if "csv.reader" in seg or ("reader" in name and "csv" in seg):
-            self.csv_reader_sites.append((node.lineno, seg.strip()))
-
-        # file read/write detection through open(...)
-        if isinstance(func, ast.Name) and func.id == "open" and node.args:
-            arg0 = node.args[0]
-            # resolve Constant string
-            if isinstance(arg0, ast.Constant) and isinstance(arg0.value, str):
-                self.file_reads.append((node.lineno, arg0.value))
-            elif isinstance(arg0, ast.Name):
-                varname = arg0.id
-                resolved = self.var_string_values.get(varname)
-                if resolved:
-                    self.file_reads.append((node.lineno, resolved))
-                else:
-                    self.file_reads.append((node.lineno, varname))
-            # attempt to detect mode 'w' to mark writes (second arg)
-            if len(node.args) >= 2:
-                mode = node.args[1]
-                if isinstance(mode, ast.Constant) and isinstance(mode.value, str) and "w" in mode.value:
-                    # mark as write to same path
-                    if isinstance(arg0, ast.Constant) and isinstance(arg0.value, str):
-                        self.file_writes.append((node.lineno, arg0.value))
-                    elif isinstance(arg0, ast.Name):
-                        varname = arg0.id
-                        resolved = self.var_string_values.get(varname)
-                        if resolved:
-                            self.file_writes.append((node.lineno, resolved))
-                        else:
-                            self.file_writes.append((node.lineno, varname))
+        if "DictReader" in name or self._span_has(span, b"csv.DictReader"):
+            self.dictreader_sites.append((node.lineno, span))
+        if self._span_has(span, b"csv.reader") or ("reader" in name and self._span_has(span, b"csv")):
+            self.csv_reader_sites.append((node.lineno, span))
+
+        # file read/write detection through open(...), gzip/bz2/zstd open(...) and Path.open(...)
+        target, mode = None, None
+        if name in _OPEN_CALLS and node.args:
+            target = node.args[0]
+            mode = node.args[1] if len(node.args) >= 2 else None
+        elif isinstance(func, ast.Attribute) and func.attr == "open" and self._is_path_object(func.value):
+            target = func.value
+            mode = node.args[0] if node.args else None
+        if target is not None:
+            if mode is None:
+                mode = next((kw.value for kw in node.keywords if kw.arg == "mode"), None)
+            read_index = self._record_path("file_reads", node.lineno, target)
+            writing = isinstance(mode, ast.Constant) and isinstance(mode.value, str) \
+                and any(c in mode.value for c in "wax")
+            # attempt to detect write/append/create modes to mark writes
+            if writing:
+                # mark as write to same path
+                self._record_path("file_writes", node.lineno, target)
+            handle = self._new_handle(read_index, node.lineno, "w" if writing else "r")
+            if handle is not None:
+                self._opened[id(node)] = handle
 
         # pandas read_csv detection
         if isinstance(func, ast.Attribute) and func.attr == "read_csv" and node.args:
-            a0 = node.args[0]
-            if isinstance(a0, ast.Constant) and isinstance(a0.value, str):
-                self.file_reads.append((node.lineno, a0.value))
-            elif isinstance(a0, ast.Name):
-                varname = a0.id
-                resolved = self.var_string_values.get(varname)
-                if resolved:
-                    self.file_reads.append((node.lineno, resolved))
-                else:
-                    self.file_reads.append((node.lineno, varname))
+            read_index = self._record_path("file_reads", node.lineno, node.args[0])
+            handle = self._new_handle(read_index, node.lineno, "r", kind="pandas")
+            if handle is not None:
+                self._opened[id(node)] = handle
+                for kw in node.keywords:
+                    if kw.arg == "usecols" and isinstance(kw.value, (ast.List, ast.Tuple)):
+                        for elt in kw.value.elts:
+                            if isinstance(elt, ast.Constant) and isinstance(elt.value, str):
+                                self.column_access[handle]["names"].append([node.lineno, elt.value, "usecols"])
+                            elif isinstance(elt, ast.Constant) and isinstance(elt.value, int):
+                                self.column_access[handle]["indexes"].append([node.lineno, elt.value])
+                    elif kw.arg == "usecols":
+                        self.column_access[handle]["opaque"].append([node.lineno, "usecols"])
 
         # detect writer.writerow(...) - capture header writes
         if isinstance(func, ast.Attribute) and func.attr == "writerow" and node.args:
@@ -161,31 +574,48 @@ class CodeAnalyzer(ast.NodeVisitor):
                     self.header_writes.append((node.lineno, hdr))
                 else:
                     # unknown arg (could be variable built earlier); store source snippet
-                    self.header_writes.append((node.lineno, seg.strip()))
+                    self.header_writes.append((node.lineno, span))
 
+        self._track_call(node, name)
         self.generic_visit(node)
 
-def analyze_python_file(path):
+def analyze_python_file(path, cache=None):
+    """
+    Analyze a python file for CSV reads/writes and unpacking sites.
+    When an AnalysisCache is given, unchanged file contents are served from it.
+    """
     if not os.path.exists(path):
         return {}
     try:
         src = read_py_source(path)
     except Exception:
         return {}
+    key = None
+    if cache is not None:
+        key = cache.key_for(src)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    analysis = analyze_python_source(src, path)
+    if cache is not None and analysis:
+        cache.put(key, analysis)
+    return analysis
+
+def analyze_python_source(src, filename="<unknown>"):
     try:
-        tree = ast.parse(src, filename=path)
+        tree = ast.parse(src, filename=filename)
     except Exception:
         return {}
-    analyzer = CodeAnalyzer()
-    analyzer.source = src
+    analyzer = CodeAnalyzer(src)
     analyzer.visit(tree)
-    return {
-        "positional_unpack_sites": analyzer.positional_unpack_sites,
-        "dictreader_sites": analyzer.dictreader_sites,
-        "csv_reader_sites": analyzer.csv_reader_sites,
-        "file_reads": analyzer.file_reads,
-        "file_writes": analyzer.file_writes,
-        "var_string_values": analyzer.var_string_values,
-        "var_list_values": analyzer.var_list_values,
-        "header_writes": analyzer.header_writes
-    }
+    return analyzer.results()
+
+def analyze_python_job(args):
+    """
+    Process-pool entry point. args = (path, src); src is None when the worker
+    should read the file itself.
+    """
+    path, src = args
+    if src is None:
+        return analyze_python_file(path)
+    return analyze_python_source(src, path)
@@ -0,0 +1,220 @@
+# parsers/column_profiler.py
+# Streaming per-column profiles of CSV files (type, null rate, distinct estimate, min/max)
+# and the diff of two profiles. With use_numpy (and numpy installed) the per-chunk strip,
+# null detection and de-duplication are vectorized; the pure Python path is the default,
+# as it is faster: the distinct values still go through the Python classifier either way.
+import csv
+import heapq
+import os
+import re
+import zlib
+
+from parsers.csv_parser import open_csv_text
+
+try:
+    import numpy as np
+except ImportError:   # optional dependency
+    np = None
+
+NULL_TOKENS = ("", "na", "n/a", "nan", "null", "none", "-")
+_INT = re.compile(r"[-+]?\d+")
+_FLOAT = re.compile(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?|[-+]?(inf|infinity)", re.IGNORECASE)
+_KMV_K = 256            # hashes kept by the distinct-count sketch
+_HASH_SPACE = float(2 ** 64)
+
+# type lattice: a column's type is the most general type seen in its non-null values
+_TYPE_RANK = {"empty": 0, "int": 1, "float": 2, "str": 3}
+
+def _hash64(value):
+    b = value.encode("utf-8", "surrogatepass")
+    return (zlib.crc32(b) << 32) | zlib.crc32(b, 0x9E3779B9)
+
+class ColumnStats:
+    """Bounded-memory statistics of one column, merged chunk by chunk."""
+    __slots__ = ("rows", "nulls", "kind", "num_min", "num_max", "str_min", "str_max", "_kmv")
+
+    def __init__(self):
+        self.rows = 0
+        self.nulls = 0
+        self.kind = "empty"
+        self.num_min = self.num_max = None
+        self.str_min = self.str_max = None
+        self._kmv = []   # the _KMV_K smallest distinct value hashes (max-heap via negation)
+
+    def _widen(self, kind):
+        if _TYPE_RANK[kind] > _TYPE_RANK[self.kind]:
+            self.kind = kind
+
+    def _numbers(self, lo, hi):
+        self.num_min = lo if self.num_min is None else min(self.num_min, lo)
+        self.num_max = hi if self.num_max is None else max(self.num_max, hi)
+
+    def _strings(self, lo, hi):
+        self.str_min = lo if self.str_min is None else min(self.str_min, lo)
+        self.str_max = hi if self.str_max is None else max(self.str_max, hi)
+
+    def _distinct(self, values):
+        heap = self._kmv
+        members = set(-h for h in heap)
+        for v in values:
+            h = _hash64(v)
+            if h in members:
+                continue
+            if len(heap) < _KMV_K:
+                heapq.heappush(heap, -h)
+                members.add(h)
+            elif h < -heap[0]:
+                members.discard(-heapq.heappushpop(heap, -h))
+                members.add(h)
+
+    def distinct_estimate(self):
+        if len(self._kmv) < _KMV_K:
+            return len(self._kmv)
+        kth = -self._kmv[0]
+        return int(round((_KMV_K - 1) / ((kth + 1) / _HASH_SPACE)))
+
+    def as_dict(self):
+        return {
+            "type": self.kind,
+            "rows": self.rows,
+            "null_rate": round(self.nulls / self.rows, 4) if self.rows else 0.0,
+            "distinct": self.distinct_estimate(),
+            "min": self.num_min if self.kind in ("int", "float") else self.str_min,
+            "max": self.num_max if self.kind in ("int", "float") else self.str_max
+        }
+
+def _merge_values(stats, nonnull):
+    """Classify the distinct non-null values of a chunk (both paths share this, so they agree exactly)."""
+    kind = "int"
+    lo = hi = None
+    for s in nonnull:
+        if kind == "int" and _INT.fullmatch(s):
+            x = int(s)
+        elif kind != "str" and _FLOAT.fullmatch(s):
+            kind = "float"
+            x = float(s)
+        else:
+            kind = "str"
+            continue
+        if lo is None or x < lo:
+            lo = x
+        if hi is None or x > hi:
+            hi = x
+    stats._widen(kind)
+    if kind == "str":
+        stats._strings(min(nonnull), max(nonnull))
+    elif kind == "float":
+        stats._numbers(float(lo), float(hi))
+    else:
+        # ints stay Python ints (no float64 rounding past 2**53)
+        stats._numbers(lo, hi)
+    stats._distinct(nonnull)
+
+def _profile_values_python(stats, values):
+    stats.rows += len(values)
+    values = [v.strip() for v in values]
+    # classify each distinct value once; chunks usually repeat values a lot
+    uniq = set(values)
+    nonnull = []
+    for s in uniq:
+        if s.lower() in NULL_TOKENS:
+            stats.nulls += values.count(s)
+        else:
+            nonnull.append(s)
+    if nonnull:
+        _merge_values(stats, nonnull)
+
+def _profile_values_numpy(stats, values):
+    # vectorized strip / null detection / de-duplication; the distinct values are
+    # then classified in Python like the pure-Python path (numpy's float parsing
+    # accepts '1_000' and rounds big ints, and string min/max has no ufunc loop)
+    arr = np.char.strip(np.asarray(values, dtype=str))
+    stats.rows += arr.size
+    null = np.isin(np.char.lower(arr), NULL_TOKENS)
+    stats.nulls += int(null.sum())
+    nonnull = np.unique(arr[~null]).tolist()
+    if nonnull:
+        _merge_values(stats, nonnull)
+
+def profile_csv(path, chunk_rows=50000, max_rows=None, use_numpy=False, data=None):
+    """
+    Stream a (possibly compressed) CSV and return { "header": [...], "columns": { name: profile dict } }.
+    Only `chunk_rows` rows are held in memory at a time, so memory stays constant
+    for any file size. max_rows stops after that many data rows (None = whole file).
+    data: the file's bytes when already in memory (path then only decides the compression).
+    use_numpy: use the numpy chunk path when numpy is installed (same results).
+    Returns None if the file cannot be read.
+    """
+    profile_values = _profile_values_numpy if (use_numpy and np is not None) else _profile_values_python
+    try:
+        f = open_csv_text(path, encoding="utf-8-sig", errors="replace", data=data)
+    except OSError:
+        return None
+    if f is None:
+        return None
+    with f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return None
+        header = [h.strip() for h in header]
+        stats = [ColumnStats() for _ in header]
+        width = len(header)
+        seen = 0
+        while True:
+            limit = chunk_rows if max_rows is None else min(chunk_rows, max_rows - seen)
+            if limit <= 0:
+                break
+            chunk = []
+            for row in reader:
+                chunk.append(row)
+                if len(chunk) >= limit:
+                    break
+            if not chunk:
+                break
+            seen += len(chunk)
+            # column-major view of the chunk; short rows count as nulls
+            for i in range(width):
+                profile_values(stats[i], [r[i] if i < len(r) else "" for r in chunk])
+            if len(chunk) < limit:
+                break
+    return {"header": header, "columns": {h: s.as_dict() for h, s in zip(header, stats)}}
+
+def same_content(path_a, path_b, block=1024 * 1024):
+    """True if both files exist and are byte-identical (sizes first, then blockwise)."""
+    try:
+        if os.path.getsize(path_a) != os.path.getsize(path_b):
+            return False
+        with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+            while True:
+                a, b = fa.read(block), fb.read(block)
+                if a != b:
+                    return False
+                if not a:
+                    return True
+    except OSError:
+        return False
+
+def diff_profiles(before, after, null_rate_delta=0.2):
+    """
+    Column-level changes between two profiles, for columns present in both:
+      type      - inferred type changed (e.g. int -> float, int -> str, str -> empty)
+      null_rate - null rate moved by more than null_rate_delta
+      constant  - column collapsed to a single distinct value
+    Returns a list of { column, change, before, after } in after-header order.
+    """
+    if not before or not after:
+        return []
+    changes = []
+    bcols = before["columns"]
+    for name in after["header"]:
+        if name not in bcols:
+            continue
+        b, a = bcols[name], after["columns"][name]
+        if b["type"] != a["type"]:
+            changes.append({"column": name, "change": "type", "before": b["type"], "after": a["type"]})
+        if abs(a["null_rate"] - b["null_rate"]) > null_rate_delta:
+            changes.append({"column": name, "change": "null_rate", "before": b["null_rate"], "after": a["null_rate"]})
+        if b["distinct"] > 1 and a["distinct"] == 1 and a["rows"] > 1:
+            changes.append({"column": name, "change": "constant", "before": b["distinct"], "after": a["distinct"]})
+    return changes
@@ -1,15 +1,93 @@
 # parsers/csv_parser.py
+import bz2
+import codecs
 import csv
+import gzip
+import io
 import os
+import re
 
-def extract_csv_header(path, max_rows=5):
+# delimiters tried by the fast path, and the last one seen per directory (reused
+# for a file only when it splits its first two records into the same field count)
+_DELIMITERS = [",", "\t", ";", "|"]
+_dialect_cache = {}   # directory -> delimiter
+_QUOTED = re.compile(r'"[^"]*"')
+_NUMBER = re.compile(r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?")
+_CHUNK = 64 * 1024
+_MAX_HEADER_BYTES = 64 * 1024 * 1024
+
+# compressed CSVs: suffix -> opener of a binary, incrementally decompressing stream
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".zst")
+
+def _open_zstd(path, data=None):
+    try:
+        import zstandard
+    except ImportError:   # optional dependency
+        return None
+    raw = io.BytesIO(data) if data is not None else open(path, "rb")
+    return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+
+def compression_of(path):
+    """'.gz' / '.bz2' / '.zst' for compressed files, None for plain ones."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.lower().endswith(suffix):
+            return suffix
+    return None
+
+def dataset_name(path):
+    """The logical CSV a (possibly compressed) file holds: 'x.csv.gz' -> 'x.csv'."""
+    suffix = compression_of(path)
+    return path[:-len(suffix)] if suffix else path
+
+def open_csv_binary(path, data=None):
+    """
+    Binary stream of the CSV bytes. Compressed files are decompressed lazily,
+    so reading the first record only inflates the first block(s).
+    data: the file's bytes when they are already in memory (e.g. a git blob);
+      path then only decides the compression.
+    Returns None for .zst files when the zstandard package is not installed.
+    """
+    suffix = compression_of(path)
+    if suffix == ".zst":
+        return _open_zstd(path, data)
+    source = io.BytesIO(data) if data is not None else path
+    if suffix == ".gz":
+        return gzip.open(source, "rb")
+    if suffix == ".bz2":
+        return bz2.open(source, "rb")
+    return source if data is not None else open(path, "rb")
+
+def open_csv_text(path, encoding="utf-8", errors="strict", data=None):
+    """Text stream (newline='' as the csv module expects) over open_csv_binary()."""
+    raw = open_csv_binary(path, data)
+    if raw is None:
+        return None
+    return io.TextIOWrapper(raw, encoding=encoding, errors=errors, newline="")
+
+def extract_csv_header(path, max_rows=5, fast=True, data=None):
     """
     Return header list if CSV has header row, otherwise try to infer.
+    fast: read only the first record and decide without csv.Sniffer; the
+    Sniffer based path is used whenever the fast path cannot decide.
+    data: the file's bytes, when they do not come from disk (path is then only a name).
     """
-    if not os.path.exists(path):
+    if data is None and not os.path.exists(path):
         return None
+    if fast:
+        try:
+            header = _fast_header(path, data)
+        except Exception:
+            header = None
+        if header is not None:
+            return header
+    return _sniffed_header(path, data=data)
+
+def _sniffed_header(path, encoding="utf-8", data=None):
     try:
-        with open(path, "r", newline="", encoding="utf-8") as f:
+        f = open_csv_text(path, encoding=encoding, data=data)
+        if f is None:
+            return None
+        with f:
             sniffer = csv.Sniffer()
             sample = f.read(4096)
             f.seek(0)
@@ -31,3 +109,105 @@ def extract_csv_header(path, max_rows=5):
     except Exception:
         return None
     return None
+
+def _read_first_record(f, start=b""):
+    """
+    Read bytes up to (not including) the first record terminator that is not
+    inside a quoted field. Returns (record, bytes read past it), or (None, b"")
+    if the record is larger than _MAX_HEADER_BYTES.
+    start: bytes already read from f (decompressing streams cannot always seek back).
+    """
+    buf = bytearray(start)
+    pos = 0
+    in_quotes = False
+    while True:
+        while pos < len(buf):
+            q = buf.find(b'"', pos)
+            if in_quotes:
+                if q < 0:
+                    pos = len(buf)
+                    break
+                in_quotes = False
+                pos = q + 1
+                continue
+            end = len(buf) if q < 0 else q
+            nl = buf.find(b"\n", pos, end)
+            cr = buf.find(b"\r", pos, end)
+            if nl >= 0 or cr >= 0:
+                stop = min(x for x in (nl, cr) if x >= 0)
+                return bytes(buf[:stop]), bytes(buf[stop:])
+            if q < 0:
+                pos = len(buf)
+                break
+            in_quotes = True
+            pos = q + 1
+        if len(buf) > _MAX_HEADER_BYTES:
+            return None, b""
+        chunk = f.read(_CHUNK)
+        if not chunk:
+            return bytes(buf), b""
+        buf += chunk
+
+def _decode(raw):
+    if raw.startswith(codecs.BOM_UTF8):
+        raw = raw[len(codecs.BOM_UTF8):]
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+def _pick_delimiter(line, directory, next_line=None):
+    """
+    Delimiter of a header line. next_line: the second record, if any; a
+    delimiter that splits it into a different number of fields is only used
+    when no delimiter splits both records alike.
+    """
+    unquoted = _QUOTED.sub("", line)
+    unquoted_next = _QUOTED.sub("", next_line) if next_line else None
+    cached = _dialect_cache.get(directory)
+    if cached and unquoted_next is not None and unquoted.count(cached) == unquoted_next.count(cached) > 0:
+        return cached
+    counts = [(unquoted.count(d), unquoted_next is None or unquoted_next.count(d) == unquoted.count(d), d)
+              for d in _DELIMITERS]
+    best = max(counts, key=lambda c: (c[0] > 0 and c[1], c[0]))
+    if best[0] == 0:
+        return None
+    _dialect_cache[directory] = best[2]
+    return best[2]
+
+def _looks_like_header(fields):
+    # a header row has unique, non-empty, non-numeric names
+    if len(set(fields)) != len(fields):
+        return False
+    for h in fields:
+        if not h or _NUMBER.fullmatch(h):
+            return False
+    return True
+
+def _fast_header(path, data=None):
+    """
+    Header from the first record only. Returns None when undecided (single
+    column, numeric/empty/duplicate fields, non UTF-8 BOM...), so the caller
+    falls back to the Sniffer.
+    """
+    f = open_csv_binary(path, data)
+    if f is None:
+        return None
+    with f:
+        start = f.read(4)
+        if start.startswith(codecs.BOM_UTF16_LE) or start.startswith(codecs.BOM_UTF16_BE):
+            return _sniffed_header(path, encoding="utf-16", data=data)
+        raw, rest = _read_first_record(f, start)
+        if not raw:
+            return None
+        second, _ = _read_first_record(f, rest.lstrip(b"\r\n"))
+    line = _decode(raw)
+    next_line = _decode(second) if second else None
+    delimiter = _pick_delimiter(line, os.path.dirname(os.path.abspath(path)), next_line)
+    if delimiter is None:
+        return None
+    fields = next(csv.reader([line], delimiter=delimiter), None)
+    fields = [h.strip() for h in fields or []]
+    if not fields or not _looks_like_header(fields):
+        return None
+    return fields
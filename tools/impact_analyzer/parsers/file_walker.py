@@ -0,0 +1,66 @@
+# parsers/file_walker.py
+import os
+from fnmatch import fnmatch
+from concurrent.futures import ThreadPoolExecutor
+
+def _matches(name, rel, patterns):
+    for p in patterns:
+        if fnmatch(name, p) or fnmatch(rel, p):
+            return True
+    return False
+
+def walk_files(root, include=("*",), exclude=()):
+    """
+    os.scandir based walk of root, yielding (rel_path, full_path) for files whose
+    name or relative path matches one of the include globs.
+    Directories matching an exclude glob (by name or relative path) are pruned
+    before they are entered, so venvs, .git trees etc. are never listed.
+    rel_path always uses '/' separators. Symlinked directories are not followed.
+    """
+    if not root or not os.path.isdir(root):
+        return
+    stack = [("", root)]
+    while stack:
+        rel_dir, full_dir = stack.pop()
+        try:
+            it = os.scandir(full_dir)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _matches(entry.name, rel, exclude):
+                            stack.append((rel, entry.path))
+                    elif entry.is_file():
+                        if _matches(entry.name, rel, include) and not _matches(entry.name, rel, exclude):
+                            yield rel, entry.path
+                except OSError:
+                    continue
+
+def filter_paths(rel_paths, include=("*",), exclude=()):
+    """
+    walk_files() semantics for paths that are already listed (e.g. a git tree):
+    yield the '/' separated rel paths whose file name matches an include glob and
+    neither the file nor any parent directory matches an exclude glob.
+    """
+    for rel in rel_paths:
+        parts = rel.split("/")
+        name = parts[-1]
+        if not _matches(name, rel, include) or _matches(name, rel, exclude):
+            continue
+        if any(_matches(parts[i], "/".join(parts[:i + 1]), exclude) for i in range(len(parts) - 1)):
+            continue
+        yield rel
+
+def read_many(paths, reader, threads=8):
+    """
+    Apply reader(path) to every path on a bounded thread pool, so per-file I/O
+    latency overlaps. Returns results in the same order as paths.
+    """
+    paths = list(paths)
+    if threads <= 1 or len(paths) <= 1:
+        return [reader(p) for p in paths]
+    with ThreadPoolExecutor(max_workers=min(threads, len(paths))) as pool:
+        return list(pool.map(reader, paths))
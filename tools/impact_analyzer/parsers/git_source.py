@@ -0,0 +1,146 @@
+# parsers/git_source.py
+# Snapshots read straight from git revisions instead of two checked-out copies:
+# trees are listed with `git ls-tree`, changed paths come from `git diff --name-only`
+# and blob contents are streamed through one long-lived `git cat-file --batch` process.
+import subprocess
+import threading
+
+_SKIP_BLOCK = 1024 * 1024   # bytes read at a time when skipping the rest of a blob
+
+def _git(repo, *args):
+    """stdout of `git -C repo args...` as bytes; raises CalledProcessError on failure."""
+    return subprocess.run(["git", "-C", repo, *args], check=True, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE).stdout
+
+def rev_parse(repo, rev):
+    """Full commit id of a revision (branch, tag, 'HEAD~3', sha...)."""
+    return _git(repo, "rev-parse", "--verify", rev + "^{commit}").decode().strip()
+
+def _under_root(path, root):
+    """path relative to root ('' = repo top level), or None when path is outside it."""
+    if not root:
+        return path
+    prefix = root + "/"
+    return path[len(prefix):] if path.startswith(prefix) else None
+
+def changed_paths(repo, rev_before, rev_after, root=""):
+    """Paths (relative to root) that differ between two revisions, from `git diff --name-only`."""
+    root = root.strip("/")
+    args = ["diff", "--name-only", "-z", "--no-renames", rev_before, rev_after]
+    if root:
+        args += ["--", root]
+    out = []
+    for path in _git(repo, *args).decode("utf-8", "surrogateescape").split("\0"):
+        rel = _under_root(path, root) if path else None
+        if rel:
+            out.append(rel)
+    return sorted(out)
+
+class GitTree:
+    """
+    Blob listing of one revision: { path relative to root: blob sha }.
+    Only object ids are listed, no file contents are read.
+    """
+
+    def __init__(self, repo, rev, root=""):
+        self.repo = repo
+        self.rev = rev
+        self.root = root.strip("/")
+        self.commit = rev_parse(repo, rev)
+        self.blobs = {}
+        args = ["ls-tree", "-r", "-z", "--full-tree", self.commit]
+        if self.root:
+            args += ["--", self.root]
+        for entry in _git(repo, *args).decode("utf-8", "surrogateescape").split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            _mode, kind, sha = meta.split()
+            rel = _under_root(path, self.root)
+            if kind == "blob" and rel:
+                self.blobs[rel] = sha
+
+class GitCatFile:
+    """
+    One `git cat-file --batch` process shared by every blob read of a run, so
+    reading N blobs costs N pipe round trips instead of N git processes.
+
+        with GitCatFile(repo) as cat:
+            data = cat.read(sha)
+            for sha, data in cat.read_many(shas): ...
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.proc = subprocess.Popen(["git", "-C", repo, "cat-file", "--batch"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self.blobs_read = 0
+        self.bytes_read = 0
+
+    def _response(self, limit=None):
+        header = self.proc.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file exited unexpectedly")
+        parts = header.split()
+        if len(parts) != 3:   # '<name> missing' / '<name> ambiguous'
+            return None
+        size = int(parts[2])
+        if limit is None or size <= limit:
+            data = self.proc.stdout.read(size)
+        else:
+            data = self.proc.stdout.read(limit)
+            left = size - limit
+            while left:   # skip the rest in blocks instead of holding it
+                left -= len(self.proc.stdout.read(min(left, _SKIP_BLOCK)))
+        self.proc.stdout.read(1)   # trailing newline
+        self.blobs_read += 1
+        self.bytes_read += size
+        return data
+
+    def read(self, name):
+        """Contents of one object (blob sha or 'rev:path'), or None if it does not exist."""
+        self.proc.stdin.write(name.encode("utf-8", "surrogateescape") + b"\n")
+        self.proc.stdin.flush()
+        return self._response()
+
+    def read_many(self, names, limit=None):
+        """
+        Yield (name, contents) in order. Requests are written from a helper thread
+        while responses are read here, so git never waits on a full pipe.
+        limit: only keep the first `limit` bytes of each object.
+        """
+        names = list(names)
+
+        def feed():
+            for name in names:
+                self.proc.stdin.write(name.encode("utf-8", "surrogateescape") + b"\n")
+            self.proc.stdin.flush()
+
+        writer = threading.Thread(target=feed, daemon=True)
+        writer.start()
+        done = 0
+        try:
+            for name in names:
+                data = self._response(limit)
+                done += 1
+                yield name, data
+        finally:
+            # drain what was requested but not consumed, keeping the process in sync
+            for _ in range(done, len(names)):
+                self._response(limit)
+            writer.join()
+
+    def stats(self):
+        return {"blobs_read": self.blobs_read, "bytes_read": self.bytes_read}
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+        self.proc.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
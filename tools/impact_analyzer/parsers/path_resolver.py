@@ -0,0 +1,126 @@
+# parsers/path_resolver.py
+# Cross-module pass over the per-file analyses of one snapshot: open()/read_csv()
+# targets that depend on names imported from other modules (e.g. a shared paths.py)
+# are resolved through per-module export tables, built once and shared by all files.
+import os
+
+from parsers.code_parser import fold_path
+
+class ExportTables:
+    """
+    { module: { exported name: path } } over a { country: { rel_py_path: analysis } }
+    mapping. A module's table is built the first time it is imported and memoized,
+    so resolving an import anywhere in the snapshot is a dict lookup; nothing is
+    re-parsed. Modules are found next to the importing file first (the script's
+    folder is on sys.path), then as 'package.module' folders, then by unique name.
+    """
+
+    def __init__(self, code):
+        self.code = code
+        self.by_folder = {}   # (country, module name) -> (country, relpath)
+        self.by_name = {}     # module name -> [(country, relpath)]
+        for country, analyses in code.items():
+            for relpath in analyses:
+                name = os.path.splitext(os.path.basename(relpath))[0]
+                self.by_folder[(country, name)] = (country, relpath)
+                self.by_name.setdefault(name, []).append((country, relpath))
+        self._tables = {}     # (country, relpath) -> { name: path or None }
+        self._building = set()
+        self.lookups = 0
+        self.tables_built = 0
+
+    def find_module(self, country, module):
+        parts = [p for p in module.split(".") if p]
+        if not parts:
+            return None
+        if len(parts) >= 2 and (parts[-2], parts[-1]) in self.by_folder:
+            return self.by_folder[(parts[-2], parts[-1])]
+        if (country, parts[-1]) in self.by_folder:
+            return self.by_folder[(country, parts[-1])]
+        found = self.by_name.get(parts[-1], [])
+        return found[0] if len(found) == 1 else None
+
+    def lookup(self, country, module, name):
+        """Path bound to `name` in `module` as imported from a file in `country`, or None."""
+        self.lookups += 1
+        key = self.find_module(country, module)
+        if key is None:
+            return None
+        table = self._table(key)
+        if name in table:
+            return table[name]
+        # re-exported import: `from base import ROOT` inside paths.py
+        bound = self._analysis(key).get("imports", {}).get(name)
+        if bound is not None and bound[1] is not None and key not in self._building:
+            self._building.add(key)
+            try:
+                return self.lookup(key[0], bound[0], bound[1])
+            finally:
+                self._building.discard(key)
+        return None
+
+    def _analysis(self, key):
+        return self.code.get(key[0], {}).get(key[1]) or {}
+
+    def _table(self, key):
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+        if key in self._building:   # import cycle
+            return {}
+        self._building.add(key)
+        try:
+            analysis = self._analysis(key)
+            table = dict(analysis.get("var_string_values", {}))
+            for name, expr in analysis.get("path_symbols", {}).items():
+                table[name] = self.resolve(key[0], expr)
+        finally:
+            self._building.discard(key)
+        self._tables[key] = table
+        self.tables_built += 1
+        return table
+
+    def resolve(self, country, expr):
+        """Fold a symbolic path of a file in `country`; None if some import is unknown."""
+        value = fold_path(expr, lambda module, name: self.lookup(country, module, name))
+        return value if isinstance(value, str) else None
+
+def resolve_paths(code):
+    """
+    Resolve the symbolic open()/read_csv() targets of every analysis in a
+    { country: { rel_py_path: analysis } } mapping, in place. Analyses with
+    symbolic targets are replaced by copies (the originals may be shared with
+    another snapshot or the analysis cache). Running it again after files were
+    re-analyzed re-resolves everything from the recorded expressions.
+    Returns coverage stats.
+    """
+    tables = ExportTables(code)
+    total = local = cross = 0
+    for country, analyses in code.items():
+        for relpath, analysis in list(analyses.items()):
+            if not analysis:
+                continue
+            sites = analysis.get("path_sites", {})
+            total += sites.get("total", 0)
+            local += sites.get("local", 0)
+            unresolved = analysis.get("unresolved_paths")
+            if not unresolved:
+                continue
+            resolved = dict(analysis)
+            resolved["file_reads"] = list(analysis.get("file_reads", []))
+            resolved["file_writes"] = list(analysis.get("file_writes", []))
+            for field, idx, placeholder, expr in unresolved:
+                value = tables.resolve(country, expr)
+                lineno = resolved[field][idx][0]
+                resolved[field][idx] = (lineno, value or placeholder)
+                if value and placeholder is not None:
+                    cross += 1
+            analyses[relpath] = resolved
+    return {
+        "sites": total,
+        "resolved_local": local,
+        "resolved_cross_module": cross,
+        "coverage": round((local + cross) / total, 4) if total else 1.0,
+        "export_tables": tables.tables_built,
+        "export_lookups": tables.lookups
+    }
@@ -0,0 +1,255 @@
+# parsers/runtime_tracer.py
+# Runtime I/O tracing: run each country's modules (module_a -> b -> c -> d) in a
+# sandbox copy of the snapshot, record the files they really open and the headers
+# they write (trace_bootstrap.py), and merge those edges into the static analyses.
+# Countries run in parallel, each against its own temporary copy of the shared folders.
+#   python -m parsers.runtime_tracer SNAPSHOT_ROOT [--jobs N] [--compare-plain [--repeat N]] [--json OUT]
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from graph.dependency_graph import DependencyGraph, normalize_shared_path
+
+BOOTSTRAP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trace_bootstrap.py")
+
+def _pipeline_order(country, analyses):
+    """Modules of one country in writer-before-reader order (file name order inside cycles)."""
+    if not analyses:
+        return []
+    graph = DependencyGraph.from_analysis({country: analyses})
+    order, _ = graph.topological_order()
+    ranked = [graph.names[i][1] for i in order if graph.kinds[i] == 0 and graph.names[i][1] in analyses]
+    return ranked + sorted(r for r in analyses if r not in ranked)
+
+def _make_sandbox(snapshot_root, country, countries, into):
+    """Copy the country folder plus every non-module folder (shared outputs...) of the snapshot."""
+    for entry in os.scandir(snapshot_root):
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name == country or entry.name not in countries:
+                shutil.copytree(entry.path, os.path.join(into, entry.name),
+                                ignore=shutil.ignore_patterns("__pycache__"))
+        elif entry.is_file():
+            shutil.copy2(entry.path, os.path.join(into, entry.name))
+
+def _run_module(sandbox, relpath, plain, timeout, out_dir):
+    target = os.path.join(sandbox, relpath)
+    out = os.path.join(out_dir, relpath.replace(os.sep, "_") + (".plain" if plain else ".trace") + ".json")
+    args = [sys.executable, BOOTSTRAP, out, target] + (["--plain"] if plain else [])
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run(args, cwd=os.path.dirname(target), env=env, timeout=timeout,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        stderr = proc.stderr.decode("utf-8", "replace").strip()
+    except subprocess.TimeoutExpired:
+        return {"status": "timeout", "wall_s": time.perf_counter() - t0, "events": [], "headers": []}
+    wall = time.perf_counter() - t0
+    try:
+        with open(out, encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        result = {"status": proc.returncode, "seconds": None, "events": [], "headers": []}
+    # module run time measured inside the child, so interpreter start-up (the same
+    # with or without the hook) does not dilute the overhead figure
+    result["wall_s"] = result["seconds"] if result.get("seconds") is not None else wall
+    if result["status"] and stderr:
+        result["error"] = stderr.splitlines()[-1]
+    return result
+
+def _to_analysis(result, sandbox, relpath):
+    """Runtime file_reads / file_writes / header_writes of one module, paths relative to its folder."""
+    module_dir = os.path.dirname(os.path.join(sandbox, relpath))
+    root = os.path.realpath(sandbox) + os.sep
+    reads, writes, headers = [], [], []
+    seen = set()
+    for path, mode, flags, line in result["events"]:
+        real = os.path.realpath(path)
+        if not real.startswith(root) or os.path.isdir(real):
+            continue
+        writing = any(c in (mode or "") for c in "wax+") if mode is not None \
+            else bool(flags & (os.O_WRONLY | os.O_RDWR))
+        rel = os.path.relpath(path, module_dir)
+        key = (rel, writing, line)
+        if key in seen:
+            continue
+        seen.add(key)
+        (writes if writing else reads).append((line, rel))
+    for path, line, header in result["headers"]:
+        if os.path.realpath(path).startswith(root):
+            headers.append((line, header))
+    return {"file_reads": reads, "file_writes": writes, "header_writes": headers}
+
+def _trace_country(snapshot_root, country, modules, countries, compare_plain, repeat, timeout):
+    """
+    Run one country's pipeline traced (and plain) in fresh sandboxes. With
+    compare_plain, both modes run `repeat` times, alternating, so the timings
+    can be compared across runs. Returns { mode: { relpath: [result per run] } };
+    the first traced run carries the runtime analysis.
+    """
+    modes = ("trace", "plain") if compare_plain else ("trace",)
+    runs = {mode: {relpath: [] for relpath in modules} for mode in modes}
+    for _ in range(max(1, repeat) if compare_plain else 1):
+        for mode in modes:
+            with tempfile.TemporaryDirectory(prefix="impact_trace_") as tmp:
+                sandbox = os.path.join(tmp, "snapshot")
+                out_dir = os.path.join(tmp, "events")
+                os.makedirs(sandbox)
+                os.makedirs(out_dir)
+                _make_sandbox(snapshot_root, country, countries, sandbox)
+                for relpath in modules:
+                    result = _run_module(sandbox, relpath, mode == "plain", timeout, out_dir)
+                    if mode == "trace" and not runs[mode][relpath]:
+                        result["analysis"] = _to_analysis(result, sandbox, relpath)
+                    runs[mode][relpath].append(result)
+    return runs
+
+def _timing(samples):
+    """Median and spread (max - min) of repeated run times."""
+    return statistics.median(samples), max(samples) - min(samples)
+
+def _overhead(traced, plain):
+    """
+    Relative cost of tracing from (median, spread) timings. None when the
+    medians differ by less than the larger spread: the runs vary more than
+    tracing costs, so any figure would be noise.
+    """
+    (t, t_spread), (p, p_spread) = traced, plain
+    if not p or abs(t - p) <= max(t_spread, p_spread):
+        return None
+    return round(t / p - 1, 4)
+
+def trace_snapshot(snapshot_root, code, jobs=4, timeout=120, compare_plain=False, repeat=5):
+    """
+    Run every country pipeline of a snapshot under the tracer.
+    code: the static { country: { relpath: analysis } } of the snapshot (gives the
+      module list and the writer -> reader order).
+    compare_plain: also run each pipeline without tracing, for the overhead report.
+      Each mode runs `repeat` times; the report gives median times, their spread,
+      and an overhead only where it exceeds the spread (None otherwise).
+    Returns ({ country: { relpath: runtime analysis } }, report).
+    """
+    countries = set(c for c, files in code.items() if files)
+    plans = [(c, _pipeline_order(c, code[c])) for c in sorted(countries)]
+    workers = max(1, min(jobs or (os.cpu_count() or 1), len(plans) or 1))
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda p: _trace_country(snapshot_root, p[0], p[1], countries, compare_plain,
+                                                         repeat, timeout), plans))
+    wall = time.perf_counter() - t0
+
+    traced, modules = {}, []
+    totals = {}   # mode -> run time of every module summed, per run
+    for (country, order), runs in zip(plans, results):
+        traced[country] = {}
+        for relpath in order:
+            t = runs["trace"][relpath][0]
+            traced[country][relpath] = t["analysis"]
+            row = {"module": relpath, "status": t["status"],
+                   "opens": len(t["analysis"]["file_reads"]) + len(t["analysis"]["file_writes"]),
+                   "headers": len(t["analysis"]["header_writes"])}
+            timings = {}
+            for mode, label in (("trace", "traced"), ("plain", "plain")):
+                if mode not in runs:
+                    continue
+                samples = [r["wall_s"] for r in runs[mode][relpath]]
+                timings[mode] = _timing(samples)
+                row[label + "_s"] = round(timings[mode][0], 4)
+                if compare_plain:
+                    row[label + "_spread_s"] = round(timings[mode][1], 4)
+                mode_totals = totals.setdefault(mode, [0.0] * len(samples))
+                for i, sec in enumerate(samples):
+                    mode_totals[i] += sec
+            if compare_plain:
+                row["overhead"] = _overhead(timings["trace"], timings["plain"])
+            if t.get("error"):
+                row["error"] = t["error"]
+            modules.append(row)
+    report = {"modules_run": len(modules), "failed": sum(1 for m in modules if m["status"]),
+              "workers": workers, "wall_s": round(wall, 4), "modules": modules}
+    if compare_plain and modules:
+        t, p = _timing(totals["trace"]), _timing(totals["plain"])
+        report["runs"] = max(1, repeat)
+        report["traced_s"], report["traced_spread_s"] = round(t[0], 4), round(t[1], 4)
+        report["plain_s"], report["plain_spread_s"] = round(p[0], 4), round(p[1], 4)
+        report["overhead"] = _overhead(t, p)
+    return traced, report
+
+def format_overhead(overhead):
+    return "within run-to-run noise" if overhead is None else f"{overhead:+.1%}"
+
+def merge_runtime(code, traced):
+    """
+    Add runtime edges to the static analyses, in place: reads/writes whose
+    normalized path the static analysis does not already have, and the observed
+    headers of files whose header writes it could not find. Merged analyses are
+    copies (the originals may be cached). Returns the number of entries added.
+    """
+    added = 0
+    for country, files in traced.items():
+        analyses = code.get(country, {})
+        for relpath, runtime in files.items():
+            static = analyses.get(relpath)
+            if static is None:
+                continue
+            merged = dict(static)
+            for field in ("file_reads", "file_writes"):
+                known = set(normalize_shared_path(fr[1]) for fr in static.get(field, []) if fr)
+                extra = []
+                for line, path in runtime[field]:
+                    key = normalize_shared_path(path)
+                    if key and key not in known:
+                        known.add(key)
+                        extra.append((line, path))
+                merged[field] = list(static.get(field, [])) + extra
+                added += len(extra)
+            if not static.get("header_writes") and runtime["header_writes"]:
+                merged["header_writes"] = list(runtime["header_writes"])
+                added += len(runtime["header_writes"])
+            merged["runtime_traced"] = True
+            # observed opens are real edges for the dependency graph (io_paths)
+            merged["runtime_io"] = {"reads": [p for _, p in runtime["file_reads"]],
+                                    "writes": [p for _, p in runtime["file_writes"]]}
+            analyses[relpath] = merged
+    return added
+
+def main():
+    from analyzer import analyze_codebase
+    parser = argparse.ArgumentParser(description="Trace the file I/O of a snapshot's modules at runtime.")
+    parser.add_argument("snapshot")
+    parser.add_argument("--jobs", type=int, default=4, help="country pipelines run in parallel")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds per module")
+    parser.add_argument("--compare-plain", action="store_true", help="also run untraced and report the overhead")
+    parser.add_argument("--repeat", type=int, default=5, help="with --compare-plain, runs per mode (default: 5)")
+    parser.add_argument("--json", default=None, help="write the report and runtime edges here")
+    args = parser.parse_args()
+    code = analyze_codebase(args.snapshot)
+    traced, report = trace_snapshot(args.snapshot, code, jobs=args.jobs, timeout=args.timeout,
+                                    compare_plain=args.compare_plain, repeat=args.repeat)
+    for m in report["modules"]:
+        plain = ""
+        if "plain_s" in m:
+            plain = (f" (spread {m['traced_spread_s'] * 1000:.1f})  plain {m['plain_s'] * 1000:8.1f} ms "
+                     f"(spread {m['plain_spread_s'] * 1000:.1f})  overhead {format_overhead(m['overhead'])}")
+        status = "" if not m["status"] else f"  FAILED ({m.get('error', m['status'])})"
+        print(f"  {m['module']:<28} traced {m['traced_s'] * 1000:8.1f} ms{plain}  "
+              f"{m['opens']} opens, {m['headers']} headers{status}")
+    if "overhead" in report:
+        print(f"Total, median of {report['runs']} runs: traced {report['traced_s']:.3f} s "
+              f"(spread {report['traced_spread_s']:.3f}), plain {report['plain_s']:.3f} s "
+              f"(spread {report['plain_spread_s']:.3f}), overhead {format_overhead(report['overhead'])}")
+    added = merge_runtime(code, traced)
+    print(f"{report['modules_run']} modules run ({report['failed']} failed) on {report['workers']} workers "
+          f"in {report['wall_s']:.2f} s; {added} edges not found statically.")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"report": report, "runtime": traced}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
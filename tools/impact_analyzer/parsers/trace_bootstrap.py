@@ -0,0 +1,90 @@
+# parsers/trace_bootstrap.py
+# Subprocess entry point of the runtime tracer (see runtime_tracer.py):
+#   python trace_bootstrap.py OUT_JSON TARGET_PY [--plain]
+# Runs TARGET_PY as __main__ from its own folder. Unless --plain is given, an audit
+# hook records every `open` event (path, mode, flags, line in TARGET_PY) and the
+# first row written by each csv.writer is kept as that file's header. Events are
+# only appended to a list while the module runs; they are written to OUT_JSON
+# once it has finished. Standalone on purpose: it must not import the analyzer.
+import json
+import os
+import runpy
+import sys
+import time
+
+_SKIP_SUFFIXES = (".py", ".pyc", ".pyd", ".so")
+
+def _caller_line(target):
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename != target:
+        frame = frame.f_back
+    return frame.f_lineno if frame is not None else None
+
+def _install(target, events, headers):
+    abspath = os.path.abspath
+
+    def hook(event, args):
+        if event != "open":
+            return
+        path = args[0]
+        if not isinstance(path, str) or path.endswith(_SKIP_SUFFIXES):
+            return   # file descriptors, bytes paths and imports
+        events.append((abspath(path), args[1], args[2], _caller_line(target)))
+
+    sys.addaudithook(hook)
+
+    import csv
+    real_writer = csv.writer
+
+    class HeaderTap:
+        """csv.writer proxy that keeps the first row, then hands writerow back to the C writer."""
+
+        def __init__(self, writer, f):
+            self._writer = writer
+            self._name = getattr(f, "name", None)
+
+        def writerow(self, row):
+            if isinstance(self._name, str):
+                headers.append((abspath(self._name), _caller_line(target), [str(v) for v in row]))
+            self.writerow = self._writer.writerow
+            return self._writer.writerow(row)
+
+        def writerows(self, rows):
+            rows = iter(rows)
+            for row in rows:
+                self.writerow(row)
+                break
+            return self._writer.writerows(rows)
+
+        def __getattr__(self, name):
+            return getattr(self._writer, name)
+
+    def traced_writer(f, *args, **kwargs):
+        return HeaderTap(real_writer(f, *args, **kwargs), f)
+
+    csv.writer = traced_writer   # csv.DictWriter looks writer up in the module too
+
+def main():
+    out_path, target = sys.argv[1], os.path.abspath(sys.argv[2])
+    plain = "--plain" in sys.argv[3:]
+    events, headers = [], []
+    if not plain:
+        _install(target, events, headers)
+    sys.argv = [target]
+    sys.path[0] = os.path.dirname(target)
+    status = 0
+    t0 = time.perf_counter()
+    try:
+        runpy.run_path(target, run_name="__main__")
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException as e:
+        status = 1
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+    seconds = time.perf_counter() - t0
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump({"status": status, "seconds": seconds, "events": events, "headers": headers}, f)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# profiling.py
+# Per-stage instrumentation for analyzer.main --profile.
+import contextlib
+import cProfile
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource   # not available on Windows
+except ImportError:
+    resource = None
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def cpu_seconds():
+    """User + system CPU of this process and its finished children (worker pools)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+class StageRecord:
+    __slots__ = ("name", "items", "wall", "cpu", "peak_rss_mb", "tracemalloc_peak_mb")
+
+    def __init__(self, name):
+        self.name = name
+        self.items = None
+        self.wall = self.cpu = 0.0
+        self.peak_rss_mb = self.tracemalloc_peak_mb = None
+
+    def as_dict(self):
+        out = {"wall_s": round(self.wall, 4), "cpu_s": round(self.cpu, 4), "items": self.items,
+               "peak_rss_mb": self.peak_rss_mb}
+        if self.tracemalloc_peak_mb is not None:
+            out["tracemalloc_peak_mb"] = self.tracemalloc_peak_mb
+        return out
+
+class StageProfiler:
+    """
+    Records wall time, CPU time, peak RSS and item counts per pipeline stage:
+
+        with profiler.stage("analyze_code") as st:
+            ...
+            st.items = n
+
+    trace_memory: also track the Python allocation peak of each stage with
+      tracemalloc (slows the run down noticeably).
+    cprofile_path: run cProfile over all stages and dump the stats there.
+    A disabled profiler still runs the stages, it just records nothing.
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, cprofile_path=None):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.cprofile_path = cprofile_path if enabled else None
+        self.stages = []
+        self._profile = None
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile_path:
+            self._profile = cProfile.Profile()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        record = StageRecord(name)
+        if not self.enabled:
+            yield record
+            return
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        if self._profile is not None:
+            self._profile.enable()
+        wall, cpu = time.perf_counter(), cpu_seconds()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall
+            record.cpu = cpu_seconds() - cpu
+            if self._profile is not None:
+                self._profile.disable()
+            record.peak_rss_mb = peak_rss_mb()
+            if self.trace_memory:
+                record.tracemalloc_peak_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            self.stages.append(record)
+
+    def timings(self):
+        """{ stage: {wall_s, cpu_s, items, peak_rss_mb[, tracemalloc_peak_mb]} } plus a total."""
+        out = {r.name: r.as_dict() for r in self.stages}
+        out["total"] = {"wall_s": round(sum(r.wall for r in self.stages), 4),
+                        "cpu_s": round(sum(r.cpu for r in self.stages), 4),
+                        "peak_rss_mb": peak_rss_mb()}
+        return out
+
+    def finish(self):
+        if self._profile is not None:
+            self._profile.dump_stats(self.cprofile_path)
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    def print_table(self):
+        for r in self.stages:
+            rss = f"{r.peak_rss_mb:8.1f} MB" if r.peak_rss_mb is not None else "       n/a"
+            mem = f"  heap peak {r.tracemalloc_peak_mb:.1f} MB" if r.tracemalloc_peak_mb is not None else ""
+            items = "" if r.items is None else f"  {r.items} items"
+            print(f"  {r.name:<16} wall {r.wall * 1000:9.1f} ms  cpu {r.cpu * 1000:9.1f} ms  rss {rss}{mem}{items}")
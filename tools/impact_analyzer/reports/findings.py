@@ -0,0 +1,138 @@
+# reports/findings.py
+# Compact in-memory findings. A finding points to interned Schema objects (one per
+# distinct header, shared by every finding of a changed file) and keeps its evidence
+# as templates + arguments; impact and evidence text are only built when a finding
+# is written (as_dict / text_lines). Reports carry each header once, in a schema
+# table keyed by a content-derived ID that findings and changed_files reference.
+import hashlib
+import json
+
+def schema_id(header):
+    """Stable ID of a header (same columns in the same order -> same ID, across runs)."""
+    if header is None:
+        return None
+    blob = json.dumps(list(header), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+class Schema:
+    __slots__ = ("id", "columns")
+
+    def __init__(self, columns):
+        self.columns = tuple(columns)
+        self.id = schema_id(self.columns)
+
+    def __str__(self):
+        return f"schema {self.id} ({len(self.columns)} columns)"
+
+class SchemaTable:
+    """Interns headers: every equal header maps to one Schema object."""
+
+    def __init__(self):
+        self._by_columns = {}   # tuple(columns) -> Schema
+
+    def intern(self, header):
+        if header is None:
+            return None
+        key = tuple(header)
+        schema = self._by_columns.get(key)
+        if schema is None:
+            schema = self._by_columns[key] = Schema(key)
+        return schema
+
+    def lookup(self, header):
+        """Interned Schema equal to header (a list/tuple), or None."""
+        if not isinstance(header, (list, tuple)):
+            return None
+        try:
+            return self._by_columns.get(tuple(header))
+        except TypeError:
+            return None
+
+    def compact_change(self, change):
+        """changed_files entry with its headers replaced by schema IDs."""
+        out = {}
+        for k, v in change.items():
+            if k in ("before_header", "after_header"):
+                schema = self.intern(v)
+                out[k[:-len("header")] + "schema"] = schema.id if schema is not None else None
+            else:
+                out[k] = v
+        return out
+
+    def as_dict(self):
+        return {s.id: list(s.columns) for s in self._by_columns.values()}
+
+def compact_summary(summary):
+    """Copy of a report summary whose changed_files reference a schema table instead of embedding headers."""
+    table = SchemaTable()
+    out = dict(summary)
+    out["changed_files"] = [table.compact_change(c) for c in summary.get("changed_files", [])]
+    out["schemas"] = table.as_dict()
+    return out
+
+class Evidence:
+    """One evidence line, formatted on output: Evidence("row[{}] at line {}", 3, 12). Arguments may be Evidence."""
+    __slots__ = ("template", "args")
+
+    def __init__(self, template, *args):
+        self.template = template
+        self.args = args
+
+    def __str__(self):
+        return self.template.format(*self.args)
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+class Finding:
+    """
+    One impacted module for one changed file.
+    kind: "writer", "reader" or "transitive" (picks the impact sentence).
+    schema_before / schema_after: interned Schema of the changed file, or None.
+    evidence: Evidence objects or plain strings.
+    """
+    __slots__ = ("module", "file", "kind", "confidence", "changed_file", "schema_before", "schema_after",
+                 "evidence", "hops", "llm_explanation")
+
+    IMPACT = {
+        "writer": "Code writes changed CSV '{0}'. Schema before: {1}, after: {2}",
+        "reader": "Schema changed for '{0}' (columns before: {1}, after: {2})",
+        "transitive": "Indirectly affected by schema change of '{0}' ({3} hops downstream)"
+    }
+
+    def __init__(self, module, file, kind, confidence, changed_file, schema_before=None, schema_after=None,
+                 evidence=None, hops=None):
+        self.module = module
+        self.file = file
+        self.kind = kind
+        self.confidence = confidence
+        self.changed_file = changed_file
+        self.schema_before = schema_before
+        self.schema_after = schema_after
+        self.evidence = evidence if evidence is not None else []
+        self.hops = hops
+        self.llm_explanation = None
+
+    def impact(self):
+        return self.IMPACT[self.kind].format(self.changed_file, self.schema_before, self.schema_after, self.hops)
+
+    def evidence_text(self):
+        return [str(e) for e in self.evidence]
+
+    def as_dict(self):
+        out = {
+            "module": self.module,
+            "file": self.file,
+            "kind": self.kind,
+            "impact": self.impact(),
+            "confidence": self.confidence,
+            "evidence": self.evidence_text(),
+            "changed_file": self.changed_file,
+            "schema_before": self.schema_before.id if self.schema_before is not None else None,
+            "schema_after": self.schema_after.id if self.schema_after is not None else None
+        }
+        if self.hops is not None:
+            out["hops"] = self.hops
+        if self.llm_explanation is not None:
+            out["llm_explanation"] = self.llm_explanation
+        return out
@@ -0,0 +1,201 @@
+# reports/llm_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+LLM_FAILURE_PREFIXES = ("LLM call failed", "LLM unavailable")
+
+_PATH_RE = re.compile(r"[\w.\-]*[\\/][\w.\-\\/]*|[\w\-]+\.(?:csv|py)\b")
+_LINE_RE = re.compile(r"\bline (\d+)")
+
+def _country_re(countries):
+    names = set()
+    for c in countries or []:
+        names.add(c)
+        if c.startswith("country_"):
+            names.add(c[len("country_"):])
+    # very short or non-alphabetic names would match inside unrelated words/numbers
+    names = sorted((n for n in names if len(n) > 1 and any(ch.isalpha() for ch in n)), key=len, reverse=True)
+    if not names:
+        return None
+    alt = "|".join(re.escape(n) for n in names)
+    return re.compile(rf"(?<![A-Za-z0-9])(?:{alt})(?![A-Za-z0-9])", re.IGNORECASE)
+
+def normalize_prompt(prompt, countries=()):
+    """
+    Template the finding-specific parts out of a prompt: paths become <PATHn>,
+    country names <COUNTRYn> and 'line N' references 'line <LINEn>'.
+    Returns (normalized_prompt, { placeholder: original value }).
+    """
+    values = {}    # (kind, value) -> placeholder
+    mapping = {}   # placeholder -> value
+    counters = {}
+
+    def placeholder(kind, value, key=None):
+        key = (kind, key if key is not None else value)
+        if key not in values:
+            counters[kind] = counters.get(kind, 0) + 1
+            ph = f"<{kind}{counters[kind]}>"
+            values[key] = ph
+            mapping[ph] = value
+        return values[key]
+
+    text = _PATH_RE.sub(lambda m: placeholder("PATH", m.group(0)), prompt)
+    cre = _country_re(countries)
+    if cre is not None:
+        text = cre.sub(lambda m: placeholder("COUNTRY", m.group(0), m.group(0).lower()), text)
+    text = _LINE_RE.sub(lambda m: "line " + placeholder("LINE", m.group(1)), text)
+    return text, mapping
+
+def template_response(response, mapping):
+    """Replace the concrete values of one finding in an LLM answer with placeholders."""
+    out = response
+    for ph, value in sorted(mapping.items(), key=lambda kv: len(kv[1]), reverse=True):
+        if ph.startswith("<LINE"):
+            out = re.sub(rf"\bline {re.escape(value)}\b", f"line {ph}", out)
+        elif ph.startswith("<COUNTRY"):
+            out = re.sub(rf"(?<![A-Za-z0-9]){re.escape(value)}(?![A-Za-z0-9])", ph, out, flags=re.IGNORECASE)
+        else:
+            out = out.replace(value, ph)
+    return out
+
+def fill_template(template, mapping):
+    out = template
+    for ph, value in mapping.items():
+        out = out.replace(ph, value)
+    return out
+
+def is_llm_failure(text):
+    return not text or text.startswith(LLM_FAILURE_PREFIXES)
+
+class LLMCache:
+    """
+    SQLite cache of LLM explanations keyed by (normalized prompt, model, temperature).
+    Answers are stored templated, so a hit is filled in with the paths, countries
+    and lines of the finding that asked. Entries expire after ttl_seconds and the
+    least recently used ones are dropped beyond max_entries.
+    """
+
+    def __init__(self, db_path, ttl_seconds=30 * 24 * 3600, max_entries=10000):
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.network_calls = 0
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, model TEXT, temperature REAL,"
+            " response TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+        self._purge_expired()
+        self.conn.commit()
+
+    def make_key(self, normalized_prompt, model, temperature):
+        raw = json.dumps([normalized_prompt, model, float(temperature)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _purge_expired(self):
+        if self.ttl_seconds:
+            self.conn.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl_seconds,))
+
+    def get(self, key):
+        row = self.conn.execute("SELECT response, created FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.ttl_seconds and row[1] < now - self.ttl_seconds):
+            self.misses += 1
+            return None
+        self.conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, response, model=None, temperature=None):
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, model, temperature, response, created, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?)", (key, model, temperature, response, now, now)
+        )
+        self.stores += 1
+        if self.max_entries:
+            self.conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+            )
+        self.conn.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        entries = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "network_calls": self.network_calls,
+            "entries": entries
+        }
+
+    def close(self):
+        self.conn.close()
+
+def plan_cached(prompts, countries, config, cache):
+    """
+    Look prompts up in the cache. Prompts that normalize to the same key are
+    only sent once. Returns a plan whose "prompts" still need an LLM call;
+    hand their answers to finish_cached().
+    """
+    model = getattr(config, "GROQ_MODEL", "groq/compound-mini")
+    temperature = getattr(config, "LLM_TEMPERATURE", 0.0)
+    answers = [None] * len(prompts)
+    to_fetch = {}   # key -> (prompt, mapping, index) sent to the LLM
+    waiting = []    # (index, key, mapping)
+    for i, prompt in enumerate(prompts):
+        normalized, mapping = normalize_prompt(prompt, countries)
+        key = cache.make_key(normalized, model, temperature)
+        if key in to_fetch:
+            waiting.append((i, key, mapping))
+            continue
+        hit = cache.get(key)
+        if hit is not None:
+            answers[i] = fill_template(hit, mapping)
+            continue
+        to_fetch[key] = (prompt, mapping, i)
+        waiting.append((i, key, mapping))
+    keys = list(to_fetch)
+    return {
+        "answers": answers, "waiting": waiting, "keys": keys, "to_fetch": to_fetch,
+        "prompts": [to_fetch[k][0] for k in keys], "model": model, "temperature": temperature
+    }
+
+def finish_cached(plan, fetched, cache):
+    """Store fresh answers (failures are not cached) and return all answers in prompt order."""
+    cache.network_calls += len(plan["keys"])
+    templates = {}
+    for key, text in zip(plan["keys"], fetched):
+        if is_llm_failure(text):
+            templates[key] = (None, text)
+            continue
+        template = template_response(text, plan["to_fetch"][key][1])
+        cache.put(key, template, plan["model"], plan["temperature"])
+        templates[key] = (template, text)
+    answers = plan["answers"]
+    for i, key, mapping in plan["waiting"]:
+        template, raw = templates.get(key, (None, None))
+        if template is None or plan["to_fetch"][key][2] == i:
+            answers[i] = raw   # the prompt that was actually sent keeps its own answer
+        else:
+            answers[i] = fill_template(template, mapping)
+    return answers
+
+def cached_explanations(prompts, countries, config, cache, call):
+    """Synchronous helper: call(list_of_prompts) -> list_of_answers is used for the misses."""
+    plan = plan_cached(prompts, countries, config, cache)
+    fetched = call(plan["prompts"]) if plan["prompts"] else []
+    return finish_cached(plan, fetched, cache)
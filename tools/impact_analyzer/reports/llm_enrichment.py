@@ -0,0 +1,139 @@
+# reports/llm_enrichment.py
+import asyncio
+import os
+import random
+import time
+
+from reports.report_generator import _extract_text_from_completion
+from reports.llm_cache import plan_cached, finish_cached
+from reports.llm_grouping import build_llm_prompt, plan_llm_requests, fan_out_answers
+
+SYSTEM_PROMPT = "You are an assistant that generates concise technical impact explanations."
+
+class TokenBucket:
+    """
+    Asyncio token bucket: at most `rate` requests per second on average,
+    with bursts of up to `capacity` requests.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class RetryableLLMError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _retry_after(resp):
+    try:
+        return float(resp.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+async def _post_completion(client, prompt, config):
+    payload = {
+        "model": getattr(config, "GROQ_MODEL", "groq/compound-mini"),
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": getattr(config, "LLM_MAX_TOKENS", 480),
+        "temperature": getattr(config, "LLM_TEMPERATURE", 0.0)
+    }
+    resp = await client.post("/chat/completions", json=payload)
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise RetryableLLMError(f"HTTP {resp.status_code}", _retry_after(resp))
+    resp.raise_for_status()
+    return _extract_text_from_completion(resp.json())
+
+def _backoff(attempt, config, retry_after=None):
+    # exponential backoff with full jitter, never shorter than the server's Retry-After
+    base = getattr(config, "LLM_BACKOFF_BASE", 0.5)
+    cap = getattr(config, "LLM_BACKOFF_MAX", 20.0)
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after:
+        delay = max(delay, min(cap, retry_after))
+    return delay
+
+async def _explain(prompt, client, semaphore, bucket, config):
+    import httpx
+    retries = getattr(config, "LLM_MAX_RETRIES", 4)
+    timeout = getattr(config, "LLM_TIMEOUT", 60.0)
+    last_error = None
+    for attempt in range(retries + 1):
+        retry_after = None
+        async with semaphore:
+            await bucket.acquire()
+            try:
+                text = await asyncio.wait_for(_post_completion(client, prompt, config), timeout)
+                return text
+            except RetryableLLMError as e:
+                last_error = e
+                retry_after = e.retry_after
+            except (asyncio.TimeoutError, httpx.TransportError) as e:
+                last_error = e if str(e) else type(e).__name__
+            except Exception as e:
+                return f"LLM call failed: {e}"
+        if attempt < retries:
+            await asyncio.sleep(_backoff(attempt, config, retry_after))
+    return f"LLM call failed after {retries + 1} attempts: {last_error}"
+
+async def _explain_all(prompts, config, key):
+    import httpx
+    semaphore = asyncio.Semaphore(max(1, getattr(config, "LLM_CONCURRENCY", 8)))
+    bucket = TokenBucket(getattr(config, "LLM_RATE_PER_SEC", 4.0))
+    limits = httpx.Limits(max_connections=max(1, getattr(config, "LLM_CONCURRENCY", 8)))
+    async with httpx.AsyncClient(base_url=getattr(config, "LLM_BASE_URL", "https://api.groq.com/openai/v1"),
+                                 headers={"Authorization": f"Bearer {key}"},
+                                 timeout=getattr(config, "LLM_TIMEOUT", 60.0),
+                                 limits=limits) as client:
+        # gather keeps results in the order of the prompts
+        return await asyncio.gather(*[_explain(p, client, semaphore, bucket, config) for p in prompts])
+
+async def enrich_findings_async(findings, config, cache=None, changed_files=None):
+    """
+    Explain every finding concurrently (bounded by LLM_CONCURRENCY and the
+    LLM_RATE_PER_SEC token bucket). Each call gets a timeout and is retried
+    on 429/5xx/transport errors with jittered backoff. Explanations are
+    stored back on the findings in their original order.
+    cache: optional LLMCache; only cache misses reach the network.
+    With LLM_GROUP_FINDINGS, equivalent findings share one batched request.
+    """
+    key = os.environ.get(getattr(config, "LLM_API_KEY_ENV", "GROQ_API_KEY"), "")
+    if not key or not config.USE_LLM:
+        print("No KEY Found")
+        for f in findings:
+            f.llm_explanation = None
+        return findings
+
+    clusters, prompts = plan_llm_requests(findings, changed_files,
+                                          group=getattr(config, "LLM_GROUP_FINDINGS", False),
+                                          max_group=getattr(config, "LLM_GROUP_MAX", 10))
+    if cache is not None:
+        countries = sorted(set(f.module for f in findings))
+        plan = plan_cached(prompts, countries, config, cache)
+        fetched = await _explain_all(plan["prompts"], config, key) if plan["prompts"] else []
+        answers = finish_cached(plan, fetched, cache)
+    else:
+        answers = await _explain_all(prompts, config, key)
+    return fan_out_answers(findings, clusters, answers)
+
+def enrich_with_llm_async(findings, config, cache=None, changed_files=None):
+    return asyncio.run(enrich_findings_async(findings, config, cache=cache, changed_files=changed_files))
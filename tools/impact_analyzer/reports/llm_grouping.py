@@ -0,0 +1,119 @@
+# reports/llm_grouping.py
+import json
+import re
+
+from reports.llm_cache import normalize_prompt, is_llm_failure
+
+ANSWER_FORMAT = 'Answer ONLY with a JSON array: [{"id": "F1", "explanation": "..."}, ...] with one entry per finding id.'
+
+def build_llm_prompt(finding):
+    """Prompt used to ask the LLM about one finding."""
+    prompt_lines = []
+    prompt_lines.append(f"File changed: {finding.changed_file}")
+    prompt_lines.append(f"Confidence: {finding.confidence}")
+    prompt_lines.append("Evidence:")
+    for e in finding.evidence_text():
+        prompt_lines.append(" - " + e)
+    prompt_lines.append("")
+    prompt_lines.append("Provide a concise technical explanation why this module might break (one short paragraph), and give up to 3 recommended test case scenario to do testing or remediation steps.")
+    return "\n".join(prompt_lines)
+
+def schema_delta(change):
+    """(added, removed, reordered) columns between before/after headers of a changed file."""
+    before = change.get("before_header") or []
+    after = change.get("after_header") or []
+    added = tuple(c for c in after if c not in before)
+    removed = tuple(c for c in before if c not in after)
+    common_before = [c for c in before if c in after]
+    common_after = [c for c in after if c in before]
+    return added, removed, common_before != common_after
+
+def finding_signature(finding, deltas, countries):
+    """
+    Findings with the same signature only differ by module/file/line: same
+    confidence, same schema delta and the same evidence once paths, countries
+    and line numbers are templated out.
+    """
+    pattern, _ = normalize_prompt("\n".join(finding.evidence_text()), countries)
+    return (finding.confidence, deltas.get(finding.changed_file), pattern)
+
+def group_findings(findings, changed_files=None, max_group=10):
+    """Clusters of finding indexes, in order of first appearance, at most max_group each."""
+    deltas = {c["filename"]: schema_delta(c) for c in (changed_files or [])}
+    countries = sorted(set(f.module for f in findings))
+    by_sig = {}
+    clusters = []
+    for i, f in enumerate(findings):
+        sig = finding_signature(f, deltas, countries)
+        cluster = by_sig.get(sig)
+        if cluster is None or len(cluster) >= max_group:
+            cluster = []
+            by_sig[sig] = cluster
+            clusters.append(cluster)
+        cluster.append(i)
+    return clusters
+
+def build_group_prompt(findings, change=None):
+    lines = []
+    lines.append(f"The following {len(findings)} findings share the same schema change and evidence pattern.")
+    if change:
+        added, removed, reordered = schema_delta(change)
+        lines.append(f"Schema change: added columns {list(added)}, removed columns {list(removed)}, column order changed: {reordered}")
+    lines.append(f"Confidence: {findings[0].confidence}")
+    lines.append("Findings:")
+    for n, f in enumerate(findings, start=1):
+        lines.append(f"[F{n}] module {f.module}, file {f.file}, changed file {f.changed_file}")
+        for e in f.evidence_text():
+            lines.append("  - " + e)
+    lines.append("")
+    lines.append("For each finding, provide a concise technical explanation why the module might break (one short paragraph), and give up to 3 recommended test case scenario to do testing or remediation steps.")
+    lines.append(ANSWER_FORMAT)
+    return "\n".join(lines)
+
+def plan_llm_requests(findings, changed_files=None, group=False, max_group=10):
+    """Returns (clusters, prompts): one prompt per cluster of finding indexes."""
+    if not group:
+        return [[i] for i in range(len(findings))], [build_llm_prompt(f) for f in findings]
+    changes = {c["filename"]: c for c in (changed_files or [])}
+    clusters = group_findings(findings, changed_files, max_group=max_group)
+    prompts = []
+    for cluster in clusters:
+        if len(cluster) == 1:
+            prompts.append(build_llm_prompt(findings[cluster[0]]))
+        else:
+            members = [findings[i] for i in cluster]
+            prompts.append(build_group_prompt(members, changes.get(members[0].changed_file)))
+    return clusters, prompts
+
+def parse_group_answer(text, count):
+    """{ position: explanation } parsed from a batched JSON answer, or None if unparseable."""
+    if not text:
+        return None
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end <= start:
+        return None
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    out = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        m = re.fullmatch(r"F?(\d+)", str(item.get("id", "")).strip())
+        if m and 1 <= int(m.group(1)) <= count and item.get("explanation"):
+            out[int(m.group(1)) - 1] = str(item["explanation"]).strip()
+    return out or None
+
+def fan_out_answers(findings, clusters, answers):
+    """Store each cluster's answer on its findings (per-finding part when structured)."""
+    for cluster, answer in zip(clusters, answers):
+        if len(cluster) == 1 or is_llm_failure(answer):
+            for i in cluster:
+                findings[i].llm_explanation = answer
+            continue
+        parsed = parse_group_answer(answer, len(cluster)) or {}
+        for pos, i in enumerate(cluster):
+            # fall back to the whole answer when the model did not follow the format
+            findings[i].llm_explanation = parsed.get(pos, answer)
+    return findings
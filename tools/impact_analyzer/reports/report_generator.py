@@ -1,34 +1,314 @@
 # reports/report_generator.py
+import gzip
+import hashlib
 import json
 import os
 from datetime import datetime
 from pathlib import Path
 
-def write_json_report(report, out_path):
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2)
-
-def write_text_report(report, out_path):
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    lines = []
-    lines.append(f"Impact Analysis Report - {datetime.utcnow().isoformat()}Z")
-    lines.append("="*60)
-    lines.append("")
-    for r in report.get("findings", []):
-        lines.append(f"MODULE: {r['module']}")
-        lines.append(f"  IMPACT: {r['impact']}")
-        lines.append(f"  CONFIDENCE: {r['confidence']}")
-        lines.append("  EVIDENCE:")
-        for e in r.get("evidence", []):
-            lines.append(f"    - {e}")
-        if r.get("llm_explanation"):
-            lines.append("  LLM Explanation:")
-            for l in r["llm_explanation"].splitlines():
-                lines.append("    " + l)
-        lines.append("-"*40)
+from reports.findings import SchemaTable, compact_summary
+
+def _makedirs_for(path):
+    if path and os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+def _open_partial(path):
+    """Open a hidden sibling of path for writing; it is moved onto path once complete."""
+    _makedirs_for(path)
+    head, name = os.path.split(path)
+    return open(os.path.join(head, f".{name}.{os.getpid()}.tmp"), "w", encoding="utf-8")
+
+# compressed copies written next to a report: format -> file suffix
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+_CHUNK = 1 << 20
+
+def _brotli_compressor(quality):
+    try:
+        import brotli
+    except ImportError:
+        try:
+            import brotlicffi as brotli
+        except ImportError:   # optional dependency
+            return None
+    return brotli.Compressor(quality=quality)
+
+def compress_report(path, compression):
+    """
+    Write compressed copies of a finished report next to it, streaming the plain
+    file in chunks: { "gzip": level, "br": quality } -> path.gz / path.br.
+    Brotli is skipped when neither brotli nor brotlicffi is installed. The plain
+    file is left in place. Returns the paths written.
+    """
+    if not compression or not path or not os.path.exists(path):
+        return []
+    written = []
+    for fmt, level in compression.items():
+        out = path + COMPRESSED_SUFFIXES[fmt]
+        if fmt == "gzip":
+            # mtime=0: identical reports give identical .gz files
+            with open(path, "rb") as src, open(out, "wb") as raw, \
+                    gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=level, mtime=0) as dst:
+                for chunk in iter(lambda: src.read(_CHUNK), b""):
+                    dst.write(chunk)
+        else:
+            compressor = _brotli_compressor(level)
+            if compressor is None:
+                continue
+            with open(path, "rb") as src, open(out, "wb") as dst:
+                for chunk in iter(lambda: src.read(_CHUNK), b""):
+                    dst.write(compressor.process(chunk))
+                dst.write(compressor.finish())
+        written.append(out)
+    return written
+
+def _indent_json(obj, pretty, prefix):
+    if not pretty:
+        return json.dumps(obj, separators=(",", ":"))
+    return json.dumps(obj, indent=2).replace("\n", "\n" + prefix)
+
+def _finding_text_lines(r):
+    yield f"MODULE: {r['module']}"
+    yield f"  IMPACT: {r['impact']}"
+    yield f"  CONFIDENCE: {r['confidence']}"
+    yield "  EVIDENCE:"
+    for e in r.get("evidence", []):
+        yield f"    - {e}"
+    if r.get("llm_explanation"):
+        yield "  LLM Explanation:"
+        for l in r["llm_explanation"].splitlines():
+            yield "    " + l
+    yield "-"*40
+
+def _schema_text_lines(schemas):
+    yield "SCHEMAS:"
+    for sid, columns in schemas.items():
+        yield f"  {sid} ({len(columns)} columns): {columns}"
+
+def _finding_dict(finding):
+    # Finding objects are rendered here, at output time; plain dicts pass through
+    return finding.as_dict() if hasattr(finding, "as_dict") else finding
+
+class StreamingReportWriter:
+    """
+    Writes findings to the JSON / NDJSON / text reports as they are produced,
+    so memory does not grow with the number of findings. Any path may be None.
+    The JSON report lists findings first; the summary (which needs the final
+    findings count) is written last, and also on its own to summary_path.
+    Headers are written once, in the summary's schema table; findings and
+    changed_files refer to them by schema ID.
+    compression: { "gzip": level, "br": quality }; every report also gets
+    compressed copies (see compress_report) once it is complete.
+    Reports are streamed into temporary files next to their paths and only
+    replace them in finish(), so an interrupted run leaves the previous
+    reports in place; leaving the with-block without finish() (or on an
+    exception) removes the temporary files.
+    """
+
+    def __init__(self, json_path=None, text_path=None, ndjson_path=None, summary_path=None, pretty=True,
+                 index_path=None, shard_dir=None, compression=None):
+        self.pretty = pretty
+        self.summary_path = summary_path
+        self.compression = compression or {}
+        self.count = 0
+        self._json = self._text = self._ndjson = None
+        self._targets = {}   # temporary file handle -> final report path
+        self._shards = ShardWriter(index_path, shard_dir, compression=compression) \
+            if index_path and shard_dir else None
+        if json_path:
+            self._json = self._partial(json_path)
+            self._json.write('{\n  "findings": [' if pretty else '{"findings":[')
+        if ndjson_path:
+            self._ndjson = self._partial(ndjson_path)
+        if text_path:
+            self._text = self._partial(text_path)
+            self._text.write(f"Impact Analysis Report - {datetime.utcnow().isoformat()}Z\n")
+            self._text.write("="*60 + "\n")
+
+    def _partial(self, path):
+        fh = _open_partial(path)
+        self._targets[fh] = path
+        return fh
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._close()
+
+    def write_finding(self, finding):
+        finding = _finding_dict(finding)
+        if self._json:
+            sep = "," if self.count else ""
+            if self.pretty:
+                self._json.write(sep + "\n    " + _indent_json(finding, True, "    "))
+            else:
+                self._json.write(sep + _indent_json(finding, False, ""))
+        if self._ndjson:
+            self._ndjson.write(json.dumps(finding, separators=(",", ":")) + "\n")
+        if self._text:
+            for line in _finding_text_lines(finding):
+                self._text.write("\n" + line)
+        if self._shards:
+            self._shards.write_finding(finding)
+        self.count += 1
+
+    def finish(self, summary):
+        raw, summary = summary, compact_summary(summary)
+        if self._json:
+            if self.pretty:
+                end = "\n  ]" if self.count else "]"
+                self._json.write(end + ',\n  "summary": ' + _indent_json(summary, True, "  ") + "\n}")
+            else:
+                self._json.write('],"summary":' + _indent_json(summary, False, "") + "}")
+        if self.summary_path:
+            _makedirs_for(self.summary_path)
+            with open(self.summary_path, "w", encoding="utf-8") as f:
+                f.write(_indent_json(summary, self.pretty, ""))
+            compress_report(self.summary_path, self.compression)
+        if self._text and summary["schemas"]:
+            self._text.write("\n")
+            for line in _schema_text_lines(summary["schemas"]):
+                self._text.write("\n" + line)
+        if self._shards:
+            self._shards.finish(raw)
+        self._close(complete=True)
+
+    def _close(self, complete=False):
+        for fh in (self._json, self._ndjson, self._text):
+            if fh:
+                fh.close()
+                path = self._targets.pop(fh)
+                if complete:
+                    os.replace(fh.name, path)
+                    compress_report(path, self.compression)
+                elif os.path.exists(fh.name):
+                    os.remove(fh.name)
+        self._json = self._ndjson = self._text = None
+        if self._shards:
+            self._shards.close()
+
+class ShardWriter:
+    """
+    Sharded report for the HTML viewer: one NDJSON shard of findings per changed
+    file, plus a small index (changed files, column counts, per-shard finding
+    and risk totals) that the viewer loads first. Shards are fetched on demand.
+    With compression, the index and every rewritten shard get compressed copies.
+    """
+
+    MAX_OPEN = 64   # shard files kept open at once
+
+    def __init__(self, index_path, shard_dir, keep=None, compression=None):
+        """
+        keep: { changed_file: entry } of shards from a previous write that are
+        still valid; they are listed in the index without being rewritten.
+        Every other shard file in shard_dir is removed.
+        """
+        self.index_path = index_path
+        self.shard_dir = shard_dir
+        self.compression = compression or {}
+        os.makedirs(shard_dir, exist_ok=True)
+        self.shards = dict(keep or {})   # changed_file -> index entry
+        keep_names = set(e["_name"] for e in self.shards.values())
+        # drop shards of a previous run, with their compressed copies
+        for name in os.listdir(shard_dir):
+            plain = name
+            for suffix in COMPRESSED_SUFFIXES.values():
+                if name.endswith(suffix):
+                    plain = name[:-len(suffix)]
+            if plain.endswith(".ndjson") and plain not in keep_names:
+                os.remove(os.path.join(shard_dir, name))
+        self._open = {}      # changed_file -> file handle (insertion order = LRU)
+        self._started = set()
+
+    @staticmethod
+    def shard_name(changed_file):
+        # stable per changed file, so a single shard can be rewritten in place
+        return "shard_" + hashlib.sha1(changed_file.encode("utf-8")).hexdigest()[:16] + ".ndjson"
+
+    def _handle(self, changed_file):
+        fh = self._open.pop(changed_file, None)
+        if fh is None:
+            entry = self.shards[changed_file]
+            if len(self._open) >= self.MAX_OPEN:
+                oldest = next(iter(self._open))
+                self._open.pop(oldest).close()
+            mode = "a" if changed_file in self._started else "w"
+            self._started.add(changed_file)
+            fh = open(os.path.join(self.shard_dir, entry["_name"]), mode, encoding="utf-8")
+        self._open[changed_file] = fh
+        return fh
+
+    def write_finding(self, finding):
+        finding = _finding_dict(finding)
+        key = finding.get("changed_file") or ""
+        entry = self.shards.get(key)
+        if entry is None or key not in self._started:
+            entry = {"changed_file": key, "_name": self.shard_name(key),
+                     "findings": 0, "risk": {"High": 0, "Medium": 0, "Low": 0}}
+            self.shards[key] = entry
+        self._handle(key).write(json.dumps(finding, separators=(",", ":")) + "\n")
+        entry["findings"] += 1
+        risk = finding.get("confidence")
+        entry["risk"][risk] = entry["risk"].get(risk, 0) + 1
+
+    def finish(self, summary):
+        self.close()
+        for changed_file in self._started:
+            compress_report(os.path.join(self.shard_dir, self.shards[changed_file]["_name"]), self.compression)
+        rel_dir = os.path.relpath(self.shard_dir, os.path.dirname(os.path.abspath(self.index_path)))
+        totals = {"High": 0, "Medium": 0, "Low": 0}
+        shards = []
+        # index lists shards in changed-file order
+        order = {c["filename"]: i for i, c in enumerate(summary.get("changed_files", []))}
+        entries = sorted(self.shards.values(), key=lambda e: order.get(e["changed_file"], len(order)))
+        for entry in entries:
+            for k, v in entry["risk"].items():
+                totals[k] = totals.get(k, 0) + v
+            shards.append({
+                "changed_file": entry["changed_file"],
+                "shard": Path(rel_dir, entry["_name"]).as_posix(),
+                "findings": entry["findings"],
+                "risk": entry["risk"]
+            })
+        schemas = SchemaTable()
+        index = {
+            "changed_files": [{
+                "filename": c["filename"],
+                "before_columns": len(c.get("before_header") or []),
+                "after_columns": len(c.get("after_header") or []),
+                "before_schema": getattr(schemas.intern(c.get("before_header")), "id", None),
+                "after_schema": getattr(schemas.intern(c.get("after_header")), "id", None)
+            } for c in summary.get("changed_files", [])],
+            "schemas": schemas.as_dict(),
+            "findings_count": summary.get("findings_count", 0),
+            "risk_totals": totals,
+            "shards": shards
+        }
+        _makedirs_for(self.index_path)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        compress_report(self.index_path, self.compression)
+
+    def close(self):
+        for fh in self._open.values():
+            fh.close()
+        self._open = {}
+
+def write_json_report(report, out_path, pretty=True, compression=None):
+    _makedirs_for(out_path)
     with open(out_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+        if pretty:
+            json.dump(report, f, indent=2)
+        else:
+            json.dump(report, f, separators=(",", ":"))
+    compress_report(out_path, compression)
+
+def write_text_report(report, out_path, compression=None):
+    # written line by line instead of joining the whole report in memory
+    with StreamingReportWriter(text_path=out_path, compression=compression) as w:
+        for r in report.get("findings", []):
+            w.write_finding(r)
+        w.finish({})
 
 # reports/report_generator.py
 import os
@@ -91,7 +371,7 @@ def call_llm_for_explanation(prompt, config):
     try:
         from groq import Groq
         client = Groq(A_KY=key)
-        model = "groq/compound-mini" 
+        model = getattr(config, "GROQ_MODEL", "groq/compound-mini")
 
         resp = client.chat.completions.create(
             model=model,
@@ -99,8 +379,8 @@ def call_llm_for_explanation(prompt, config):
                 {"role": "system", "content": "You are an assistant that generates concise technical impact explanations."},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=480,
-            temperature=0.0
+            max_tokens=getattr(config, "LLM_MAX_TOKENS", 480),
+            temperature=getattr(config, "LLM_TEMPERATURE", 0.0)
         )
 
         # extract clean text
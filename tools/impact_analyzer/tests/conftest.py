@@ -0,0 +1,6 @@
+# tests/conftest.py
+# Tests import the analyzer packages the way the scripts do, from tools/impact_analyzer.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+# tests/test_analyze_codebases.py
+import os
+
+import pytest
+
+import analyzer
+from analyzer import analyze_codebase, analyze_codebases
+from parsers.analysis_cache import AnalysisCache
+
+def _module(n):
+    return (f'import csv\nIN = "../shared/in_{n}.csv"\n'
+            f'with open(IN) as f:\n    for a, b in csv.reader(f):\n        print(a, b, {n})\n')
+
+def _snapshot(root, countries=("country_usa", "country_india"), modules=3, offset=0):
+    for country in countries:
+        os.makedirs(os.path.join(root, country))
+        for i in range(modules):
+            with open(os.path.join(root, country, f"module_{i}.py"), "w", encoding="utf-8") as f:
+                f.write(_module(i + offset))
+    return str(root)
+
+class _NoPool:
+    def __init__(self, *args, **kwargs):
+        raise AssertionError("process pool used")
+
+def test_pool_results_match_serial_order(tmp_path):
+    before = _snapshot(tmp_path / "before")
+    after = _snapshot(tmp_path / "after", offset=1)
+    serial = analyze_codebases([before, after], jobs=1)
+    pooled = analyze_codebases([before, after], jobs=3)
+    assert pooled == serial
+    for res in pooled:
+        assert list(res) == ["country_india", "country_usa"]
+        for files in res.values():
+            assert list(files) == sorted(files)
+    assert serial[1]["country_usa"][os.path.join("country_usa", "module_2.py")]["file_reads"] == \
+        [(3, "../shared/in_3.csv")]
+
+@pytest.mark.parametrize("jobs, modules", [(1, 3), (4, 1)])
+def test_serial_without_pool(tmp_path, monkeypatch, jobs, modules):
+    # one worker, or a single file to analyze, never starts a process pool
+    monkeypatch.setattr(analyzer, "ProcessPoolExecutor", _NoPool)
+    root = _snapshot(tmp_path / "snap", countries=("country_usa",), modules=modules)
+    assert len(analyze_codebase(root, jobs=jobs)["country_usa"]) == modules
+
+def test_identical_files_analyzed_once(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"), "test")
+    before = _snapshot(tmp_path / "before")
+    after = _snapshot(tmp_path / "after")
+    code_before, code_after = analyze_codebases([before, after], cache=cache, jobs=2)
+    assert code_before == code_after
+    # the same three contents in both countries and both snapshots
+    assert len(os.listdir(tmp_path / "cache")) == 3
+
+def test_missing_snapshot(tmp_path):
+    assert analyze_codebases([str(tmp_path / "missing")], jobs=2) == [{}]
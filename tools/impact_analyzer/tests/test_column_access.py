@@ -0,0 +1,63 @@
+# tests/test_column_access.py
+import pytest
+
+import config
+from analyzer import infer_impacts
+from parsers.code_parser import analyze_python_source
+
+OPEN = 'import csv\nwith open("../shared/data.csv") as f:\n'
+SOURCES = {
+    "key": OPEN + '    for row in csv.DictReader(f):\n        print(row["a"])\n',
+    "get": OPEN + '    for row in csv.DictReader(f):\n        print(row.get("b"))\n',
+    "header.index": OPEN + '    r = csv.reader(f)\n    header = next(r)\n    i = header.index("b")\n',
+    "index": OPEN + '    r = csv.reader(f)\n    next(r)\n    for row in r:\n        print(row[1])\n',
+    "unpack": OPEN + '    r = csv.reader(f)\n    next(r)\n    for a, b, c in r:\n        print(a)\n',
+    "usecols": 'import pandas as pd\ndf = pd.read_csv("../shared/data.csv", usecols=["a", "c"])\n',
+    "passed": OPEN + '    for row in csv.reader(f):\n        handle(row)\n',
+    "write": 'import csv\nwith open("../shared/data.csv", "w") as f:\n    csv.writer(f).writerow(["a"])\n',
+}
+
+def _access(name):
+    (access,) = analyze_python_source(SOURCES[name])["column_access"]
+    return access
+
+def test_tracked_accesses():
+    assert _access("key")["names"] == [[4, "a", "key"]] and _access("key")["kind"] == "dict"
+    assert _access("get")["names"] == [[4, "b", "get"]]
+    assert _access("header.index")["names"] == [[5, "b", "header.index"]]
+    assert _access("index")["indexes"] == [[6, 1]] and _access("index")["kind"] == "positional"
+    assert _access("unpack")["unpack"] == [[5, 3]]
+    assert _access("usecols")["names"] == [[2, "a", "usecols"], [2, "c", "usecols"]]
+    assert _access("passed")["opaque"] == [[4, "passed to handle()"]]
+    write = _access("write")
+    assert (write["mode"], write["tracked"]) == ("w", False)
+
+def _readers(name, after, prune=True):
+    code = {"country_x": {"country_x/m.py": analyze_python_source(SOURCES[name])}}
+    change = {"filename": "shared/data.csv", "before_header": ["a", "b", "c"], "after_header": after}
+    stats = {}
+    findings = infer_impacts([change], code, code, prune=prune, stats=stats)
+    return [f.confidence for f in findings if f.kind == "reader"], stats.get("readers_pruned", 0)
+
+@pytest.mark.parametrize("name, after, expected", [
+    ("key", ["a", "b"], []),                  # only 'c' removed, row["a"] untouched
+    ("key", ["b", "c"], ["High"]),
+    ("get", ["a", "c"], ["Medium"]),          # row.get() survives a removed column
+    ("get", ["a", "b"], []),
+    ("header.index", ["a", "x", "c"], ["High"]),   # 'b' renamed in place
+    ("header.index", ["a", "b", "c", "d"], []),
+    ("index", ["a", "b", "c", "d"], []),      # row[1] still 'b'
+    ("index", ["a", "x", "b", "c"], ["High"]),
+    ("unpack", ["a", "b", "c", "d"], ["High"]),   # three names, four fields
+    ("usecols", ["a", "c", "d"], []),
+    ("usecols", ["a", "b"], ["High"]),
+    ("passed", ["a", "c", "b"], ["Medium"]),  # rows handed to other code: layout change kept
+])
+def test_pruned_readers(name, after, expected):
+    confidences, pruned = _readers(name, after)
+    assert confidences == expected
+    assert pruned == (0 if expected else 1)
+
+def test_not_pruned_by_default():
+    assert config.PRUNE_UNAFFECTED_READERS is False
+    assert _readers("key", ["a", "b"], prune=False) == (["Low"], 0)
@@ -0,0 +1,49 @@
+# tests/test_column_profiler.py
+import pytest
+
+from parsers import column_profiler
+from parsers.column_profiler import profile_csv
+
+COLUMNS = {
+    "big_int": ["12345678901234567891", "12345678901234567893", "7", ""],
+    "underscored": ["1_000", "2", "3", "4"],
+    "floats": ["1.5", "2", "-3e2", "NA"],
+    "strings": ["beta", "alpha", " gamma ", "null"],
+    "mixed": ["1", "x", "2.5", "n/a"],
+    "empty": ["", "-", "none", "NaN"]
+}
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "profile.csv"
+    names = list(COLUMNS)
+    rows = zip(*(COLUMNS[n] for n in names))
+    path.write_text("\n".join([",".join(names)] + [",".join(r) for r in rows]) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_numpy_and_python_paths_agree(csv_path):
+    pytest.importorskip("numpy")
+    for chunk_rows in (1, 3, 50):
+        python = profile_csv(csv_path, chunk_rows=chunk_rows, use_numpy=False)
+        numpy = profile_csv(csv_path, chunk_rows=chunk_rows, use_numpy=True)
+        assert numpy == python
+
+def test_value_classification(csv_path):
+    columns = profile_csv(csv_path, use_numpy=False)["columns"]
+    assert columns["big_int"]["type"] == "int"
+    assert columns["big_int"]["max"] == 12345678901234567893
+    assert columns["underscored"]["type"] == "str"
+    assert columns["floats"] == {"type": "float", "rows": 4, "null_rate": 0.25, "distinct": 3,
+                                 "min": -300.0, "max": 2.0}
+    assert (columns["strings"]["min"], columns["strings"]["max"]) == ("alpha", "gamma")
+    assert columns["mixed"]["type"] == "str"
+    assert columns["empty"]["type"] == "empty"
+
+def test_numpy_path_is_opt_in(csv_path, monkeypatch):
+    def numpy_path(stats, values):
+        raise AssertionError("numpy path used")
+    monkeypatch.setattr(column_profiler, "_profile_values_numpy", numpy_path)
+    monkeypatch.setattr(column_profiler, "np", object())
+    assert profile_csv(csv_path)["columns"]["floats"]["type"] == "float"
+    with pytest.raises(AssertionError):
+        profile_csv(csv_path, use_numpy=True)
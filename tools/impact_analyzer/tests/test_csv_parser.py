@@ -0,0 +1,78 @@
+# tests/test_csv_parser.py
+import bz2
+import gzip
+import os
+
+import pytest
+
+from analyzer import gather_headers_recursive, diff_headers, dataset_paths
+from graph.dependency_graph import normalize_shared_path
+from parsers import csv_parser
+from parsers.csv_parser import extract_csv_header, dataset_name, compression_of
+
+CSV = b"id,name,amount\n1,x,2\n"
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+@pytest.mark.parametrize("suffix, compress", [(".gz", gzip.compress), (".bz2", bz2.compress)])
+def test_compressed_headers(tmp_path, suffix, compress):
+    path = _write(str(tmp_path / ("orders.csv" + suffix)), compress(CSV))
+    assert extract_csv_header(path) == ["id", "name", "amount"]
+    assert extract_csv_header(path, fast=False) == ["id", "name", "amount"]
+
+def test_zstd_header(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = _write(str(tmp_path / "orders.csv.zst"), zstandard.ZstdCompressor().compress(CSV))
+    assert extract_csv_header(path) == ["id", "name", "amount"]
+
+def test_dataset_names():
+    assert dataset_name("shared/x.csv.gz") == "shared/x.csv"
+    assert dataset_name("shared/X.CSV.BZ2") == "shared/X.CSV"
+    assert dataset_name("shared/x.csv") == "shared/x.csv"
+    assert compression_of("x.csv.zst") == ".zst" and compression_of("x.csv") is None
+    assert normalize_shared_path("..\\shared\\x.csv.gz") == "x.csv"
+    # a plain file wins over its compressed copies
+    assert dataset_paths({"s/x.csv.gz": ["a"], "s/x.csv": ["b"], "s/y.csv.bz2": ["c"]}) == \
+        {"s/x.csv": "s/x.csv", "s/y.csv": "s/y.csv.bz2"}
+
+def test_compressing_a_file_is_not_a_change(tmp_path):
+    before, after = str(tmp_path / "before"), str(tmp_path / "after")
+    _write(os.path.join(before, "shared", "orders.csv"), CSV)
+    _write(os.path.join(after, "shared", "orders.csv.gz"), gzip.compress(CSV))
+    _write(os.path.join(before, "shared", "items.csv"), CSV)
+    _write(os.path.join(after, "shared", "items.csv.bz2"), bz2.compress(b"id,name\n1,x\n"))
+    files_before, files_after = gather_headers_recursive(before), gather_headers_recursive(after)
+    assert sorted(files_after) == ["shared/items.csv.bz2", "shared/orders.csv.gz"]
+    assert diff_headers(files_before, files_after) == [
+        {"filename": "shared/items.csv", "before_header": ["id", "name", "amount"], "after_header": ["id", "name"]}]
+
+def _write_text(path, text):
+    path.write_text(text, encoding="utf-8", newline="")
+    return str(path)
+
+def test_cached_delimiter_not_reused_for_other_dialect(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_parser, "_dialect_cache", {})
+    comma = _write_text(tmp_path / "a.csv", "id,name,amount\n1,x,2\n")
+    # a ';' file whose header also contains a comma
+    semicolon = _write_text(tmp_path / "b.csv", "id;name,full;amount\n1;x y;2\n")
+    assert extract_csv_header(comma) == ["id", "name", "amount"]
+    assert extract_csv_header(semicolon) == ["id", "name,full", "amount"]
+    assert extract_csv_header(comma) == ["id", "name", "amount"]
+
+def test_cached_delimiter_reused_when_records_agree(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_parser, "_dialect_cache", {})
+    first = _write_text(tmp_path / "a.csv", "id|name\n1|x\n")
+    # '|' splits both records into 3 fields, even though ',' is more frequent in the header
+    second = _write_text(tmp_path / "b.csv", "id,a|name,b,c|amount\n1|2|3\n")
+    assert extract_csv_header(first) == ["id", "name"]
+    assert extract_csv_header(second) == ["id,a", "name,b,c", "amount"]
+
+def test_header_only_and_quoted_records(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_parser, "_dialect_cache", {})
+    assert extract_csv_header(_write_text(tmp_path / "a.csv", "id;name;amount")) == ["id", "name", "amount"]
+    quoted = _write_text(tmp_path / "b.csv", 'id,note\r\n1,"a;b\nc"\r\n')
+    assert extract_csv_header(quoted) == ["id", "note"]
@@ -0,0 +1,88 @@
+# tests/test_dependency_graph.py
+import os
+
+import pytest
+
+from analyzer import analyze_codebase, infer_impacts
+from graph.dependency_graph import DependencyGraph, FILE, io_paths, shared_file_key
+
+SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "snapshots", "after")
+
+@pytest.fixture(scope="module")
+def graph():
+    return DependencyGraph.from_analysis(analyze_codebase(SNAPSHOT))
+
+def _radius(graph, fname):
+    return {graph.names[m][1]: hops for m, hops, _ in graph.blast_radius([graph.file_id(fname)])}
+
+def test_upstream_modules_not_in_blast_radius(graph):
+    # module_a writes module_a_output, module_b reads it and writes module_b_output,
+    # module_c and module_d read module_b_output
+    radius = _radius(graph, "shared/module_b_output_india.csv")
+    assert radius == {"country_india/module_c.py": 1, "country_india/module_d.py": 1}
+
+def test_downstream_chain(graph):
+    radius = _radius(graph, "shared/module_a_output_usa.csv")
+    assert radius == {"country_usa/module_b.py": 1, "country_usa/module_c.py": 2, "country_usa/module_d.py": 2}
+
+def test_no_self_loops(graph):
+    for m in range(len(graph)):
+        assert m not in [t for f in graph.successors(m) for t in graph.successors(f)]
+
+def test_write_mode_opens_and_assignments_are_not_reads():
+    src = {"file_reads": [(3, "in.csv"), (5, "out.csv"), [7, "log.csv"]],
+           "file_writes": [(1, "in.csv"), (5, "out.csv"), [7, "log.csv"]]}
+    assert io_paths(src) == (["out.csv", "log.csv"], ["in.csv"])
+    assert io_paths({"file_reads": [(3, "in.csv")]}) == ([], ["in.csv"])
+
+def test_modes_from_column_access_and_runtime_io():
+    src = {"file_reads": [(3, "in.csv"), (5, "out.csv"), (7, "log.csv")],
+           "file_writes": [(1, "in.csv"), (5, "out.csv")],
+           "column_access": [{"read": 0, "mode": "r"}, {"read": 1, "mode": "w"}, {"read": 2, "mode": "w"}],
+           "runtime_io": {"reads": ["traced_in.csv"], "writes": ["traced_out.csv"]}}
+    assert io_paths(src) == (["out.csv", "log.csv", "traced_out.csv"], ["in.csv", "traced_in.csv"])
+
+def test_csr_layout():
+    analysis = {"c": {"c/a.py": {"file_reads": [(1, "x.csv"), (1, "x.csv")], "file_writes": [(1, "x.csv")]},
+                      "c/b.py": {"file_reads": [(2, "x.csv"), (3, "y.csv")]}}}
+    graph = DependencyGraph.from_analysis(analysis)
+    a, b = graph.module_id("c", "c/a.py"), graph.module_id("c", "c/b.py")
+    x, y = graph.file_id("c/x.csv"), graph.file_id("c/y.csv")
+    assert list(graph.successors(a)) == [x]     # duplicate edge dropped
+    assert list(graph.successors(x)) == [b]
+    assert list(graph.successors(y)) == [b]
+    assert list(graph.successors(b)) == []
+    assert len(graph.offsets) == len(graph) + 1 and graph.offsets[-1] == len(graph.targets) == 3
+    order, cyclic = graph.topological_order()
+    assert order.index(a) < order.index(x) < order.index(b) and cyclic == []
+
+def test_shared_file_keys():
+    assert shared_file_key("../shared/x.csv.gz", "country_a/m.py") == "shared/x.csv"
+    assert shared_file_key("..\\shared\\x.csv", "country_a/m.py") == "shared/x.csv"
+    assert shared_file_key("output.csv", "country_a/m.py") == "country_a/output.csv"
+    assert shared_file_key("shared/x.csv") == "shared/x.csv"
+    # targets that cannot be placed in the snapshot match any file of their name
+    for value in ("IN", "D:\\data\\x.csv", "/data/x.csv", "../../x.csv"):
+        assert shared_file_key(value, "country_a/m.py") == "*/" + (value if value == "IN" else "x.csv")
+
+# two countries with their own output.csv; country_c opens it from outside the snapshot
+COUNTRIES = {
+    "country_a": {"country_a/w.py": {"file_reads": [(1, "output.csv")], "file_writes": [(1, "output.csv")]},
+                  "country_a/r.py": {"file_reads": [(2, "output.csv")]}},
+    "country_b": {"country_b/w.py": {"file_reads": [(1, "output.csv")], "file_writes": [(1, "output.csv")]},
+                  "country_b/r.py": {"file_reads": [(2, "output.csv"), (3, "../shared/b.csv")],
+                                     "file_writes": [(3, "../shared/b.csv")]},
+                  "country_b/next.py": {"file_reads": [(1, "../shared/b.csv")]}},
+    "country_c": {"country_c/r.py": {"file_reads": [(4, "/data/output.csv")]}},
+}
+
+def test_same_file_name_in_two_folders():
+    change = {"filename": "country_a/output.csv", "before_header": ["id"], "after_header": ["id", "x"]}
+    found = infer_impacts([change], COUNTRIES, COUNTRIES, transitive=True)
+    assert {f.file for f in found} == {"country_a/w.py", "country_a/r.py", "country_c/r.py"}
+
+def test_unplaced_targets_do_not_link_folders():
+    graph = DependencyGraph.from_analysis(COUNTRIES)
+    radius = {graph.names[m][1]: hops for m, hops, _ in graph.blast_radius([graph.file_id("country_b/output.csv")])}
+    assert radius == {"country_b/r.py": 1, "country_c/r.py": 1, "country_b/next.py": 2}
+    assert graph.file_id("elsewhere/output.csv") == graph.ids[FILE, "*/output.csv"]
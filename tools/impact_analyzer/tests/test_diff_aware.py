@@ -0,0 +1,42 @@
+# tests/test_diff_aware.py
+import os
+
+from analyzer import analyze_codebases
+
+SOURCE = 'import csv\nwith open("../shared/out.csv") as f:\n    for a, b in csv.reader(f):\n        print(a, b)\n'
+
+def _write(root, rel, text):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def _snapshots(tmp_path):
+    before, after = str(tmp_path / "before"), str(tmp_path / "after")
+    for root in (before, after):
+        _write(root, "country_usa/module_a.py", SOURCE)
+        _write(root, "country_india/module_a.py", SOURCE)
+    _write(before, "country_usa/module_b.py", "print('before')\n")
+    _write(after, "country_usa/module_b.py", "print('after')\n")
+    return before, after
+
+def test_identical_files_share_one_analysis(tmp_path):
+    before, after = _snapshots(tmp_path)
+    work_log = {}
+    code_before, code_after = analyze_codebases([before, after], jobs=1, diff_aware=True, work_log=work_log)
+    a = os.path.join("country_usa", "module_a.py")
+    b = os.path.join("country_usa", "module_b.py")
+    shared = code_before["country_usa"][a]
+    assert shared["file_reads"] == [(2, "../shared/out.csv")]
+    assert code_after["country_usa"][a] is shared
+    assert code_before["country_india"][os.path.join("country_india", "module_a.py")] is shared
+    assert code_before["country_usa"][b] is not code_after["country_usa"][b]
+    assert (work_log["files_total"], work_log["files_analyzed"], work_log["files_reused"]) == (6, 3, 3)
+    assert work_log["analyzed"] == [[os.path.join("country_india", "module_a.py"), b], [b]]
+
+def test_same_results_without_diff_aware(tmp_path):
+    before, after = _snapshots(tmp_path)
+    work_log = {}
+    plain = analyze_codebases([before, after], jobs=1, work_log=work_log)
+    assert plain == analyze_codebases([before, after], jobs=2, diff_aware=True)
+    assert work_log["files_analyzed"] == 6 and work_log["files_reused"] == 0
@@ -0,0 +1,76 @@
+# tests/test_git_source.py
+import bz2
+import gzip
+import os
+import subprocess
+
+import pytest
+
+import analyzer
+from analyzer import list_changed_files_git
+from parsers.git_source import GitTree, GitCatFile
+
+WIDE = ",".join(f"column_{i}" for i in range(20))
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", repo, "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                   check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+def _commit(repo, files):
+    for rel, data in files.items():
+        path = os.path.join(repo, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "snapshot")
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = str(tmp_path)
+    _git(repo, "init", "-q")
+    _commit(repo, {
+        "shared/orders.csv": b"id,name,amount\n1,x,2\n",
+        "shared/items.csv.gz": gzip.compress(b"id,sku\n1,a\n"),
+        "shared/stock.csv.bz2": bz2.compress(b"id,qty\n1,5\n"),
+        "shared/wide.csv": (WIDE + "\n1\n").encode(),
+        "shared/prices.csv": b"id,price\n1,2\n2,3\n",
+        "shared/same.csv": b"id\n1\n"})
+    _git(repo, "tag", "before")
+    _commit(repo, {
+        "shared/orders.csv": b"id,amount\n1,2\n",
+        "shared/items.csv.gz": gzip.compress(b"id,sku,qty\n1,a,3\n"),
+        "shared/stock.csv.bz2": bz2.compress(b"id,stock\n1,5\n"),
+        "shared/wide.csv": (WIDE + ",extra\n1\n").encode(),
+        "shared/prices.csv": b"id,price\n1,x\n2,y\n"})
+    return repo
+
+def _changes(repo, profile=False):
+    with GitCatFile(repo) as cat:
+        changed = list_changed_files_git(GitTree(repo, "before"), GitTree(repo, "HEAD"), cat, profile=profile)
+        return {c["filename"]: c for c in changed}, cat.stats()
+
+@pytest.mark.parametrize("limit", [64 * 1024, 16])
+def test_headers_from_blob_prefix(repo, monkeypatch, limit):
+    # with a 16 byte prefix the wide header, the gzip and the bzip2 blobs are read again in full
+    monkeypatch.setattr(analyzer, "GIT_HEADER_BYTES", limit)
+    changed, _ = _changes(repo)
+    assert sorted(changed) == ["shared/items.csv", "shared/orders.csv", "shared/stock.csv", "shared/wide.csv"]
+    assert changed["shared/items.csv"]["after_header"] == ["id", "sku", "qty"]
+    assert changed["shared/stock.csv"]["after_header"] == ["id", "stock"]
+    assert changed["shared/wide.csv"]["after_header"] == WIDE.split(",") + ["extra"]
+
+def test_value_changes_profiled_from_blobs(repo):
+    changed, stats = _changes(repo, profile=True)
+    assert [c["column"] for c in changed["shared/prices.csv"]["column_changes"] if c["change"] == "type"] == ["price"]
+    # the 5 changed datasets are read for their headers, then again one blob at a time
+    # to profile them; same.csv is identical in both revisions and never read
+    assert stats["blobs_read"] == 2 * 5 + 2 * 5
+
+def test_read_many_limit_keeps_the_pipe_in_sync(repo):
+    shas = list(GitTree(repo, "before").blobs.values())
+    with GitCatFile(repo) as cat:
+        full = [data for _, data in cat.read_many(shas)]
+        cut = [data for _, data in cat.read_many(shas, limit=4)]
+        assert cut == [data[:4] for data in full]
+        assert cat.read(shas[0]) == full[0]
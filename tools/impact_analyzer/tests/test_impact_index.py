@@ -0,0 +1,38 @@
+# tests/test_impact_index.py
+import json
+import os
+
+import pytest
+
+from analyzer import analyze_codebase
+from graph import impact_index
+from graph.impact_index import ImpactIndex
+
+SNAPSHOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "snapshots", "after")
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("index") / "impact_index.sqlite")
+    with ImpactIndex(path) as index:
+        index.update("after", analyze_codebase(SNAPSHOT))
+    return path
+
+def _query(db, capsys, *args):
+    assert impact_index.main([*args, "--db", db]) == 0
+    return [(r["file"], r.get("hops", r.get("line"))) for r in json.loads(capsys.readouterr().out)]
+
+def test_readers_of(db, capsys):
+    # module_b writes its output with a write-mode open(), which is not a read
+    assert _query(db, capsys, "readers-of", "module_b_output_india.csv") == [
+        ("country_india/module_c.py", 7), ("country_india/module_d.py", 7)]
+
+def test_writers_of(db, capsys):
+    # module_c and module_d only assign the path before reading it
+    assert _query(db, capsys, "writers-of", "../shared/module_b_output_india.csv") == [
+        ("country_india/module_b.py", 24)]
+
+def test_downstream_of(db, capsys):
+    assert _query(db, capsys, "downstream-of", "shared/module_a_output_india.csv") == [
+        ("country_india/module_b.py", 1), ("country_india/module_c.py", 2), ("country_india/module_d.py", 2)]
+    assert _query(db, capsys, "downstream-of", "module_a_output_india.csv", "--max-hops", "1") == [
+        ("country_india/module_b.py", 1)]
@@ -0,0 +1,87 @@
+# tests/test_llm_cache.py
+import types
+
+import pytest
+
+from reports import llm_cache
+from reports.llm_cache import LLMCache, normalize_prompt, cached_explanations
+
+CONFIG = types.SimpleNamespace(GROQ_MODEL="model-x", LLM_TEMPERATURE=0.0)
+COUNTRIES = ["country_india", "country_usa"]
+
+def _prompt(country):
+    return (f"Module {country}/module_b.py reads ../shared/module_a_output_{country[8:]}.csv "
+            f"with positional unpacking at line 12. Explain the impact for {country[8:]}.")
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    c = LLMCache(str(tmp_path / "llm.sqlite"), ttl_seconds=100, max_entries=2)
+    yield c
+    c.close()
+
+class _Calls:
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, prompts):
+        self.sent.extend(prompts)
+        return [f"Answer for {p.split()[1]} at line 12 in india." for p in prompts]
+
+def test_countries_paths_and_lines_normalize_to_one_key():
+    india, mapping = normalize_prompt(_prompt("country_india"), COUNTRIES)
+    usa, _ = normalize_prompt(_prompt("country_usa").replace("line 12", "line 40"), COUNTRIES)
+    assert india == usa
+    assert "<PATH1>" in india and "line <LINE1>" in india and "<COUNTRY1>" in india
+    assert mapping["<PATH1>"] == "country_india/module_b.py"
+    assert normalize_prompt("Explain x.csv", COUNTRIES)[0] != normalize_prompt("Explain y at line 3", COUNTRIES)[0]
+
+def test_hit_is_filled_with_the_asking_finding(cache):
+    call = _Calls()
+    first = cached_explanations([_prompt("country_india")], COUNTRIES, CONFIG, cache, call)
+    assert first == ["Answer for country_india/module_b.py at line 12 in india."]
+    second = cached_explanations([_prompt("country_usa")], COUNTRIES, CONFIG, cache, call)
+    assert second == ["Answer for country_usa/module_b.py at line 12 in usa."]
+    assert len(call.sent) == 1 and cache.hits == 1 and cache.network_calls == 1
+
+def test_equivalent_prompts_sent_once_per_run(cache):
+    call = _Calls()
+    answers = cached_explanations([_prompt("country_india"), _prompt("country_usa")], COUNTRIES, CONFIG, cache, call)
+    assert len(call.sent) == 1
+    assert answers[1] == "Answer for country_usa/module_b.py at line 12 in usa."
+
+def test_failures_not_cached(cache):
+    failing = lambda prompts: ["LLM call failed: timeout" for _ in prompts]
+    assert cached_explanations([_prompt("country_india")], COUNTRIES, CONFIG, cache, failing) == \
+        ["LLM call failed: timeout"]
+    assert cache.stats()["entries"] == 0
+
+def test_key_includes_model_and_temperature(cache):
+    assert cache.make_key("p", "model-x", 0) == cache.make_key("p", "model-x", 0.0)
+    assert cache.make_key("p", "model-x", 0) != cache.make_key("p", "model-y", 0)
+    assert cache.make_key("p", "model-x", 0) != cache.make_key("p", "model-x", 0.5)
+
+def test_ttl_expiry(tmp_path, cache, clock):
+    cache.put("k", "answer")
+    clock[0] += 99
+    assert cache.get("k") == "answer"
+    clock[0] += 2
+    assert cache.get("k") is None
+    # expired rows are purged when the cache is opened again
+    LLMCache(str(tmp_path / "llm.sqlite"), ttl_seconds=100).close()
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_evicted(cache, clock):
+    for key in ("a", "b"):
+        cache.put(key, key)
+        clock[0] += 1
+    assert cache.get("a") == "a"   # b is now the least recently used
+    clock[0] += 1
+    cache.put("c", "c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
@@ -0,0 +1,44 @@
+# tests/test_report_generator.py
+import json
+
+import pytest
+
+from reports.report_generator import StreamingReportWriter, write_text_report
+
+FINDING = {"module": "country_usa/module_b.py", "file": "module_a_output_usa.csv", "kind": "reader",
+           "impact": "Schema changed", "confidence": "High", "evidence": ["row[2] at line 12"],
+           "changed_file": "shared/module_a_output_usa.csv"}
+
+def _paths(tmp_path):
+    return {"json_path": str(tmp_path / "report.json"), "ndjson_path": str(tmp_path / "findings.ndjson"),
+            "text_path": str(tmp_path / "report.txt")}
+
+def test_reports_replaced_on_finish(tmp_path):
+    paths = _paths(tmp_path)
+    with StreamingReportWriter(**paths, compression={"gzip": 6}) as writer:
+        writer.write_finding(FINDING)
+        assert not any((tmp_path / p).exists() for p in ("report.json", "findings.ndjson", "report.txt"))
+        writer.finish({"changed_files": [], "findings_count": writer.count})
+    with open(paths["json_path"], encoding="utf-8") as f:
+        assert json.load(f)["summary"]["findings_count"] == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "findings.ndjson", "findings.ndjson.gz", "report.json", "report.json.gz", "report.txt", "report.txt.gz"]
+
+def test_failed_run_keeps_previous_reports(tmp_path):
+    paths = _paths(tmp_path)
+    for path in paths.values():
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("previous")
+    with pytest.raises(RuntimeError):
+        with StreamingReportWriter(**paths) as writer:
+            writer.write_finding(FINDING)
+            raise RuntimeError("interrupted")
+    for path in paths.values():
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == "previous"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["findings.ndjson", "report.json", "report.txt"]
+
+def test_write_text_report(tmp_path):
+    out = tmp_path / "report.txt"
+    write_text_report({"findings": [FINDING]}, str(out))
+    assert "MODULE: country_usa/module_b.py" in out.read_text(encoding="utf-8")
@@ -0,0 +1,15 @@
+# tests/test_runtime_tracer.py
+from parsers.runtime_tracer import _timing, _overhead, format_overhead
+
+def test_timing_is_median_and_spread():
+    assert _timing([0.03, 0.01, 0.02, 0.05, 0.02]) == (0.02, 0.04)
+
+def test_overhead_within_spread_is_omitted():
+    plain = _timing([0.010, 0.014, 0.006])
+    assert _overhead(_timing([0.012, 0.011, 0.013]), plain) is None
+    assert format_overhead(None) == "within run-to-run noise"
+
+def test_overhead_beyond_spread():
+    overhead = _overhead(_timing([0.020, 0.021, 0.019]), _timing([0.010, 0.011, 0.009]))
+    assert overhead == 1.0
+    assert format_overhead(overhead) == "+100.0%"
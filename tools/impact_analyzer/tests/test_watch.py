@@ -0,0 +1,54 @@
+# tests/test_watch.py
+import os
+
+import pytest
+
+import watch
+
+CSV = "id,amount\n1,10\n2,20\n3,30\n"
+MODULE = """import csv
+
+with open("../shared/orders.csv", newline="") as f:
+    for row in csv.DictReader(f):
+        print(int(row["amount"]))
+"""
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    out = tmp_path / "reports"
+    for name in ("REPORT_JSON", "REPORT_TXT", "REPORT_NDJSON", "REPORT_SUMMARY_JSON", "REPORT_INDEX_JSON"):
+        monkeypatch.setattr(watch, name, str(out / os.path.basename(getattr(watch, name))))
+    monkeypatch.setattr(watch, "REPORT_SHARD_DIR", str(out / "shards"))
+    monkeypatch.setattr(watch, "USE_IMPACT_INDEX", False)
+    monkeypatch.setattr(watch, "USE_LLM", False)
+    roots = []
+    for snap in watch.SNAPSHOTS:
+        root = str(tmp_path / snap)
+        _write(os.path.join(root, "shared", "orders.csv"), CSV)
+        _write(os.path.join(root, "country_usa", "module_a.py"), MODULE)
+        roots.append(root)
+    w = watch.ImpactWatcher(roots=roots, debounce=0, profile=True)
+    w.start()
+    return w
+
+def test_value_change_without_header_change(watcher):
+    assert watcher.changed == []
+    _write(os.path.join(watcher.roots["after"], "shared", "orders.csv"), "id,amount\n1,10\n2,n/a\n3,\n")
+    watcher.poll()
+    assert [c["filename"] for c in watcher.changed] == ["shared/orders.csv"]
+    change = watcher.changed[0]
+    assert change["before_header"] == change["after_header"] == ["id", "amount"]
+    assert {c["column"] for c in change["column_changes"]} == {"amount"}
+    findings = watcher.sections["shared/orders.csv"]
+    assert [(f.module, f.file) for f in findings] == [("country_usa", "country_usa/module_a.py")]
+
+    # reverting the values drops the change again
+    _write(os.path.join(watcher.roots["after"], "shared", "orders.csv"), CSV)
+    watcher.poll()
+    assert watcher.changed == []
+    assert "shared/orders.csv" not in watcher.sections
@@ -0,0 +1,275 @@
+# watch.py
+# Watch mode: keep analyses and headers in memory, poll the snapshot trees and
+# refresh the reports incrementally. Run from tools/impact_analyzer:  python watch.py
+import os
+import statistics
+import time
+
+from config import SNAPSHOT_BEFORE, SNAPSHOT_AFTER, REPORT_JSON, REPORT_TXT, USE_LLM
+from config import REPORT_NDJSON, REPORT_SUMMARY_JSON, REPORT_PRETTY, REPORT_INDEX_JSON, REPORT_SHARD_DIR
+from config import REPORT_COMPRESSION
+from config import USE_ANALYSIS_CACHE, ANALYSIS_CACHE_DIR, ANALYSIS_CACHE_MAX_BYTES, JOBS
+from config import CSV_INCLUDE, CSV_EXCLUDE, TRANSITIVE_IMPACTS, TRANSITIVE_MAX_HOPS, PRUNE_UNAFFECTED_READERS
+from config import USE_IMPACT_INDEX, IMPACT_INDEX_PATH, WATCH_POLL_INTERVAL, WATCH_DEBOUNCE, PROFILE_COLUMNS
+from analyzer import gather_headers_recursive, diff_headers, add_column_changes, analyze_codebases, iter_impacts
+from analyzer import enrich_findings
+from parsers.csv_parser import extract_csv_header, dataset_name
+from parsers.code_parser import analyze_python_file, ANALYZER_VERSION
+from parsers.analysis_cache import AnalysisCache
+from parsers.path_resolver import resolve_paths
+from parsers.file_walker import walk_files
+from graph.dependency_graph import normalize_shared_path
+from graph.impact_index import ImpactIndex
+from reports.report_generator import StreamingReportWriter, ShardWriter
+
+SNAPSHOTS = ("before", "after")
+
+def _touched_keys(analysis):
+    """Normalized shared paths an analysis reads or writes."""
+    keys = set()
+    for field in ("file_reads", "file_writes"):
+        for fr in (analysis or {}).get(field, []):
+            key = normalize_shared_path(fr[1]) if fr else None
+            if key:
+                keys.add(key)
+    return keys
+
+class ImpactWatcher:
+    """
+    Holds headers, analyses and report sections (findings per changed CSV) of
+    both snapshots. poll() stats the trees; once changes have settled for
+    `debounce` seconds only the changed .py/.csv files are re-read, only the
+    findings of the changed CSVs they touch are recomputed, and only those
+    report shards are rewritten.
+    """
+
+    def __init__(self, roots=(SNAPSHOT_BEFORE, SNAPSHOT_AFTER), cache=None, debounce=WATCH_DEBOUNCE,
+                 profile=PROFILE_COLUMNS):
+        self.roots = dict(zip(SNAPSHOTS, roots))
+        self.cache = cache
+        self.debounce = debounce
+        self.profile = profile
+        self.headers = {}    # snapshot -> { rel_csv_path: header }
+        self.column_changes = {}   # dataset -> changed-file entry with column_changes (profile only)
+        self.code = {}       # snapshot -> { country: { relpath: analysis } }
+        self.stamps = {}     # full path -> (mtime_ns, size, snapshot, kind, rel)
+        self.changed = []
+        self.sections = {}   # changed file -> [findings]
+        self.shard_entries = {}
+        self.pending = {}    # full path -> stamp, waiting for the debounce
+        self.last_change = 0.0
+        self.latencies = []
+
+    # --- scanning ---------------------------------------------------------
+    def _tracked(self):
+        """(snapshot, kind, rel, full) for every .py file of a country folder and every CSV."""
+        for snap, root in self.roots.items():
+            if not root or not os.path.isdir(root):
+                continue
+            for rel, full in walk_files(root, include=CSV_INCLUDE, exclude=CSV_EXCLUDE):
+                yield snap, "csv", rel, full
+            with os.scandir(root) as countries:
+                for country in countries:
+                    if not country.is_dir():
+                        continue
+                    with os.scandir(country.path) as files:
+                        for entry in files:
+                            if entry.name.endswith(".py") and entry.is_file():
+                                yield snap, "py", f"{country.name}/{entry.name}", entry.path
+
+    def scan(self):
+        stamps = {}
+        for snap, kind, rel, full in self._tracked():
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            stamps[full] = (st.st_mtime_ns, st.st_size, snap, kind, rel)
+        return stamps
+
+    # --- full build -------------------------------------------------------
+    def start(self):
+        t0 = time.perf_counter()
+        self.stamps = self.scan()
+        self.headers = {snap: gather_headers_recursive(root) for snap, root in self.roots.items()}
+        code_before, code_after = analyze_codebases([self.roots["before"], self.roots["after"]],
+                                                    cache=self.cache, jobs=JOBS, diff_aware=True)
+        self.code = {"before": code_before, "after": code_after}
+        self.column_changes = {}
+        self.changed = self._diff(None)
+        self.sections = {}
+        self._recompute(set(c["filename"] for c in self.changed))
+        self._write(rewrite=set(self.sections),
+                    reanalyzed=sorted(s[4] for s in self.stamps.values() if s[3] == "py"))
+        self._update_index()
+        print(f"Watching {len(self.stamps)} files; initial report in {(time.perf_counter() - t0) * 1000:.0f} ms.")
+
+    # --- incremental update -----------------------------------------------
+    def poll(self):
+        """Stat the trees once; apply the collected changes when they have settled."""
+        now = time.monotonic()
+        current = self.scan()
+        for full, stamp in current.items():
+            if self.stamps.get(full, (None, None))[:2] != stamp[:2] and self.pending.get(full) != stamp:
+                self.pending[full] = stamp
+                self.last_change = now
+        for full in set(self.stamps) - set(current):
+            if full not in self.pending:
+                self.pending[full] = None
+                self.last_change = now
+        if self.pending and now - self.last_change >= self.debounce:
+            t0 = time.perf_counter()
+            done = self.apply(self.pending, current)
+            self.pending = {}
+            if done:
+                ms = (time.perf_counter() - t0) * 1000
+                self.latencies.append(ms)
+                print(f"Report updated in {ms:.0f} ms ({done} file(s) re-read).")
+
+    def apply(self, pending, current):
+        touched_keys = set()
+        touched_csv = set()
+        reread = 0
+        resolve = set()   # snapshots whose python files changed
+        for full, stamp in pending.items():
+            old = self.stamps.get(full)
+            info = stamp or old
+            if info is None:
+                continue
+            _, _, snap, kind, rel = info
+            if kind == "csv":
+                header = extract_csv_header(full) if stamp else None
+                if stamp:
+                    self.headers[snap][rel] = header
+                else:
+                    self.headers[snap].pop(rel, None)
+                touched_csv.add(rel)
+            else:
+                country = rel.split("/", 1)[0]
+                files = self.code[snap].setdefault(country, {})
+                relpath = os.path.relpath(full, self.roots[snap])
+                touched_keys |= _touched_keys(files.get(relpath))
+                if stamp:
+                    files[relpath] = analyze_python_file(full, cache=self.cache)
+                    touched_keys |= _touched_keys(files[relpath])
+                else:
+                    files.pop(relpath, None)
+                resolve.add(snap)
+            reread += 1
+        self.stamps = current
+        if not reread:
+            return 0
+        for snap in resolve:
+            # a changed paths.py can move the targets of every module importing it
+            importers = [(files, rel) for files in self.code[snap].values()
+                         for rel, a in files.items() if a and a.get("unresolved_paths")]
+            for files, rel in importers:
+                touched_keys |= _touched_keys(files[rel])
+            resolve_paths(self.code[snap])
+            for files, rel in importers:
+                touched_keys |= _touched_keys(files[rel])
+
+        old_changed = set(c["filename"] for c in self.changed)
+        self.changed = self._diff(set(dataset_name(rel) for rel in touched_csv))
+        new_changed = set(c["filename"] for c in self.changed)
+        if TRANSITIVE_IMPACTS and touched_keys:
+            # a new read/write edge can extend any downstream chain
+            affected = set(new_changed)
+        else:
+            affected = set(f for f in new_changed
+                           if f in touched_csv or normalize_shared_path(f) in touched_keys)
+        affected |= new_changed - old_changed
+        for gone in old_changed - new_changed:
+            self.sections.pop(gone, None)
+            self.shard_entries.pop(gone, None)
+        self._recompute(affected)
+        self._write(rewrite=affected, reanalyzed=sorted(p[4] for p in pending.values() if p and p[3] == "py"))
+        self._update_index()
+        return reread
+
+    def _diff(self, datasets):
+        """
+        Changed files, as list_changed_files would report them. With profile,
+        the CSVs of `datasets` (None: all) are profiled again; the column
+        changes of every other dataset are kept from earlier calls.
+        """
+        before, after = self.headers["before"], self.headers["after"]
+        changed = diff_headers(before, after)
+        if not self.profile:
+            return changed
+        if datasets is None:
+            self.column_changes = {}
+        else:
+            for name in datasets:
+                self.column_changes.pop(name, None)
+            before = {rel: h for rel, h in before.items() if dataset_name(rel) in datasets}
+            after = {rel: h for rel, h in after.items() if dataset_name(rel) in datasets}
+        for entry in add_column_changes([], before, after, self.roots["before"], self.roots["after"]):
+            self.column_changes[entry["filename"]] = entry
+        by_name = {c["filename"]: c for c in changed}
+        for name, entry in self.column_changes.items():
+            by_name.setdefault(name, dict(entry))["column_changes"] = entry["column_changes"]
+        return [by_name[k] for k in sorted(by_name)]
+
+    def _recompute(self, affected):
+        if not affected:
+            return
+        changes = [c for c in self.changed if c["filename"] in affected]
+        findings = list(iter_impacts(changes, self.code["before"], self.code["after"],
+                                     transitive=TRANSITIVE_IMPACTS, max_hops=TRANSITIVE_MAX_HOPS,
+                                     prune=PRUNE_UNAFFECTED_READERS))
+        if USE_LLM:
+            findings, _ = enrich_findings(findings, changes)
+        for c in changes:
+            self.sections[c["filename"]] = []
+        for f in findings:
+            self.sections[f.changed_file].append(f)
+
+    def _write(self, rewrite, reanalyzed):
+        """Rewrite the single-file reports from memory and only the shards in `rewrite`."""
+        keep = {k: v for k, v in self.shard_entries.items() if k not in rewrite}
+        shards = ShardWriter(REPORT_INDEX_JSON, REPORT_SHARD_DIR, keep=keep, compression=REPORT_COMPRESSION)
+        with StreamingReportWriter(json_path=REPORT_JSON, text_path=REPORT_TXT, ndjson_path=REPORT_NDJSON,
+                                   summary_path=REPORT_SUMMARY_JSON, pretty=REPORT_PRETTY,
+                                   compression=REPORT_COMPRESSION) as writer:
+            for change in self.changed:
+                for finding in self.sections.get(change["filename"], []):
+                    writer.write_finding(finding)
+                    if change["filename"] in rewrite:
+                        shards.write_finding(finding)
+            summary = {
+                "changed_files": self.changed,
+                "findings_count": writer.count,
+                "code_analysis": {
+                    "files_total": sum(len(files) for code in self.code.values() for files in code.values()),
+                    "reanalyzed": reanalyzed
+                }
+            }
+            writer.finish(summary)
+        shards.finish(summary)
+        self.shard_entries = shards.shards
+
+    def _update_index(self):
+        if USE_IMPACT_INDEX:
+            with ImpactIndex(IMPACT_INDEX_PATH) as index:
+                for snap in SNAPSHOTS:
+                    index.update(snap, self.code[snap])
+
+    def run(self, interval=WATCH_POLL_INTERVAL):
+        self.start()
+        try:
+            while True:
+                time.sleep(interval)
+                self.poll()
+        except KeyboardInterrupt:
+            if self.latencies:
+                print(f"{len(self.latencies)} updates, median {statistics.median(self.latencies):.0f} ms.")
+
+def main():
+    cache = None
+    if USE_ANALYSIS_CACHE:
+        cache = AnalysisCache(ANALYSIS_CACHE_DIR, ANALYZER_VERSION, max_bytes=ANALYSIS_CACHE_MAX_BYTES)
+    ImpactWatcher(cache=cache).run()
+
+if __name__ == "__main__":
+    main()